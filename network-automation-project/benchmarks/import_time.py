@@ -0,0 +1,109 @@
+"""Measure CLI start-up import cost with ``python -X importtime``.
+
+Runs ``netauto.py`` for the commands that never open a device session
+(inventory listing, backup catalogue queries, stored-config diffs) and
+reports the cumulative import time of each. The run fails when a transport
+library is imported on these paths or when a command exceeds its budget::
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget-ms 150 --output imports.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+
+SCENARIOS: dict[str, list[str]] = {
+    "inventory": ["devices"],
+    "backups-latest": ["backups", "latest"],
+    "backups-history": ["backups", "history", "R1", "--limit", "5"],
+    "diff": ["diff", "R1"],
+}
+# Modules that must only load once a connection is actually opened.
+FORBIDDEN_MODULES = ("netmiko", "paramiko", "cryptography", "asyncssh")
+DEFAULT_BUDGET_MS = 200.0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the argument parser for the import-time benchmark."""
+    parser = argparse.ArgumentParser(description="Measure NetAuto CLI import time.")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per command (default: 5)")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help=f"fail when a median import time exceeds this (default: {DEFAULT_BUDGET_MS:g})",
+    )
+    parser.add_argument("--output", help="write results as JSON to this file")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run every scenario and return non-zero on a regression."""
+    args = build_parser().parse_args(argv)
+    results: dict[str, Any] = {}
+    failures: list[str] = []
+    with tempfile.TemporaryDirectory(prefix="netauto-imports-") as workdir:
+        env = {**os.environ, "BACKUPS_DIR": str(Path(workdir) / "backups"), "LOGS_DIR": workdir}
+        for name, command in SCENARIOS.items():
+            runs = [measure(command, env) for _ in range(max(1, args.repeat))]
+            median_ms = statistics.median(total for total, _ in runs)
+            forbidden = sorted({module for _, modules in runs for module in modules})
+            results[name] = {
+                "command": command,
+                "median_ms": round(median_ms, 2),
+                "min_ms": round(min(total for total, _ in runs), 2),
+                "forbidden_imports": forbidden,
+            }
+            status = "ok"
+            if forbidden:
+                status = f"imports {', '.join(forbidden)}"
+                failures.append(name)
+            elif median_ms > args.budget_ms:
+                status = f"over budget ({args.budget_ms:g} ms)"
+                failures.append(name)
+            print(f"{name:<18} {median_ms:>8.1f} ms  {status}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"Results written to {args.output}")
+    return 1 if failures else 0
+
+
+def measure(command: list[str], env: dict[str, str]) -> tuple[float, set[str]]:
+    """Run ``netauto.py command`` once; return total import ms and forbidden modules seen."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "netauto.py", *command],
+        cwd=PROJECT_DIR,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=False,
+    )
+    total_us = 0
+    forbidden: set[str] = set()
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        top_name = module.strip().split(".", 1)[0]
+        if top_name in FORBIDDEN_MODULES:
+            forbidden.add(top_name)
+        if not module.startswith("  "):  # only top-level imports, children are included
+            total_us += int(cumulative)
+    return total_us / 1000, forbidden
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,327 @@
+"""Benchmark NetAuto operations against the local device simulator.
+
+Starts ``netautosim.py`` in a child process, then measures from this process:
+
+* connect time (Netmiko login, enable and session preparation)
+* per-command latency percentiles for the operations behind the menu:
+  ``fetch_interfaces``, ``backup_config``, ``run_ping`` and an OSPF push
+* fleet backup throughput (devices per second) at several concurrency levels,
+  for the threaded and the asyncio fleet runners
+* peak RSS of the benchmark process
+
+Results are printed and written as JSON so runs from different releases can
+be compared::
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --levels 1,10,100 --latency 0.02 --output before.json
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import logging
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_DIR))
+
+from netauto_lib import operations  # noqa: E402
+from netauto_lib.config_loader import load_devices  # noqa: E402
+from netauto_lib.connection import connect_to_device  # noqa: E402
+from netauto_lib.credentials import CredentialResolver, Credentials  # noqa: E402
+from netauto_lib.fleet import (  # noqa: E402
+    async_backup_action,
+    backup_action,
+    run_fleet,
+    run_fleet_async,
+)
+from netauto_lib.utils import Device  # noqa: E402
+
+DEFAULT_LEVELS = "1,10,100,1000"
+DEFAULT_OUTPUT_DIR = PROJECT_DIR / "benchmarks" / "results"
+ENGINES = ("thread", "async")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the argument parser for the benchmark runner."""
+    parser = argparse.ArgumentParser(description="Benchmark NetAuto against simulated devices.")
+    parser.add_argument(
+        "--levels",
+        default=DEFAULT_LEVELS,
+        help=f"comma-separated fleet concurrency levels (default: {DEFAULT_LEVELS})",
+    )
+    parser.add_argument(
+        "--engines",
+        default=",".join(ENGINES),
+        help="fleet runners to measure: thread, async or both (default: thread,async)",
+    )
+    parser.add_argument(
+        "--min-devices",
+        type=int,
+        default=20,
+        help="devices backed up per level when the level is smaller (default: 20)",
+    )
+    parser.add_argument(
+        "--device-type",
+        default="cisco_ios_telnet",
+        choices=("cisco_ios_telnet", "cisco_ios"),
+        help="simulated transport (cisco_ios needs asyncssh)",
+    )
+    parser.add_argument("--base-port", type=int, default=22000, help="first simulator port")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated command latency")
+    parser.add_argument(
+        "--config-lines", type=int, default=200, help="running-config padding per device"
+    )
+    parser.add_argument(
+        "--connect-samples", type=int, default=5, help="sequential connects to time"
+    )
+    parser.add_argument(
+        "--iterations", type=int, default=20, help="repetitions of each timed command"
+    )
+    parser.add_argument(
+        "--output",
+        help="JSON results file (default: benchmarks/results/bench-<UTC timestamp>.json)",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run every benchmark and write the JSON report."""
+    args = build_parser().parse_args(argv)
+    levels = sorted({int(level) for level in args.levels.split(",") if level.strip()})
+    engines = [engine for engine in args.engines.split(",") if engine in ENGINES]
+    logging.basicConfig(level=logging.WARNING)
+
+    device_count = max(max(levels), args.min_devices, 1)
+    with tempfile.TemporaryDirectory(prefix="netauto-bench-") as workdir:
+        inventory_path = Path(workdir) / "devices.yaml"
+        simulator = _start_simulator(args, device_count, inventory_path)
+        try:
+            devices = load_devices(str(inventory_path))
+            backups_dir = str(Path(workdir) / "backups")
+            report: dict[str, Any] = {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "netmiko": _package_version("netmiko"),
+                "parameters": {
+                    "device_type": args.device_type,
+                    "latency": args.latency,
+                    "config_lines": args.config_lines,
+                    "levels": levels,
+                    "engines": engines,
+                },
+                "connect": bench_connect(devices[0], args.connect_samples),
+                "commands": bench_commands(devices[0], args.iterations, backups_dir),
+                "fleet": [
+                    bench_fleet(devices, engine, level, args.min_devices, backups_dir)
+                    for engine in engines
+                    for level in levels
+                ],
+            }
+        finally:
+            simulator.terminate()
+            simulator.wait(timeout=10)
+    report["peak_rss_kb"] = peak_rss_kb()
+
+    output = Path(args.output) if args.output else _default_output()
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    _print_report(report)
+    print(f"\nResults written to {output}")
+    return 0
+
+
+def bench_connect(device: Device, samples: int) -> dict[str, float]:
+    """Time ``samples`` sequential logins to ``device``."""
+    credentials = _credentials(device)
+    timings: list[float] = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            conn = connect_to_device(device, credentials)
+        if conn is None:
+            raise RuntimeError(f"Could not connect to simulated device {device['name']}")
+        timings.append(time.perf_counter() - started)
+        conn.disconnect()
+    return summarize(timings)
+
+
+def bench_commands(device: Device, iterations: int, backups_dir: str) -> dict[str, Any]:
+    """Time each operation ``iterations`` times over one session."""
+    ospf = operations.ospf_commands(1, "1.1.1.1", "10.0.0.0", "0.0.0.255", "0")
+    cases: dict[str, Callable[[Any], Any]] = {
+        "show_interfaces": operations.fetch_interfaces,
+        "backup_config": lambda conn: operations.backup_config(
+            conn, device["name"], backups_dir
+        ),
+        "ping": lambda conn: operations.run_ping(conn, "10.0.0.2", 5),
+        "configure_ospf": lambda conn: operations.push_config(conn, ospf, "OSPF configuration"),
+    }
+    with contextlib.redirect_stdout(io.StringIO()):
+        conn = connect_to_device(device, _credentials(device))
+    if conn is None:
+        raise RuntimeError(f"Could not connect to simulated device {device['name']}")
+    results: dict[str, Any] = {}
+    try:
+        for name, case in cases.items():
+            timings: list[float] = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                with contextlib.redirect_stdout(io.StringIO()):
+                    output = case(conn)
+                timings.append(time.perf_counter() - started)
+                if output is None:
+                    raise RuntimeError(f"{name} failed against the simulator")
+            results[name] = summarize(timings)
+    finally:
+        conn.disconnect()
+    return results
+
+
+def bench_fleet(
+    devices: list[Device], engine: str, level: int, min_devices: int, backups_dir: str
+) -> dict[str, Any]:
+    """Back up ``max(level, min_devices)`` devices with ``level`` concurrent sessions."""
+    targets = devices[: max(level, min_devices)]
+    resolver = CredentialResolver(interactive=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        if engine == "async":
+            summary = run_fleet_async(targets, async_backup_action(backups_dir), level, resolver)
+        else:
+            summary = run_fleet(targets, backup_action(backups_dir), level, resolver)
+    per_device = [result.elapsed for result in summary.succeeded]
+    return {
+        "engine": engine,
+        "concurrency": level,
+        "devices": len(targets),
+        "failed": len(summary.failed),
+        "elapsed": round(summary.elapsed, 4),
+        "devices_per_sec": round(len(summary.succeeded) / summary.elapsed, 2)
+        if summary.elapsed
+        else 0.0,
+        "per_device": summarize(per_device) if per_device else {},
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def summarize(timings: list[float]) -> dict[str, float]:
+    """Return count, mean and p50/p90/p99/max of ``timings`` in milliseconds."""
+    ordered = sorted(timings)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+        "p90_ms": round(percentile(ordered, 90) * 1000, 3),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def percentile(ordered: list[float], pct: float) -> float:
+    """Return the ``pct`` percentile of sorted values by linear interpolation."""
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def peak_rss_kb() -> int:
+    """Return the peak resident set size of this process in KiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _start_simulator(
+    args: argparse.Namespace, count: int, inventory_path: Path
+) -> subprocess.Popen[bytes]:
+    """Launch ``netautosim.py`` and wait until every port accepts connections (internal)."""
+    command = [
+        sys.executable,
+        str(PROJECT_DIR / "netautosim.py"),
+        "--count",
+        str(count),
+        "--device-type",
+        args.device_type,
+        "--base-port",
+        str(args.base_port),
+        "--latency",
+        str(args.latency),
+        "--config-lines",
+        str(args.config_lines),
+        "--inventory",
+        str(inventory_path),
+    ]
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 60
+    last_port = args.base_port + count - 1
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("Device simulator exited during start-up")
+        if inventory_path.exists() and _port_open(last_port):
+            return process
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("Device simulator did not start within 60 seconds")
+
+
+def _port_open(port: int) -> bool:
+    """Return True if something listens on localhost ``port`` (internal)."""
+    with socket.socket() as probe:
+        probe.settimeout(0.5)
+        return probe.connect_ex(("127.0.0.1", port)) == 0
+
+
+def _credentials(device: Device) -> Credentials:
+    """Build credentials from a simulator inventory entry (internal)."""
+    return Credentials(device["username"], device["password"], device.get("enable_secret"))
+
+
+def _package_version(name: str) -> str | None:
+    """Return the installed version of ``name``, if any (internal)."""
+    from importlib import metadata
+
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _default_output() -> Path:
+    """Return a timestamped results path (internal)."""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    return DEFAULT_OUTPUT_DIR / f"bench-{stamp}.json"
+
+
+def _print_report(report: dict[str, Any]) -> None:
+    """Print a readable summary of ``report`` (internal)."""
+    connect = report["connect"]
+    print(f"Connect: p50 {connect['p50_ms']:.1f} ms, p99 {connect['p99_ms']:.1f} ms")
+    print("\nCommand latency (ms)      p50       p90       p99")
+    for name, stats in report["commands"].items():
+        print(
+            f"  {name:<20}{stats['p50_ms']:>9.2f} {stats['p90_ms']:>9.2f} {stats['p99_ms']:>9.2f}"
+        )
+    print("\nFleet backups   concurrency  devices  failed   dev/s   peak RSS")
+    for row in report["fleet"]:
+        print(
+            f"  {row['engine']:<14}{row['concurrency']:>11}{row['devices']:>9}{row['failed']:>8}"
+            f"{row['devices_per_sec']:>8.1f}{row['peak_rss_kb'] // 1024:>8} MiB"
+        )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,37 +1,217 @@
 """Main entry point for the NetAuto CLI tool."""
 from __future__ import annotations
 
+import argparse
 import logging
-from typing import Any
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional
 
-from netmiko.base_connection import BaseConnection  # type: ignore[import-untyped]
-
-from netauto_lib.config_loader import get_global_settings, load_devices, load_env
+from netauto_lib import metrics
+from netauto_lib.backup_index import BackupIndex, IndexEntry, get_index, parse_timestamp
+from netauto_lib.backup_store import get_store
+from netauto_lib.config_diff import diff_configs, diff_latest, fleet_change_report
+from netauto_lib.config_loader import get_global_settings, iter_devices, load_devices, load_env
 from netauto_lib.connection import connect_to_device
-from netauto_lib.logging_setup import setup_logging
+from netauto_lib.credentials import CredentialResolver
+from netauto_lib.fleet import (
+    AsyncFleetAction,
+    FleetAction,
+    FleetSummary,
+    async_backup_action,
+    async_config_action,
+    async_ping_action,
+    async_show_interfaces_action,
+    backup_action,
+    config_action,
+    ping_action,
+    print_summary,
+    run_fleet,
+    run_fleet_async,
+    show_interfaces_action,
+)
+from netauto_lib.inventory import SelectorError, load_inventory
+from netauto_lib.jobs import JobError, load_job, print_job_results, run_job, select_targets
+from netauto_lib.latency import export_latency, timed
+from netauto_lib.logging_setup import log_context, setup_logging
 from netauto_lib.operations import (
     backup_config,
     configure_interface,
     configure_ospf,
+    fetch_running_config,
+    interface_commands,
+    ospf_commands,
     ping_test,
     show_interfaces,
+    validate_area,
+    validate_interface_name,
+    validate_ipv4,
+    validate_positive_int,
+    validate_subnet_mask,
+    validate_wildcard_mask,
 )
+from netauto_lib.transcripts import enable_transcripts
 from netauto_lib.utils import Device, choose_device, is_valid_choice
 
+if TYPE_CHECKING:
+    from netmiko.base_connection import BaseConnection  # type: ignore[import-untyped]
+
 VALID_MENU_CHOICES = {"0", "1", "2", "3", "4", "5"}
 
 
-def main() -> None:
-    """Initialize environment, select device, and handle menu interaction."""
+def main(argv: Optional[list[str]] = None) -> int:
+    """Parse arguments and run a subcommand, or the interactive menu by default."""
+    started = time.monotonic()
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "diff" and args.live and args.fleet:
+        parser.error("argument --live: not allowed with argument --fleet")
     load_env()
     settings = get_global_settings()
     setup_logging(str(settings["logs_dir"]))
+    if settings["transcripts_dir"]:
+        enable_transcripts(
+            settings["transcripts_dir"],
+            settings["transcript_max_bytes"],
+            settings["transcript_compress"],
+        )
+    if args.command is None:
+        run_interactive(settings)
+        status = 0
+    else:
+        status = int(args.handler(args, settings))
+    if settings["metrics_textfile"] and metrics.has_samples():
+        metrics.write_textfile(
+            settings["metrics_textfile"],
+            args.command or "interactive",
+            status,
+            time.monotonic() - started,
+        )
+    return status
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the CLI argument parser; no subcommand starts the interactive menu."""
+    parser = argparse.ArgumentParser(description="NetAuto - Network Automation Tool")
+    commands = parser.add_subparsers(dest="command")
+
+    devices = commands.add_parser("devices", help="list the device inventory")
+    devices.add_argument("selectors", nargs="*", help="only list devices matching these selectors")
+    devices.set_defaults(handler=_cmd_devices)
+
+    backups = commands.add_parser("backups", help="query the backup catalogue")
+    queries = backups.add_subparsers(dest="query", required=True)
+    latest = queries.add_parser("latest", help="latest backup per device")
+    latest.set_defaults(handler=_cmd_backups_latest)
+    history = queries.add_parser("history", help="backup history for one device")
+    history.add_argument("device")
+    history.add_argument("--limit", type=int, help="show at most N entries")
+    history.set_defaults(handler=_cmd_backups_history)
+    changed = queries.add_parser("changed-since", help="devices whose config changed since T")
+    changed.add_argument("since", help="ISO date or date/time, UTC unless a zone is given")
+    changed.set_defaults(handler=_cmd_backups_changed_since)
+    reindex = queries.add_parser("reindex", help="rebuild the catalogue from the backup store")
+    reindex.set_defaults(handler=_cmd_backups_reindex)
+
+    diff = commands.add_parser("diff", help="compare running-configs semantically")
+    target = diff.add_mutually_exclusive_group(required=True)
+    target.add_argument("device", nargs="?", help="diff the device's two latest distinct backups")
+    target.add_argument("--fleet", action="store_true", help="change report for every device")
+    diff.add_argument(
+        "--live", action="store_true", help="diff the live config against the latest backup"
+    )
+    diff.add_argument("--workers", type=int, help="processes for --fleet (default: CPU count)")
+    diff.set_defaults(handler=_cmd_diff)
+
+    run_job = commands.add_parser("run-job", help="run the steps of a YAML job file")
+    run_job.add_argument("job", help="path to the job file")
+    run_job.add_argument("--workers", type=int, help="override the job's worker count")
+    run_job.add_argument(
+        "--dry-run", action="store_true", help="validate and show the plan without connecting"
+    )
+    run_job.set_defaults(handler=_cmd_run_job)
+
+    backup = _add_fleet_command(commands, "backup", "back up running-configs")
+    backup.set_defaults(handler=_cmd_backup)
+    show = _add_fleet_command(commands, "show-interfaces", "show ip interface brief")
+    show.set_defaults(handler=_cmd_show_interfaces)
+    ping = _add_fleet_command(commands, "ping", "ping a destination from each device")
+    ping.add_argument("--destination", required=True, type=_validated(validate_ipv4))
+    ping.add_argument("--repeat", type=_validated(validate_positive_int), help="echo count")
+    ping.set_defaults(handler=_cmd_ping)
+    set_interface = _add_fleet_command(
+        commands, "set-interface", "assign an IPv4 address to an interface"
+    )
+    set_interface.add_argument(
+        "--interface", required=True, type=_validated(validate_interface_name)
+    )
+    set_interface.add_argument("--ip", required=True, type=_validated(validate_ipv4))
+    set_interface.add_argument(
+        "--mask", required=True, type=_validated(validate_subnet_mask), help="mask or /prefix"
+    )
+    _add_reconcile_option(set_interface)
+    set_interface.set_defaults(handler=_cmd_set_interface)
+    ospf = _add_fleet_command(commands, "ospf", "configure a basic OSPF process")
+    ospf.add_argument("--process-id", required=True, type=_validated(validate_positive_int))
+    ospf.add_argument("--router-id", required=True, type=_validated(validate_ipv4))
+    ospf.add_argument("--network", required=True, type=_validated(validate_ipv4))
+    ospf.add_argument("--wildcard", required=True, type=_validated(validate_wildcard_mask))
+    ospf.add_argument("--area", required=True, type=_validated(validate_area))
+    _add_reconcile_option(ospf)
+    ospf.set_defaults(handler=_cmd_ospf)
+    return parser
+
+
+def _add_fleet_command(
+    commands: Any, name: str, help_text: str
+) -> argparse.ArgumentParser:
+    """Add a subcommand that runs one operation across selected devices."""
+    sub: argparse.ArgumentParser = commands.add_parser(name, help=help_text)
+    sub.add_argument(
+        "devices",
+        nargs="+",
+        help="device names, 'all', prefixes or selectors such as 'site=dc1 and tag=edge'",
+    )
+    sub.add_argument("--workers", type=int, help="concurrent sessions (default: FLEET_WORKERS)")
+    sub.add_argument(
+        "--async",
+        dest="use_async",
+        action="store_true",
+        help="run from one asyncio event loop instead of worker threads",
+    )
+    return sub
+
+
+def _add_reconcile_option(sub: argparse.ArgumentParser) -> None:
+    """Add --reconcile/--no-reconcile defaulting to RECONCILE_CONFIG."""
+    sub.add_argument(
+        "--reconcile",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="only send lines missing from the running-config (default: RECONCILE_CONFIG)",
+    )
+
+
+def _validated(validator: Callable[[str], Any]) -> Callable[[str], Any]:
+    """Adapt an operations validator for argparse so its message is shown."""
+
+    def parse(value: str) -> Any:
+        try:
+            return validator(value)
+        except ValueError as exc:
+            raise argparse.ArgumentTypeError(str(exc)) from None
+
+    return parse
+
+
+def run_interactive(settings: dict[str, Any]) -> None:
+    """Select a device and handle menu interaction."""
     logger = logging.getLogger(__name__)
     print("\n--- NetAuto CLI - Network Automation Tool ---")
 
-    devices: list[Device] = load_devices()
+    devices: list[Device] = load_devices(settings["inventory_path"])
     if not devices:
-        msg = "No devices found in devices.yaml; exiting."
+        msg = f"No devices found in {settings['inventory_path']}; exiting."
         print(msg)
         logger.error(msg)
         return
@@ -47,10 +227,14 @@ def main() -> None:
         return
 
     try:
-        _interactive_menu(connection, device, settings, logger)
+        with log_context(
+            device=device["name"], ip=device["ip"], device_type=device.get("device_type")
+        ):
+            _interactive_menu(connection, device, settings, logger)
     finally:
         try:
-            connection.disconnect()
+            with timed("disconnect"):
+                connection.disconnect()
         except AttributeError:
             pass
         logger.info("Program exited normally.")
@@ -90,7 +274,7 @@ def _interactive_menu(
         logger.info("Menu selection: %s", choice)
 
         if choice == "1":
-            configure_interface(conn)
+            configure_interface(conn, settings["reconcile_config"])
         elif choice == "2":
             show_interfaces(conn)
         elif choice == "3":
@@ -98,12 +282,269 @@ def _interactive_menu(
         elif choice == "4":
             backup_config(conn, device.get("name", "router"), str(settings["backups_dir"]))
         elif choice == "5":
-            configure_ospf(conn)
+            configure_ospf(conn, settings["reconcile_config"])
         elif choice == "0":
             print("Goodbye!")
             logger.info("User exited via menu.")
             return
 
 
+def _cmd_backup(args: argparse.Namespace, settings: dict[str, Any]) -> int:
+    """Back up the running-config of the selected devices."""
+    backups_dir = str(settings["backups_dir"])
+    return _run_fleet_command(
+        args, settings, backup_action(backups_dir), async_backup_action(backups_dir)
+    )
+
+
+def _cmd_show_interfaces(args: argparse.Namespace, settings: dict[str, Any]) -> int:
+    """Print 'show ip interface brief' from the selected devices."""
+    return _run_fleet_command(
+        args, settings, show_interfaces_action(), async_show_interfaces_action(), show_output=True
+    )
+
+
+def _cmd_ping(args: argparse.Namespace, settings: dict[str, Any]) -> int:
+    """Ping a destination from the selected devices."""
+    repeat = args.repeat or settings.get("default_ping_count", 5)
+    return _run_fleet_command(
+        args,
+        settings,
+        ping_action(args.destination, repeat),
+        async_ping_action(args.destination, repeat),
+        show_output=True,
+    )
+
+
+def _cmd_set_interface(args: argparse.Namespace, settings: dict[str, Any]) -> int:
+    """Assign an IPv4 address to an interface on the selected devices."""
+    commands = interface_commands(args.interface, args.ip, args.mask)
+    reconcile = _reconcile(args, settings)
+    return _run_fleet_command(
+        args,
+        settings,
+        config_action(commands, "interface configuration", reconcile),
+        async_config_action(commands, reconcile),
+        show_output=reconcile,
+    )
+
+
+def _cmd_ospf(args: argparse.Namespace, settings: dict[str, Any]) -> int:
+    """Configure a basic OSPF process on the selected devices."""
+    commands = ospf_commands(
+        args.process_id, args.router_id, args.network, args.wildcard, args.area
+    )
+    reconcile = _reconcile(args, settings)
+    return _run_fleet_command(
+        args,
+        settings,
+        config_action(commands, "OSPF configuration", reconcile),
+        async_config_action(commands, reconcile),
+        show_output=reconcile,
+    )
+
+
+def _run_fleet_command(
+    args: argparse.Namespace,
+    settings: dict[str, Any],
+    action: FleetAction,
+    async_action: AsyncFleetAction,
+    show_output: bool = False,
+) -> int:
+    """Run an operation on the selected devices and print a summary.
+
+    Credentials are only prompted for when stdin is a terminal, so the
+    command fails cleanly instead of hanging under cron or CI.
+    """
+    devices: Optional[Iterable[Device]]
+    if args.devices == ["all"] and not args.use_async:
+        # Stream the inventory so the first sessions open while it is still being read.
+        devices = iter_devices(settings["inventory_path"])
+    else:
+        devices = _select_devices(args.devices, settings)
+    if devices is None:
+        return 2
+    resolver = CredentialResolver(interactive=sys.stdin.isatty())
+    workers = args.workers or int(settings.get("fleet_workers", 10))
+    if args.use_async:
+        summary = run_fleet_async(devices, async_action, workers, resolver)
+    else:
+        summary = run_fleet(devices, action, workers, resolver)
+    if not summary.results:
+        print("No devices to run on.")
+        return 2
+    if show_output:
+        for result in summary.succeeded:
+            print(f"\n=== {result.name} ({result.ip}) ===\n{result.result}")
+    print_summary(summary)
+    _export_latency(summary, settings)
+    return 0 if not summary.failed else 1
+
+
+def _export_latency(summary: FleetSummary, settings: dict[str, Any]) -> None:
+    """Write the run's latency histograms to LATENCY_REPORT, when it is set."""
+    if settings["latency_report"] and summary.latency:
+        path = export_latency(summary.latency, settings["latency_report"])
+        print(f"Latency report written to {path}")
+
+
+def _select_devices(selectors: list[str], settings: dict[str, Any]) -> Optional[list[Device]]:
+    """Return inventory entries matched by any of ``selectors`` ("all" selects every device)."""
+    try:
+        devices = load_inventory(settings["inventory_path"]).select(*selectors)
+    except SelectorError as exc:
+        print(exc)
+        return None
+    if not devices:
+        print("No devices match the selection.")
+        return None
+    return devices
+
+
+def _reconcile(args: argparse.Namespace, settings: dict[str, Any]) -> bool:
+    """Return the --reconcile flag, falling back to the RECONCILE_CONFIG setting."""
+    return bool(settings["reconcile_config"] if args.reconcile is None else args.reconcile)
+
+
+def _cmd_run_job(args: argparse.Namespace, settings: dict[str, Any]) -> int:
+    """Validate a job file and run it with one session per target device."""
+    try:
+        job = load_job(args.job, settings.get("default_ping_count", 5))
+        devices = select_targets(job, load_inventory(settings["inventory_path"]))
+    except JobError as exc:
+        print(exc)
+        return 2
+    if args.workers:
+        job.workers = args.workers
+    if args.dry_run:
+        print(f"Job {job.name}: {len(job.steps)} steps on {len(devices)} devices")
+        for number, step in enumerate(job.steps, start=1):
+            params = ", ".join(f"{key}={value}" for key, value in step.params.items())
+            detail = "; ".join(step.commands) or params
+            print(f"  {number}. {step.operation} {detail}".rstrip())
+        return 0
+    resolver = CredentialResolver(interactive=sys.stdin.isatty())
+    summary = run_job(job, devices, settings, resolver)
+    print_job_results(summary)
+    print_summary(summary)
+    _export_latency(summary, settings)
+    return 0 if not summary.failed else 1
+
+
+def _cmd_devices(args: argparse.Namespace, settings: dict[str, Any]) -> int:
+    """Print the inventory, or the devices matching selectors, without connecting."""
+    devices: Optional[Iterable[Device]]
+    if args.selectors:
+        devices = _select_devices(args.selectors, settings)
+    else:
+        devices = iter_devices(settings["inventory_path"])
+    if devices is None:
+        return 2
+    listed = 0
+    for device in devices:
+        print(f"{device['name']:<16} {device['ip']:<16} {device['device_type']}")
+        listed += 1
+    return 0 if listed else 1
+
+
+def _cmd_backups_latest(args: argparse.Namespace, settings: dict[str, Any]) -> int:
+    """Print the newest catalogued backup of every device."""
+    _print_entries(_backup_index(settings).latest_per_device())
+    return 0
+
+
+def _cmd_backups_history(args: argparse.Namespace, settings: dict[str, Any]) -> int:
+    """Print catalogued backups of one device, newest first."""
+    entries = _backup_index(settings).history(args.device, args.limit)
+    if not entries:
+        print(f"No backups recorded for {args.device}.")
+        return 1
+    _print_entries(entries)
+    return 0
+
+
+def _cmd_backups_changed_since(args: argparse.Namespace, settings: dict[str, Any]) -> int:
+    """Print devices whose running-config changed since the given time."""
+    try:
+        since = parse_timestamp(args.since)
+    except ValueError:
+        print(f"Invalid timestamp: {args.since}")
+        return 2
+    for device in _backup_index(settings).changed_since(since):
+        print(device)
+    return 0
+
+
+def _cmd_backups_reindex(args: argparse.Namespace, settings: dict[str, Any]) -> int:
+    """Rebuild the catalogue from the backup store manifests."""
+    backups_dir = settings["backups_dir"]
+    count = _backup_index(settings).rebuild(get_store(backups_dir))
+    print(f"Indexed {count} backups.")
+    return 0
+
+
+def _cmd_diff(args: argparse.Namespace, settings: dict[str, Any]) -> int:
+    """Print a semantic config diff for one device or the whole fleet."""
+    backups_dir = settings["backups_dir"]
+    if args.fleet:
+        report = fleet_change_report(backups_dir, workers=args.workers)
+        if not report:
+            print("No configuration changes between the latest backups.")
+        for device, changes in report.items():
+            print(f"=== {device}: {len(changes.added)} added, {len(changes.removed)} removed ===")
+            print(changes.render())
+        return 0
+
+    if args.live:
+        changes = _diff_live(args.device, backups_dir, settings["inventory_path"])
+        if changes is None:
+            print(f"Unable to compare the live config of {args.device} with a backup.")
+            return 1
+    else:
+        changes = diff_latest(backups_dir, args.device)
+        if changes is None:
+            print(f"Fewer than two distinct backups of {args.device}; nothing to compare.")
+            return 1
+    print(changes.render() if changes else "No differences.")
+    return 0
+
+
+def _diff_live(name: str, backups_dir: Any, inventory_path: str) -> Any:
+    """Capture the device's running-config and diff it against its latest backup."""
+    store = get_store(backups_dir)
+    latest = store.latest(name)
+    device = next(
+        (entry for entry in load_devices(inventory_path) if entry["name"] == name), None
+    )
+    if latest is None or device is None:
+        return None
+    connection = connect_to_device(device)
+    if connection is None:
+        return None
+    try:
+        live_text = fetch_running_config(connection)
+    finally:
+        with timed("disconnect"):
+            connection.disconnect()
+    if live_text is None:
+        return None
+    return diff_configs(store.read(latest), live_text)
+
+
+def _backup_index(settings: dict[str, Any]) -> BackupIndex:
+    """Return the catalogue for the configured backups directory."""
+    return get_index(settings["backups_dir"])
+
+
+def _print_entries(entries: list[IndexEntry]) -> None:
+    """Print catalogue entries as aligned columns."""
+    for entry in entries:
+        marker = "*" if entry.changed else " "
+        print(
+            f"{entry.device:<16} {entry.timestamp:%Y-%m-%d %H:%M:%S} {marker} "
+            f"{entry.hash[:12]} {entry.size:>8}  {entry.path}"
+        )
+
+
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,11 +1,65 @@
-"""Helper library for the NetAuto CLI tool."""
+"""Helper library for the NetAuto CLI tool.
 
-from . import config_loader, connection, logging_setup, operations, utils
+Submodules are imported on first attribute access, so ``import netauto_lib``
+stays cheap and transport libraries such as Netmiko load only when a
+connection is opened.
+"""
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from . import (
+        async_transport,
+        backup_index,
+        backup_store,
+        config_diff,
+        config_loader,
+        connection,
+        credentials,
+        daemon,
+        fleet,
+        inventory,
+        ios_config,
+        jobs,
+        latency,
+        logging_setup,
+        metrics,
+        operations,
+        simulator,
+        transcripts,
+        utils,
+    )
 
 __all__ = [
+    "async_transport",
+    "backup_index",
+    "backup_store",
+    "config_diff",
     "config_loader",
     "connection",
+    "credentials",
+    "daemon",
+    "fleet",
+    "inventory",
+    "ios_config",
+    "jobs",
+    "latency",
     "logging_setup",
+    "metrics",
     "operations",
+    "simulator",
+    "transcripts",
     "utils",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
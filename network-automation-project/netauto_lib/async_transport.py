@@ -0,0 +1,430 @@
+"""asyncio-native transport sessions for Cisco IOS devices.
+
+These sessions expose coroutine versions of the ``send_command`` and
+``send_config_set`` calls that ``operations`` issues against Netmiko, so a
+single event loop can drive thousands of concurrent devices without one OS
+thread per session. Telnet is implemented directly on asyncio streams; SSH
+uses the optional ``asyncssh`` package, imported only when an SSH session is
+opened.
+
+The session class is chosen from the device's ``device_type`` through
+``ASYNC_SESSION_TYPES``.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from typing import TYPE_CHECKING, Any, Optional
+
+from netauto_lib import latency, metrics, transcripts
+
+if TYPE_CHECKING:
+    from netauto_lib.credentials import Credentials
+    from netauto_lib.utils import Device
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 30.0
+WAKE_DELAY = 2.0
+
+# Prompt patterns are anchored at the end of the buffer (\Z, after optional spaces) so
+# a prompt-like line in the middle of command output cannot end a read early.
+_PROMPT_RE = re.compile(r"(?m)^[\w.\-/()@:]+[>#][ \t]*\Z")
+_USERNAME_RE = re.compile(r"(?i)(username|login)\s*:[ \t]*\Z")
+_PASSWORD_RE = re.compile(r"(?i)password\s*:[ \t]*\Z")
+_LOGIN_FAILED_RE = re.compile(r"(?i)(% (login|authentication) (invalid|failed)|access denied)")
+
+# Telnet protocol bytes used during option negotiation.
+_IAC, _DONT, _DO, _WONT, _WILL, _SB, _SE = 255, 254, 253, 252, 251, 250, 240
+
+
+class AsyncTransportError(Exception):
+    """Raised when an async session cannot be established or times out."""
+
+
+class AsyncSession:
+    """Shared prompt handling for asyncio device sessions.
+
+    Subclasses implement ``_open``, ``_read``, ``_write`` and ``_close``; this
+    class handles login, prompt discovery, paging and command framing.
+    """
+
+    default_port = 0
+
+    def __init__(
+        self,
+        host: str,
+        username: str,
+        password: str,
+        secret: Optional[str] = None,
+        port: Optional[int] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        self.host = host
+        self.username = username
+        self.password = password
+        self.secret = secret
+        self.port = port or self.default_port
+        self.timeout = timeout
+        self.base_prompt = ""
+        self._prompt_line = ""
+        self._buffer = ""
+
+    async def connect(self) -> "AsyncSession":
+        """Open the transport, log in and prepare the terminal.
+
+        The login prompt is found while logging in, so the ``prompt`` latency
+        phase covers the terminal setup only.
+        """
+        with latency.timed("connect"):
+            with latency.timed("login"):
+                try:
+                    await asyncio.wait_for(self._open(), self.timeout)
+                except (OSError, asyncio.TimeoutError) as exc:
+                    raise AsyncTransportError(
+                        f"Unable to reach {self.host}:{self.port}: {exc}"
+                    ) from exc
+                await self._login()
+            await self._enable()
+            with latency.timed("prompt"):
+                await self._exchange("terminal length 0")
+        logger.info("Async session established to %s", self.host)
+        return self
+
+    async def send_command(self, command: str) -> str:
+        """Run an exec-mode command and return its output without echo or prompt."""
+        with latency.timed(latency.command_phase("command")):
+            return await self._exchange(command)
+
+    async def send_config_set(self, commands: list[str]) -> str:
+        """Enter configuration mode, send ``commands`` and return the transcript."""
+        transcript: list[str] = []
+        lines = ["configure terminal", *commands, "end"]
+        transcripts.record(transcripts.SENT, "\n".join(lines), self.host)
+        with latency.timed(latency.command_phase("config")):
+            for line in lines:
+                await self._write(line + "\n")
+                transcript.append(await self._read_until_prompt())
+        output = "".join(transcript)
+        transcripts.record(transcripts.RECEIVED, output, self.host)
+        return output
+
+    async def disconnect(self) -> None:
+        """Close the session, ignoring transport errors."""
+        with latency.timed("disconnect"):
+            try:
+                await self._write("exit\n")
+            except (OSError, AsyncTransportError):
+                pass
+            await self._close()
+
+    async def __aenter__(self) -> "AsyncSession":
+        return await self.connect()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.disconnect()
+
+    async def _exchange(self, command: str) -> str:
+        """Send one command, record it in the transcript and return its output (internal)."""
+        transcripts.record(transcripts.SENT, command, self.host)
+        await self._write(command + "\n")
+        raw = await self._read_until_prompt()
+        transcripts.record(transcripts.RECEIVED, raw, self.host)
+        return self._strip_output(raw, command)
+
+    async def _login(self) -> None:
+        """Answer username/password prompts until an exec prompt appears (internal)."""
+        sent_password = False
+        while True:
+            text = await self._wake_until(_USERNAME_RE, _PASSWORD_RE, _PROMPT_RE)
+            if _LOGIN_FAILED_RE.search(text):
+                raise AsyncTransportError(f"Authentication failed for {self.host}")
+            if _PROMPT_RE.search(text):
+                self._set_base_prompt(text)
+                return
+            if _PASSWORD_RE.search(text):
+                if sent_password:
+                    raise AsyncTransportError(f"Authentication failed for {self.host}")
+                await self._write(self.password + "\n")
+                sent_password = True
+            else:
+                await self._write(self.username + "\n")
+
+    async def _enable(self) -> None:
+        """Enter privileged exec mode when the device lands in user mode (internal)."""
+        if not self._prompt_line.endswith(">"):
+            return
+        if not self.secret:
+            logger.warning("No enable secret for %s; staying in user exec mode", self.host)
+            return
+        with latency.timed("enable"):
+            await self._write("enable\n")
+            text = await self._read_until(_PASSWORD_RE, _PROMPT_RE)
+            if _PASSWORD_RE.search(text):
+                await self._write(self.secret + "\n")
+                text = await self._read_until(_PROMPT_RE)
+        self._set_base_prompt(text)
+        if not self._prompt_line.endswith("#"):
+            raise AsyncTransportError(f"Enable failed on {self.host}")
+
+    async def _wake_until(self, *patterns: "re.Pattern[str]") -> str:
+        """Wait for ``patterns``, sending a newline if the device stays silent (internal)."""
+        try:
+            return await self._read_until(*patterns, timeout=min(WAKE_DELAY, self.timeout))
+        except AsyncTransportError:
+            await self._write("\n")
+            return await self._read_until(*patterns)
+
+    async def _read_until_prompt(self) -> str:
+        """Read until the device prompt (including config submodes) returns (internal)."""
+        pattern = re.compile(rf"(?m)^{re.escape(self.base_prompt)}(\([\w\-]+\))?[>#][ \t]*\Z")
+        return await self._read_until(pattern)
+
+    async def _read_until(
+        self, *patterns: "re.Pattern[str]", timeout: Optional[float] = None
+    ) -> str:
+        """Accumulate output until any pattern matches the buffer tail (internal).
+
+        Every pattern ends in ``\Z``, so only text at the end of the buffer
+        can match.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + (self.timeout if timeout is None else timeout)
+        while True:
+            for pattern in patterns:
+                if pattern.search(self._buffer):
+                    text, self._buffer = self._buffer, ""
+                    return text
+            if "--More--" in self._buffer:
+                self._buffer = self._buffer.replace("--More--", "")
+                await self._write(" ")
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                raise AsyncTransportError(f"Timed out waiting for prompt from {self.host}")
+            try:
+                chunk = await asyncio.wait_for(self._read(), remaining)
+            except asyncio.TimeoutError as exc:
+                raise AsyncTransportError(f"Timed out waiting for prompt from {self.host}") from exc
+            if not chunk:
+                raise AsyncTransportError(f"Connection to {self.host} closed unexpectedly")
+            self._buffer += chunk.replace("\r\n", "\n").replace("\r", "")
+
+    def _set_base_prompt(self, text: str) -> None:
+        """Record the hostname portion of the last prompt in ``text`` (internal)."""
+        last_line = text.rstrip().splitlines()[-1].strip() if text.strip() else ""
+        if not _PROMPT_RE.match(last_line):
+            raise AsyncTransportError(f"Could not determine prompt for {self.host}")
+        self._prompt_line = last_line
+        self.base_prompt = re.sub(r"(\([\w\-]+\))?[>#]$", "", last_line)
+
+    def _strip_output(self, raw: str, command: str) -> str:
+        """Remove the echoed command and trailing prompt from ``raw`` (internal)."""
+        lines = raw.split("\n")
+        if lines and lines[0].strip() == command.strip():
+            lines = lines[1:]
+        if lines and lines[-1].strip().startswith(self.base_prompt):
+            self._prompt_line = lines[-1].strip()
+            lines = lines[:-1]
+        return "\n".join(lines).strip("\n")
+
+    async def _open(self) -> None:
+        raise NotImplementedError
+
+    async def _read(self) -> str:
+        raise NotImplementedError
+
+    async def _write(self, data: str) -> None:
+        raise NotImplementedError
+
+    async def _close(self) -> None:
+        raise NotImplementedError
+
+
+class AsyncTelnetSession(AsyncSession):
+    """Telnet session built on asyncio streams with minimal option negotiation."""
+
+    default_port = 23
+
+    _reader: Optional[asyncio.StreamReader] = None
+    _writer: Optional[asyncio.StreamWriter] = None
+    # Start of a telnet command split across reads, completed by the next one.
+    _partial: bytes = b""
+
+    async def _open(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+    async def _read(self) -> str:
+        """Return the next payload text, or "" only at end of stream.
+
+        A segment holding nothing but option negotiation is answered and
+        skipped rather than returned empty, which callers would take as EOF.
+        """
+        assert self._reader is not None
+        while True:
+            data = await self._reader.read(65536)
+            if not data:
+                return ""
+            payload = self._negotiate(data)
+            if payload:
+                return payload.decode("utf-8", errors="replace")
+
+    async def _write(self, data: str) -> None:
+        if self._writer is None:
+            raise AsyncTransportError(f"Session to {self.host} is not open")
+        self._writer.write(data.replace("\n", "\r\n").encode("utf-8"))
+        await self._writer.drain()
+
+    async def _close(self) -> None:
+        if self._writer is None:
+            return
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except OSError:
+            pass
+        self._writer = None
+
+    def _negotiate(self, data: bytes) -> bytes:
+        """Refuse every telnet option and return the payload bytes (internal).
+
+        A command cut off at the end of ``data`` is kept and completed with
+        the next read.
+        """
+        if self._partial:
+            data, self._partial = self._partial + data, b""
+        if _IAC not in data:
+            return data
+        payload = bytearray()
+        replies = bytearray()
+        index = 0
+        while index < len(data):
+            byte = data[index]
+            if byte != _IAC:
+                payload.append(byte)
+                index += 1
+                continue
+            if index + 1 >= len(data):
+                self._partial = data[index:]
+                break
+            command = data[index + 1]
+            if command in (_DO, _DONT, _WILL, _WONT):
+                if index + 2 >= len(data):
+                    self._partial = data[index:]
+                    break
+                option = data[index + 2]
+                if command == _DO:
+                    replies += bytes([_IAC, _WONT, option])
+                elif command == _WILL:
+                    replies += bytes([_IAC, _DONT, option])
+                index += 3
+            elif command == _SB:
+                end = data.find(bytes([_IAC, _SE]), index)
+                if end == -1:
+                    self._partial = data[index:]
+                    break
+                index = end + 2
+            elif command == _IAC:
+                payload.append(_IAC)
+                index += 2
+            else:
+                index += 2
+        if replies and self._writer is not None:
+            self._writer.write(bytes(replies))
+        return bytes(payload)
+
+
+class AsyncSSHSession(AsyncSession):
+    """SSH session backed by the optional ``asyncssh`` package."""
+
+    default_port = 22
+
+    _conn: Any = None
+    _process: Any = None
+
+    async def _open(self) -> None:
+        try:
+            import asyncssh  # type: ignore[import-not-found]
+        except ModuleNotFoundError as exc:
+            raise AsyncTransportError(
+                "The asyncssh package is required for async SSH sessions."
+            ) from exc
+        self._conn = await asyncssh.connect(
+            self.host,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            known_hosts=None,
+        )
+        self._process = await self._conn.create_process(term_type="vt100")
+
+    async def _login(self) -> None:
+        """SSH authenticates during the handshake; only discover the prompt."""
+        self._set_base_prompt(await self._wake_until(_PROMPT_RE))
+
+    async def _read(self) -> str:
+        return await self._process.stdout.read(65536)
+
+    async def _write(self, data: str) -> None:
+        if self._process is None:
+            raise AsyncTransportError(f"Session to {self.host} is not open")
+        self._process.stdin.write(data)
+
+    async def _close(self) -> None:
+        if self._conn is None:
+            return
+        self._conn.close()
+        await self._conn.wait_closed()
+        self._conn = None
+        self._process = None
+
+
+ASYNC_SESSION_TYPES: dict[str, type[AsyncSession]] = {
+    "cisco_ios": AsyncSSHSession,
+    "cisco_ios_ssh": AsyncSSHSession,
+    "cisco_ios_telnet": AsyncTelnetSession,
+}
+
+
+def session_class_for(device_type: str) -> type[AsyncSession]:
+    """Return the async session class registered for ``device_type``."""
+    try:
+        return ASYNC_SESSION_TYPES[device_type]
+    except KeyError:
+        raise ValueError(
+            f"No async transport registered for device_type '{device_type}'."
+        ) from None
+
+
+async def open_async_session(
+    device: "Device",
+    credentials: "Credentials",
+    timeout: float = DEFAULT_TIMEOUT,
+) -> AsyncSession:
+    """Create and connect the async session matching the device's type."""
+    host_value = device.get("ip") or device.get("host")
+    if not host_value:
+        raise ValueError("Device entry must include an 'ip' value.")
+    session_class = session_class_for(device.get("device_type", "cisco_ios"))
+    session = session_class(
+        host=str(host_value),
+        username=credentials.username,
+        password=credentials.password,
+        secret=credentials.secret,
+        port=device.get("port"),  # type: ignore[arg-type]
+        timeout=timeout,
+    )
+    metrics.inc("netauto_devices_attempted_total")
+    try:
+        await session.connect()
+    except Exception as exc:
+        metrics.record_connect_failure(exc)
+        # Login or prompt failures happen after the transport is open; close it here
+        # because the caller never receives the session.
+        try:
+            await session._close()
+        except Exception:  # pragma: no cover - best effort teardown
+            logger.debug("Closing failed session to %s raised", host_value)
+        raise
+    metrics.inc("netauto_devices_connected_total")
+    return session
@@ -0,0 +1,190 @@
+"""SQLite catalogue of backup snapshots.
+
+Every capture recorded by ``operations.save_backup`` is also inserted into
+``<backups_dir>/index.sqlite3`` so history questions are answered by indexed
+queries instead of walking the backup directory:
+
+* latest snapshot per device
+* full history of one device
+* devices whose config changed since a point in time
+
+Rows carry a ``changed`` flag computed at insert time (hash differs from the
+device's previous snapshot by timestamp), which keeps the "changed since"
+query a single range scan. A snapshot inserted out of order also refreshes the
+flag of the snapshot that follows it.
+"""
+from __future__ import annotations
+
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from netauto_lib.backup_store import BackupStore, Snapshot
+
+INDEX_FILENAME = "index.sqlite3"
+
+_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS backups (
+    id INTEGER PRIMARY KEY,
+    device TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    changed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS backups_device_time ON backups (device, timestamp);
+CREATE INDEX IF NOT EXISTS backups_changed_time ON backups (changed, timestamp);
+"""
+
+
+class IndexEntry(NamedTuple):
+    """One catalogued backup."""
+
+    device: str
+    timestamp: datetime
+    hash: str
+    size: int
+    path: str
+    changed: bool
+
+
+class BackupIndex:
+    """Thread-safe wrapper around the backup catalogue database."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+
+    def record(self, snapshot: "Snapshot", path: str | Path) -> IndexEntry:
+        """Insert ``snapshot`` stored at ``path`` and return the new entry."""
+        timestamp = _format_time(snapshot.timestamp)
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT hash FROM backups WHERE device = ? AND timestamp <= ? "
+                "ORDER BY timestamp DESC, id DESC LIMIT 1",
+                (snapshot.device, timestamp),
+            ).fetchone()
+            changed = row is None or row[0] != snapshot.hash
+            self._db.execute(
+                "INSERT INTO backups (device, timestamp, hash, size, path, changed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (snapshot.device, timestamp, snapshot.hash, snapshot.size, str(path), int(changed)),
+            )
+            following = self._db.execute(
+                "SELECT id, hash FROM backups WHERE device = ? AND timestamp > ? "
+                "ORDER BY timestamp, id LIMIT 1",
+                (snapshot.device, timestamp),
+            ).fetchone()
+            if following is not None:
+                self._db.execute(
+                    "UPDATE backups SET changed = ? WHERE id = ?",
+                    (int(following[1] != snapshot.hash), following[0]),
+                )
+        return IndexEntry(
+            snapshot.device, snapshot.timestamp, snapshot.hash, snapshot.size, str(path), changed
+        )
+
+    def latest_per_device(self) -> list[IndexEntry]:
+        """Return the newest entry for every device, ordered by device name."""
+        return self._query(
+            "SELECT b.device, b.timestamp, b.hash, b.size, b.path, b.changed "
+            "FROM (SELECT DISTINCT device FROM backups) d JOIN backups b ON b.id = ("
+            "SELECT id FROM backups WHERE device = d.device "
+            "ORDER BY timestamp DESC, id DESC LIMIT 1) ORDER BY d.device"
+        )
+
+    def latest(self, device: str) -> Optional[IndexEntry]:
+        """Return the newest entry for ``device``."""
+        entries = self._query(
+            "SELECT device, timestamp, hash, size, path, changed FROM backups "
+            "WHERE device = ? ORDER BY timestamp DESC, id DESC LIMIT 1",
+            (device,),
+        )
+        return entries[0] if entries else None
+
+    def history(self, device: str, limit: Optional[int] = None) -> list[IndexEntry]:
+        """Return entries for ``device`` newest first, optionally limited."""
+        return self._query(
+            "SELECT device, timestamp, hash, size, path, changed FROM backups "
+            "WHERE device = ? ORDER BY timestamp DESC, id DESC LIMIT ?",
+            (device, -1 if limit is None else limit),
+        )
+
+    def changed_since(self, when: datetime) -> list[str]:
+        """Return devices with at least one config change at or after ``when``."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT DISTINCT device FROM backups WHERE changed = 1 AND timestamp >= ? "
+                "ORDER BY device",
+                (_format_time(when),),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def rebuild(self, store: "BackupStore") -> int:
+        """Re-create the catalogue from the store manifests and return the row count."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM backups")
+        count = 0
+        for device in store.devices():
+            for snapshot in store.history(device):
+                self.record(snapshot, store.blob_path(snapshot.hash))
+                count += 1
+        return count
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._db.close()
+
+    def _query(self, sql: str, params: tuple[object, ...] = ()) -> list[IndexEntry]:
+        """Run ``sql`` and convert rows into entries (internal)."""
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [
+            IndexEntry(device, _parse_time(ts), digest, size, path, bool(changed))
+            for device, ts, digest, size, path, changed in rows
+        ]
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse a user-supplied ISO date/time, assuming UTC when no zone is given."""
+    parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _format_time(value: datetime) -> str:
+    """Return a fixed-width UTC string that sorts chronologically (internal)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime(_TIMESTAMP_FORMAT)
+
+
+def _parse_time(value: str) -> datetime:
+    """Inverse of ``_format_time`` (internal)."""
+    return datetime.strptime(value, _TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+
+
+_indexes: dict[Path, BackupIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(backups_dir: str | Path) -> BackupIndex:
+    """Return the shared catalogue for ``backups_dir``."""
+    path = (Path(backups_dir) / INDEX_FILENAME).resolve()
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = BackupIndex(path)
+        return index
@@ -0,0 +1,331 @@
+"""Content-addressed, deduplicated storage for running-config backups.
+
+Layout under the backups directory::
+
+    objects/<aa>/<sha256>.gz        full config text (a keyframe)
+    objects/<aa>/<sha256>.delta.gz  line-level delta against another object
+    manifests/<device>.jsonl        one line per capture: device, timestamp, hash, size
+
+Manifest file names are sanitised device names; each line records the
+original name, which ``devices()`` reports. Identical captures share a
+single object, so nightly backups of unchanged devices only append a small
+manifest line. A changed config is stored as a delta against the device's
+previous object; every ``keyframe_interval``-th object in a chain is
+stored in full, which bounds how many deltas a read has to apply. Lookups
+read one device's manifest (cached in memory and refreshed when the file
+changes) and bisect it by timestamp, so "latest" and "as of time T" never
+scan the directory.
+"""
+from __future__ import annotations
+
+import bisect
+import difflib
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional
+
+from netauto_lib import metrics
+from netauto_lib.config_loader import get_global_settings
+
+logger = logging.getLogger(__name__)
+
+OBJECTS_DIR = "objects"
+MANIFESTS_DIR = "manifests"
+DEFAULT_KEYFRAME_INTERVAL = 10
+
+_READ_CACHE_SIZE = 64
+
+_UNSAFE_NAME_RE = re.compile(r"[^\w.\-]")
+
+
+class Snapshot(NamedTuple):
+    """One recorded capture of a device's running-config."""
+
+    device: str
+    timestamp: datetime
+    hash: str
+    size: int
+
+
+class BackupStore:
+    """Store running-config captures as deduplicated, delta-compressed objects."""
+
+    def __init__(
+        self, root: str | Path, keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL
+    ) -> None:
+        self.root = Path(root)
+        self.keyframe_interval = max(1, keyframe_interval)
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._manifests: dict[str, tuple[tuple[int, int], list[Snapshot], list[datetime]]] = {}
+        self._read_cache: OrderedDict[str, str] = OrderedDict()
+
+    def put(self, device: str, config_text: str, when: Optional[datetime] = None) -> Snapshot:
+        """Record a capture for ``device`` and store its object if it is new."""
+        data = config_text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        timestamp = (when or datetime.now(timezone.utc)).astimezone(timezone.utc)
+        snapshot = Snapshot(device, timestamp, digest, len(data))
+
+        manifest = self._manifest_path(device)
+        line = json.dumps(
+            {
+                "device": device,
+                "timestamp": timestamp.isoformat(),
+                "hash": digest,
+                "size": len(data),
+            }
+        )
+        # The object check, its write and the manifest append happen under one lock so
+        # concurrent captures never store an object twice or delta against a stale base.
+        with self._write_lock:
+            if self._has_object(digest):
+                logger.info("Config for %s unchanged (blob %s)", device, digest[:12])
+            else:
+                self._write_object(device, digest, config_text, data)
+            with self._lock:
+                manifest.parent.mkdir(parents=True, exist_ok=True)
+                with manifest.open("a", encoding="utf-8") as handle:
+                    handle.write(line + "\n")
+                self._manifests.pop(device, None)
+        return snapshot
+
+    def history(self, device: str) -> list[Snapshot]:
+        """Return every snapshot for ``device`` in chronological order."""
+        return list(self._load_manifest(device)[0])
+
+    def latest(self, device: str) -> Optional[Snapshot]:
+        """Return the most recent snapshot for ``device``, if any."""
+        snapshots, _ = self._load_manifest(device)
+        return snapshots[-1] if snapshots else None
+
+    def as_of(self, device: str, when: datetime) -> Optional[Snapshot]:
+        """Return the last snapshot taken at or before ``when``."""
+        snapshots, timestamps = self._load_manifest(device)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        index = bisect.bisect_right(timestamps, when)
+        return snapshots[index - 1] if index else None
+
+    def read(self, snapshot: Snapshot | str) -> str:
+        """Return the config text for a snapshot or object hash."""
+        digest = snapshot.hash if isinstance(snapshot, Snapshot) else snapshot
+        # Walk back to a keyframe (or a cached text), then apply the deltas forward.
+        chain: list[tuple[str, list[Any]]] = []
+        current = digest
+        while True:
+            with self._lock:
+                text = self._read_cache.get(current)
+                if text is not None:
+                    self._read_cache.move_to_end(current)
+                    break
+            full_path = self._full_path(current)
+            if full_path.exists():
+                text = gzip.decompress(full_path.read_bytes()).decode("utf-8")
+                self._cache_text(current, text)
+                break
+            delta = self._load_delta(current)
+            chain.append((current, delta["ops"]))
+            current = delta["base"]
+
+        for current, ops in reversed(chain):
+            text = _apply_delta(text, ops)
+            self._cache_text(current, text)
+        return text
+
+    def devices(self) -> list[str]:
+        """Return the device names that have at least one snapshot.
+
+        Names come from the manifest lines, so devices whose names were
+        sanitised for the file system are reported as they were recorded.
+        Manifests written before names were stored fall back to the file name.
+        """
+        manifests_dir = self.root / MANIFESTS_DIR
+        if not manifests_dir.exists():
+            return []
+        names: set[str] = set()
+        for path in manifests_dir.glob("*.jsonl"):
+            with path.open(encoding="utf-8") as handle:
+                for raw in handle:
+                    if raw.strip():
+                        names.add(_manifest_device(raw, path.stem))
+        return sorted(names)
+
+    def blob_path(self, digest: str) -> Path:
+        """Return the on-disk location of the object for ``digest``."""
+        full_path = self._full_path(digest)
+        delta_path = self._delta_path(digest)
+        if not full_path.exists() and delta_path.exists():
+            return delta_path
+        return full_path
+
+    def _cache_text(self, digest: str, text: str) -> None:
+        """Remember the text of ``digest`` in the bounded read cache (internal)."""
+        with self._lock:
+            self._read_cache[digest] = text
+            self._read_cache.move_to_end(digest)
+            if len(self._read_cache) > _READ_CACHE_SIZE:
+                self._read_cache.popitem(last=False)
+
+    def _full_path(self, digest: str) -> Path:
+        """Return the keyframe path for ``digest`` (internal)."""
+        return self.root / OBJECTS_DIR / digest[:2] / f"{digest}.gz"
+
+    def _delta_path(self, digest: str) -> Path:
+        """Return the delta path for ``digest`` (internal)."""
+        return self.root / OBJECTS_DIR / digest[:2] / f"{digest}.delta.gz"
+
+    def _has_object(self, digest: str) -> bool:
+        """Return True if ``digest`` is stored in either form (internal)."""
+        return self._full_path(digest).exists() or self._delta_path(digest).exists()
+
+    def _write_object(self, device: str, digest: str, config_text: str, data: bytes) -> None:
+        """Store ``config_text`` as a delta when cheaper, otherwise in full (internal)."""
+        previous = self.latest(device)
+        if previous is not None and self.keyframe_interval > 1 and self._has_object(previous.hash):
+            depth = self._chain_depth(previous.hash) + 1
+            if depth < self.keyframe_interval:
+                ops = _line_delta(self.read(previous), config_text)
+                payload = json.dumps({"base": previous.hash, "depth": depth, "ops": ops})
+                encoded = payload.encode("utf-8")
+                if len(encoded) < len(data):
+                    compressed = gzip.compress(encoded)
+                    _write_atomic(self._delta_path(digest), compressed)
+                    metrics.inc("netauto_backup_stored_bytes_total", len(compressed))
+                    logger.info(
+                        "Stored config delta %s for %s (depth %d)", digest[:12], device, depth
+                    )
+                    return
+        compressed = gzip.compress(data)
+        _write_atomic(self._full_path(digest), compressed)
+        metrics.inc("netauto_backup_stored_bytes_total", len(compressed))
+        logger.info("Stored new config blob %s for %s", digest[:12], device)
+
+    def _chain_depth(self, digest: str) -> int:
+        """Return how many deltas separate ``digest`` from its keyframe (internal)."""
+        if self._full_path(digest).exists():
+            return 0
+        return int(self._load_delta(digest)["depth"])
+
+    def _load_delta(self, digest: str) -> dict[str, Any]:
+        """Decode the delta object for ``digest`` (internal)."""
+        return json.loads(gzip.decompress(self._delta_path(digest).read_bytes()))
+
+    def _manifest_path(self, device: str) -> Path:
+        """Return the manifest path for ``device`` (internal)."""
+        return self.root / MANIFESTS_DIR / f"{_UNSAFE_NAME_RE.sub('_', device)}.jsonl"
+
+    def _load_manifest(self, device: str) -> tuple[list[Snapshot], list[datetime]]:
+        """Return cached snapshots and their timestamps, re-reading on change (internal)."""
+        path = self._manifest_path(device)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return [], []
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._manifests.get(device)
+            if cached is not None and cached[0] == signature:
+                return cached[1], cached[2]
+
+        snapshots: list[Snapshot] = []
+        with path.open(encoding="utf-8") as handle:
+            for raw in handle:
+                if not raw.strip():
+                    continue
+                try:
+                    entry = json.loads(raw)
+                    # Names that sanitise to the same file share a manifest.
+                    if entry.get("device", device) != device:
+                        continue
+                    snapshots.append(
+                        Snapshot(
+                            device,
+                            datetime.fromisoformat(entry["timestamp"]),
+                            entry["hash"],
+                            int(entry["size"]),
+                        )
+                    )
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    logger.warning("Skipping malformed manifest line for %s", device)
+        snapshots.sort(key=lambda snap: snap.timestamp)
+        timestamps = [snap.timestamp for snap in snapshots]
+        with self._lock:
+            self._manifests[device] = (signature, snapshots, timestamps)
+        return snapshots, timestamps
+
+
+def _manifest_device(raw: str, fallback: str) -> str:
+    """Return the device name recorded on a manifest line, else ``fallback`` (internal)."""
+    try:
+        entry = json.loads(raw)
+    except ValueError:
+        return fallback
+    name = entry.get("device") if isinstance(entry, dict) else None
+    return name if isinstance(name, str) and name else fallback
+
+
+def _line_delta(base_text: str, new_text: str) -> list[Any]:
+    """Encode ``new_text`` as copy/insert operations over ``base_text`` lines (internal).
+
+    Each operation is either ``[start, end]`` (copy base lines ``start:end``)
+    or ``{"lines": [...]}`` holding literal lines to insert.
+    """
+    base_lines = base_text.splitlines(keepends=True)
+    new_lines = new_text.splitlines(keepends=True)
+    ops: list[Any] = []
+    matcher = difflib.SequenceMatcher(None, base_lines, new_lines)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif tag in ("replace", "insert"):
+            ops.append({"lines": new_lines[j1:j2]})
+    return ops
+
+
+def _apply_delta(base_text: str, ops: list[Any]) -> str:
+    """Rebuild text from ``base_text`` and ``_line_delta`` operations (internal)."""
+    base_lines = base_text.splitlines(keepends=True)
+    parts: list[str] = []
+    for op in ops:
+        if isinstance(op, dict):
+            parts.extend(op["lines"])
+        else:
+            parts.extend(base_lines[op[0]:op[1]])
+    return "".join(parts)
+
+
+def _write_atomic(path: Path, payload: bytes) -> None:
+    """Write ``payload`` to ``path`` via a temporary file and rename (internal)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp{os.getpid()}.{threading.get_ident()}")
+    tmp_path.write_bytes(payload)
+    os.replace(tmp_path, path)
+
+
+_stores: dict[Path, BackupStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(backups_dir: str | Path, keyframe_interval: Optional[int] = None) -> BackupStore:
+    """Return the shared store for ``backups_dir`` so threads share one lock.
+
+    ``keyframe_interval`` defaults to the ``BACKUP_KEYFRAME_INTERVAL`` setting
+    and only applies when the store is first created.
+    """
+    root = Path(backups_dir).resolve()
+    with _stores_lock:
+        store = _stores.get(root)
+        if store is None:
+            if keyframe_interval is None:
+                keyframe_interval = get_global_settings()["backup_keyframe_interval"]
+            store = _stores[root] = BackupStore(root, keyframe_interval)
+        return store
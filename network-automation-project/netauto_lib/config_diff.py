@@ -0,0 +1,270 @@
+"""Semantic diff of IOS running-configs built on ``ios_config`` trees.
+
+Sibling lines are matched by their text through dictionaries, so the
+comparison is linear in the size of the two configs and insensitive to the
+order in which IOS prints sections. Results keep the hierarchical context
+of every change::
+
+      interface GigabitEthernet0/1
+    -  ip address 10.0.0.1 255.255.255.0
+    +  ip address 10.0.0.2 255.255.255.0
+    + interface Loopback0
+    +  ip address 1.1.1.1 255.255.255.255
+
+``missing_commands`` applies the same matching to a flat list of intended
+config-mode commands, returning only the lines the device still lacks.
+
+``fleet_change_report`` diffs the two most recent distinct snapshots of
+every device in the backup store across a process pool, for a change
+report after nightly backups.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional
+
+from netauto_lib.backup_store import get_store
+from netauto_lib.ios_config import ConfigLine, ConfigTree, parse_config
+
+logger = logging.getLogger(__name__)
+
+ADDED = "+"
+REMOVED = "-"
+
+# Commands that open a configuration submode; following commands belong to it.
+SECTION_KEYWORDS = frozenset(
+    {
+        "interface",
+        "router",
+        "line",
+        "vlan",
+        "class-map",
+        "policy-map",
+        "route-map",
+        "crypto",
+        "ip access-list",
+        "ipv6 access-list",
+        "key chain",
+        "vrf definition",
+    }
+)
+
+
+class DiffEntry(NamedTuple):
+    """A line added or removed under the given parent sections."""
+
+    action: str
+    path: tuple[str, ...]
+    text: str
+
+
+@dataclass
+class ConfigDiff:
+    """Ordered list of hierarchical additions and removals."""
+
+    entries: list[DiffEntry] = field(default_factory=list)
+
+    @property
+    def added(self) -> list[DiffEntry]:
+        """Entries present only in the new config."""
+        return [entry for entry in self.entries if entry.action == ADDED]
+
+    @property
+    def removed(self) -> list[DiffEntry]:
+        """Entries present only in the old config."""
+        return [entry for entry in self.entries if entry.action == REMOVED]
+
+    @property
+    def changed_sections(self) -> list[str]:
+        """Top-level sections that exist in both configs but whose contents differ."""
+        whole = {entry.text for entry in self.entries if not entry.path}
+        seen: dict[str, None] = {}
+        for entry in self.entries:
+            if entry.path and entry.path[0] not in whole:
+                seen.setdefault(entry.path[0], None)
+        return list(seen)
+
+    def render(self) -> str:
+        """Return the diff as indented text with +/- markers and context headers."""
+        lines: list[str] = []
+        printed: tuple[str, ...] = ()
+        for entry in self.entries:
+            common = 0
+            while (
+                common < len(printed)
+                and common < len(entry.path)
+                and printed[common] == entry.path[common]
+            ):
+                common += 1
+            for depth in range(common, len(entry.path)):
+                lines.append("  " + " " * depth + entry.path[depth])
+            printed = entry.path + (entry.text,)
+            indent = " " * len(entry.path)
+            for index, text_line in enumerate(entry.text.split("\n")):
+                lines.append(f"{entry.action} {indent if index == 0 else ''}{text_line}")
+        return "\n".join(lines)
+
+    def __bool__(self) -> bool:
+        return bool(self.entries)
+
+
+def diff_trees(old: ConfigTree, new: ConfigTree) -> ConfigDiff:
+    """Return the hierarchical differences between two parsed configs."""
+    diff = ConfigDiff()
+    _diff_children(old.roots, new.roots, (), diff.entries)
+    return diff
+
+
+def diff_configs(old_text: str, new_text: str) -> ConfigDiff:
+    """Parse and diff two running-config texts."""
+    if old_text == new_text:
+        return ConfigDiff()
+    return diff_trees(parse_config(old_text), parse_config(new_text))
+
+
+def diff_latest(backups_dir: str | Path, device: str) -> Optional[ConfigDiff]:
+    """Diff the two most recent distinct snapshots of ``device``.
+
+    Returns ``None`` when fewer than two distinct configs have been captured.
+    """
+    store = get_store(backups_dir)
+    history = store.history(device)
+    if not history:
+        return None
+    newest = history[-1]
+    for snapshot in reversed(history[:-1]):
+        if snapshot.hash != newest.hash:
+            return diff_configs(store.read(snapshot), store.read(newest))
+    return None
+
+
+def fleet_change_report(
+    backups_dir: str | Path,
+    devices: Optional[Iterable[str]] = None,
+    workers: Optional[int] = None,
+) -> dict[str, ConfigDiff]:
+    """Diff the latest two snapshots of many devices in parallel processes.
+
+    Only devices whose most recent distinct snapshots differ are included.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    names = list(devices) if devices is not None else get_store(backups_dir).devices()
+    if not names:
+        return {}
+    workers = workers or min(len(names), os.cpu_count() or 1)
+    root = str(Path(backups_dir).resolve())
+    report: dict[str, ConfigDiff] = {}
+    chunksize = max(1, len(names) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        diffs = pool.map(_diff_latest_worker, [root] * len(names), names, chunksize=chunksize)
+        for name, diff in zip(names, diffs):
+            if diff:
+                report[name] = diff
+    logger.info("Change report: %d of %d devices changed", len(report), len(names))
+    return report
+
+
+def missing_commands(running: ConfigTree, commands: list[str]) -> list[str]:
+    """Return the subset of ``commands`` not already present in ``running``.
+
+    Commands are read the way IOS config mode reads them: a section command
+    such as ``interface Gi0/1`` or ``router ospf 1`` opens a submode and the
+    commands after it apply inside that section until the next section
+    command. A section header is repeated in the result only when at least
+    one of its lines is missing. ``no <x>`` counts as present when ``<x>`` is
+    absent, which is how IOS renders e.g. ``no shutdown``.
+    """
+    missing: list[str] = []
+    section: Optional[ConfigLine] = None
+    header: Optional[str] = None
+    header_emitted = False
+    for raw in commands:
+        command = raw.strip()
+        if not command:
+            continue
+        if opens_section(command):
+            section = running.section(command)
+            header, header_emitted = command, False
+            if section is None:
+                missing.append(command)
+                header_emitted = True
+            continue
+
+        present_in = section.children if section is not None else running.roots
+        if header is not None and section is None:
+            missing.append(command)
+        elif not _is_present(command, present_in):
+            if header is not None and not header_emitted:
+                missing.append(header)
+                header_emitted = True
+            missing.append(command)
+    return missing
+
+
+def opens_section(command: str) -> bool:
+    """Return True if config-mode ``command`` enters a submode such as ``interface``."""
+    words = command.split()
+    if not words:
+        return False
+    return words[0] in SECTION_KEYWORDS or " ".join(words[:2]) in SECTION_KEYWORDS
+
+
+def _is_present(command: str, nodes: list[ConfigLine]) -> bool:
+    """Return True if ``command`` is already reflected among ``nodes`` (internal)."""
+    texts = {node.text for node in nodes}
+    if command in texts:
+        return True
+    if command.startswith("no "):
+        negated = command[3:]
+        return not any(text == negated or text.startswith(negated + " ") for text in texts)
+    return False
+
+
+def _diff_latest_worker(backups_dir: str, device: str) -> Optional[ConfigDiff]:
+    """Process-pool entry point for ``fleet_change_report`` (internal)."""
+    return diff_latest(backups_dir, device)
+
+
+def _diff_children(
+    old_nodes: list[ConfigLine],
+    new_nodes: list[ConfigLine],
+    path: tuple[str, ...],
+    entries: list[DiffEntry],
+) -> None:
+    """Match siblings by text and recurse into shared sections (internal)."""
+    old_keyed = _keyed(old_nodes)
+    new_keyed = _keyed(new_nodes)
+    for key, node in old_keyed.items():
+        if key not in new_keyed:
+            _emit_subtree(REMOVED, node, path, entries)
+    for key, node in new_keyed.items():
+        old_node = old_keyed.get(key)
+        if old_node is None:
+            _emit_subtree(ADDED, node, path, entries)
+        elif old_node.children or node.children:
+            _diff_children(old_node.children, node.children, path + (node.text,), entries)
+
+
+def _keyed(nodes: list[ConfigLine]) -> dict[tuple[str, int], ConfigLine]:
+    """Key sibling nodes by text plus occurrence count for repeated lines (internal)."""
+    keyed: dict[tuple[str, int], ConfigLine] = {}
+    counts: dict[str, int] = {}
+    for node in nodes:
+        occurrence = counts.get(node.text, 0)
+        counts[node.text] = occurrence + 1
+        keyed[(node.text, occurrence)] = node
+    return keyed
+
+
+def _emit_subtree(
+    action: str, node: ConfigLine, path: tuple[str, ...], entries: list[DiffEntry]
+) -> None:
+    """Record ``node`` and its descendants with the same action (internal)."""
+    entries.append(DiffEntry(action, path, node.text))
+    child_path = path + (node.text,)
+    for child in node.children:
+        _emit_subtree(action, child, child_path, entries)
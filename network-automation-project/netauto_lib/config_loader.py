@@ -7,22 +7,97 @@ Expected ``devices.yaml`` structure::
                 ip: 192.168.50.10
                 username: admin
                 device_type: cisco_ios
+                site: dc1             # optional, used by inventory selectors
+                groups: [core]        # optional
+                tags: [edge, lab]     # optional
+
+The inventory may also be a CSV file with those keys as header columns
+(``groups``/``tags`` separated by ``;``), or a directory of YAML and CSV
+files that are read in name order.
 """
 from __future__ import annotations
 
+import csv
+import hashlib
+import io
 import logging
 import os
+import pickle
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, List, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypedDict,
+    Union,
+    cast,
+)
 
 import yaml
 from dotenv import load_dotenv  # type: ignore[import-untyped]
 
+from netauto_lib.utils import DEVICE_FIELDS, DeviceRecord
+
 if TYPE_CHECKING:
     from netauto_lib.utils import Device
 
 logger = logging.getLogger(__name__)
 
+# libyaml's C parser reads large inventories several times faster.
+_YAML_PARSER: Any = getattr(getattr(yaml, "cyaml", None), "CParser", None)
+# Bump when the cached row layout (utils.DEVICE_FIELDS) or signature changes.
+_CACHE_VERSION = 5
+INVENTORY_SUFFIXES = (".yaml", ".yml", ".csv")
+# (file name, st_mtime_ns, st_size) of every inventory file, in read order.
+_Signature = Tuple[Tuple[str, int, int], ...]
+
+
+class _InventoryCache(TypedDict):
+    """Pickled compiled inventory (internal)."""
+
+    version: int
+    signature: _Signature
+    sha256: str
+    rows: List[Tuple[Any, ...]]
+
+
+class _InventoryFormatError(ValueError):
+    """Raised when an inventory file parses but has the wrong shape (internal)."""
+
+    def __init__(self, message: str, level: int = logging.ERROR) -> None:
+        super().__init__(message)
+        self.level = level
+
+
+if _YAML_PARSER is not None:
+
+    class _InventoryLoader(  # type: ignore[misc]
+        _YAML_PARSER,
+        yaml.composer.Composer,
+        yaml.constructor.SafeConstructor,
+        yaml.resolver.Resolver,
+    ):
+        """Safe loader on libyaml events that can compose one node at a time (internal).
+
+        ``yaml.CSafeLoader`` composes whole documents in C and does not expose
+        ``compose_node``; the Python composer driven by the C parser does.
+        """
+
+        def __init__(self, stream: Union[bytes, BinaryIO]) -> None:
+            _YAML_PARSER.__init__(self, stream)
+            yaml.composer.Composer.__init__(self)
+            yaml.constructor.SafeConstructor.__init__(self)
+            yaml.resolver.Resolver.__init__(self)
+
+else:  # pragma: no cover - PyYAML built without libyaml
+    _InventoryLoader = yaml.SafeLoader  # type: ignore[misc,assignment]
+
 
 def load_env(env_path: str = ".env") -> None:
     """Load environment variables from the provided file if it exists."""
@@ -31,65 +106,310 @@ def load_env(env_path: str = ".env") -> None:
         load_dotenv(path)
 
 
-def load_devices(path: str = "devices.yaml") -> list["Device"]:
-    """Return the list of devices defined in the YAML inventory."""
+def load_devices(
+    path: str = "devices.yaml", use_cache: bool = True, compact: bool = False
+) -> list["Device"]:
+    """Return the list of devices defined in the inventory.
+
+    ``path`` is a YAML or CSV file, or a directory whose ``*.yaml``,
+    ``*.yml`` and ``*.csv`` files are read in name order. The validated
+    device list is cached in a pickle (``.<name>.cache`` beside a file,
+    ``.inventory.cache`` inside a directory) and reused while every file's
+    mtime and size, or failing that their SHA-256, are unchanged. With
+    ``compact`` the entries are read-only ``DeviceRecord`` objects instead
+    of dicts, which use far less memory for very large inventories.
+    """
     inventory_path = Path(path)
-    if not inventory_path.exists():
-        _report(f"Device inventory not found at {inventory_path}.")
+    files = _inventory_files(inventory_path)
+    if not files:
         return []
 
+    cache_path = _cache_path(inventory_path)
+    signature = _signature(files)
+    cached = _read_inventory_cache(cache_path) if use_cache else None
+    if cached is not None and cached["signature"] == signature:
+        return _from_rows(cached["rows"], compact)
+
+    contents = [(file_path, file_path.read_bytes()) for file_path, _ in files]
+    hasher = hashlib.sha256()
+    for file_path, data in contents:
+        hasher.update(file_path.name.encode() + b"\0" + data)
+    digest = hasher.hexdigest()
+    if cached is not None and cached["sha256"] == digest:
+        rows = cached["rows"]
+    else:
+        rows = []
+        complete = True
+        for file_path, data in contents:
+            devices = _parse_file(data, file_path)
+            if devices is None:
+                complete = False
+                continue
+            rows.extend(_row(device) for device in devices)
+        if not complete:
+            return _from_rows(rows, compact)
+    if use_cache:
+        _write_inventory_cache(cache_path, signature, digest, rows)
+    return _from_rows(rows, compact)
+
+
+def iter_devices(path: str = "devices.yaml") -> Iterator["Device"]:
+    """Yield validated devices one at a time while the inventory is read.
+
+    Accepts the same files and directories as ``load_devices``. YAML is
+    read one device entry at a time and CSV row by row, so a caller
+    such as ``run_fleet`` can start on the first devices of a huge
+    inventory before the rest has been parsed. A fresh ``load_devices``
+    cache is replayed instead of parsing; this function never writes it.
+    """
+    inventory_path = Path(path)
+    files = _inventory_files(inventory_path)
+    if not files:
+        return
+    cached = _read_inventory_cache(_cache_path(inventory_path))
+    if cached is not None and cached["signature"] == _signature(files):
+        for row in cached["rows"]:
+            yield _device_from_row(row)
+        return
+    for file_path, _ in files:
+        for entry in _file_entries(file_path):
+            device = _validate_entry(entry)
+            if device is not None:
+                yield device
+
+
+def _inventory_files(inventory_path: Path) -> list[tuple[Path, os.stat_result]]:
+    """Return the inventory file(s) under ``inventory_path`` with their stats (internal)."""
     try:
-        parsed = yaml.safe_load(inventory_path.read_text(encoding="utf-8"))
-    except yaml.YAMLError as exc:
-        _report(f"Unable to parse {inventory_path}: {exc}")
+        if not inventory_path.is_dir():
+            return [(inventory_path, inventory_path.stat())]
+        files = [
+            (file_path, file_path.stat())
+            for file_path in sorted(inventory_path.iterdir())
+            if file_path.suffix in INVENTORY_SUFFIXES and not file_path.name.startswith(".")
+        ]
+    except FileNotFoundError:
+        _report(f"Device inventory not found at {inventory_path}.")
         return []
+    if not files:
+        _report(f"No inventory files ({', '.join(INVENTORY_SUFFIXES)}) in {inventory_path}.")
+    return files
 
-    if parsed is None:
-        _report("Inventory file is empty.", logging.WARNING)
-        return []
-    if not isinstance(parsed, dict):
-        _report("Inventory file must contain a mapping with a 'devices' list.")
-        return []
 
-    parsed_dict = cast(Dict[str, Any], parsed)
-    raw_devices = parsed_dict.get("devices")
-    if not isinstance(raw_devices, list):
-        _report("Inventory file must define a 'devices' list.")
-        return []
+def _cache_path(inventory_path: Path) -> Path:
+    """Return where the compiled inventory for ``inventory_path`` is cached (internal)."""
+    if inventory_path.is_dir():
+        return inventory_path / ".inventory.cache"
+    return inventory_path.with_name(f".{inventory_path.name}.cache")
 
-    device_entries = cast(List[Any], raw_devices)
-    normalized: list["Device"] = []
-    for entry in device_entries:
-        if not isinstance(entry, dict):
-            _report("Skipping malformed device entry (not a mapping).", logging.WARNING)
-            continue
-
-        entry_dict = cast(Dict[str, Any], entry)
-        name = entry_dict.get("name")
-        ip_value = entry_dict.get("ip")
-        username = entry_dict.get("username")
-        if not name or not ip_value or not username:
-            _report(
-                "Skipping device entry; required keys 'name', 'ip', 'username' are mandatory.",
-                logging.WARNING,
-            )
-            continue
-
-        normalized.append(
-            {
-                "name": str(name),
-                "ip": str(ip_value),
-                "username": str(username),
-                "device_type": str(entry_dict.get("device_type", "cisco_ios")),
-            }
+
+def _signature(files: list[tuple[Path, os.stat_result]]) -> _Signature:
+    """Return the name, mtime and size of every inventory file (internal)."""
+    return tuple((file_path.name, stat.st_mtime_ns, stat.st_size) for file_path, stat in files)
+
+
+def _row(device: "Device") -> tuple[Any, ...]:
+    """Flatten a device into a cache row ordered like ``DEVICE_FIELDS`` (internal)."""
+    return tuple(
+        tuple(value) if isinstance(value, list) else value
+        for value in (device.get(field) for field in DEVICE_FIELDS)
+    )
+
+
+def _device_from_row(row: tuple[Any, ...]) -> "Device":
+    """Rebuild a ``Device`` dict from a cache row (internal)."""
+    return cast(
+        "Device",
+        {
+            key: list(value) if isinstance(value, tuple) else value
+            for key, value in zip(DEVICE_FIELDS, row)
+            if value is not None
+        },
+    )
+
+
+def _from_rows(rows: list[tuple[Any, ...]], compact: bool) -> list["Device"]:
+    """Turn cached field tuples into dicts or ``DeviceRecord`` objects (internal)."""
+    if compact:
+        return cast(List["Device"], [DeviceRecord(*row) for row in rows])
+    return [_device_from_row(row) for row in rows]
+
+
+def _parse_file(data: bytes, file_path: Path) -> Optional[list["Device"]]:
+    """Parse and validate one inventory file; None if it is unusable (internal)."""
+    try:
+        if file_path.suffix == ".csv":
+            entries = list(_csv_rows(io.StringIO(data.decode("utf-8-sig"), newline="")))
+        else:
+            entries = list(_yaml_entries(data))
+    except (yaml.YAMLError, UnicodeDecodeError, csv.Error) as exc:
+        _report(f"Unable to parse {file_path}: {exc}")
+        return None
+    except _InventoryFormatError as exc:
+        _report(f"{file_path}: {exc}", exc.level)
+        return None
+    return [device for device in map(_validate_entry, entries) if device is not None]
+
+
+def _validate_entry(entry: Any) -> Optional["Device"]:
+    """Normalize one raw inventory entry; None if it must be skipped (internal)."""
+    if not isinstance(entry, dict):
+        _report("Skipping malformed device entry (not a mapping).", logging.WARNING)
+        return None
+
+    entry_dict = cast(Dict[str, Any], entry)
+    name = entry_dict.get("name")
+    ip_value = entry_dict.get("ip")
+    username = entry_dict.get("username")
+    if not name or not ip_value or not username:
+        _report(
+            "Skipping device entry; required keys 'name', 'ip', 'username' are mandatory.",
+            logging.WARNING,
         )
-    return normalized
+        return None
+
+    device: "Device" = {
+        "name": str(name),
+        "ip": str(ip_value),
+        "username": str(username),
+        "device_type": str(entry_dict.get("device_type", "cisco_ios")),
+    }
+    for secret_key in ("password", "enable_secret"):
+        secret_value = entry_dict.get(secret_key)
+        if secret_value:
+            device[secret_key] = str(secret_value)  # type: ignore[literal-required]
+    port = entry_dict.get("port")
+    if port is not None:
+        try:
+            device["port"] = int(port)
+        except (TypeError, ValueError):
+            _report(f"Ignoring invalid port for device {name}.", logging.WARNING)
+    site = entry_dict.get("site")
+    if site:
+        device["site"] = str(site)
+    for label_key in ("groups", "tags"):
+        labels = _labels(entry_dict.get(label_key))
+        if labels:
+            device[label_key] = labels  # type: ignore[literal-required]
+    return device
+
+
+def _file_entries(file_path: Path) -> Iterator[Any]:
+    """Stream the raw entries of one inventory file, reporting parse errors (internal)."""
+    try:
+        if file_path.suffix == ".csv":
+            with file_path.open(encoding="utf-8-sig", newline="") as handle:
+                yield from _csv_rows(handle)
+        else:
+            with file_path.open("rb") as handle:
+                yield from _yaml_entries(handle)
+    except (yaml.YAMLError, UnicodeDecodeError, csv.Error) as exc:
+        _report(f"Unable to parse {file_path}: {exc}")
+    except _InventoryFormatError as exc:
+        _report(f"{file_path}: {exc}", exc.level)
+
+
+def _yaml_entries(source: Union[bytes, BinaryIO]) -> Iterator[Any]:
+    """Yield the ``devices`` entries of YAML as the parser reaches them (internal).
+
+    Each entry is composed and constructed on its own by the safe loader,
+    so tags, anchors, ``<<`` merge keys and int/bool/null scalars resolve
+    exactly as with ``yaml.safe_load`` while the rest of the list is still
+    unread. Top-level keys before ``devices`` are composed (and discarded)
+    so entries can refer to anchors defined there.
+    """
+    loader = _InventoryLoader(source)
+    try:
+        loader.get_event()  # StreamStart
+        if loader.check_event(yaml.StreamEndEvent):
+            raise _InventoryFormatError("Inventory file is empty.", logging.WARNING)
+        loader.get_event()  # DocumentStart
+        if not loader.check_event(yaml.MappingStartEvent):
+            raise _InventoryFormatError(
+                "Inventory file must contain a mapping with a 'devices' list."
+            )
+        loader.get_event()
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = loader.construct_document(loader.compose_node(None, None))
+            if key == "devices" and loader.check_event(yaml.SequenceStartEvent):
+                loader.get_event()
+                index = 0
+                while not loader.check_event(yaml.SequenceEndEvent):
+                    yield loader.construct_document(loader.compose_node(None, index))
+                    index += 1
+                return
+            loader.compose_node(None, None)
+        raise _InventoryFormatError("Inventory file must define a 'devices' list.")
+    finally:
+        loader.dispose()
+
+
+def _csv_rows(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+    """Turn CSV lines with a header row into entries, splitting labels on ';' (internal)."""
+    for row in csv.DictReader(lines):
+        entry: dict[str, Any] = {
+            key.strip(): value.strip()
+            for key, value in row.items()
+            if isinstance(key, str) and isinstance(value, str) and value.strip()
+        }
+        for label_key in ("groups", "tags"):
+            if label_key in entry:
+                entry[label_key] = [item.strip() for item in entry[label_key].split(";")]
+        yield entry
+
+
+def _labels(value: Any) -> list[str]:
+    """Normalize a ``groups``/``tags`` value (a name or list of names) (internal)."""
+    if value is None or value == "":
+        return []
+    items = value if isinstance(value, list) else [value]
+    return [str(item) for item in items if item not in (None, "")]
+
+
+def _read_inventory_cache(cache_path: Path) -> Optional[_InventoryCache]:
+    """Return the cached inventory if it is ours and readable (internal)."""
+    try:
+        if cache_path.stat().st_uid != os.getuid():
+            logger.warning("Ignoring inventory cache %s owned by another user", cache_path)
+            return None
+        with cache_path.open("rb") as handle:
+            cached = pickle.load(handle)
+    except FileNotFoundError:
+        return None
+    except Exception as exc:  # pragma: no cover - corrupt or incompatible cache
+        logger.debug("Ignoring unreadable inventory cache %s: %s", cache_path, exc)
+        return None
+    if not isinstance(cached, dict) or cached.get("version") != _CACHE_VERSION:
+        return None
+    return cast(_InventoryCache, cached)
+
+
+def _write_inventory_cache(
+    cache_path: Path, signature: _Signature, digest: str, rows: list[tuple[Any, ...]]
+) -> None:
+    """Atomically store the compiled inventory with owner-only permissions (internal)."""
+    payload: _InventoryCache = {
+        "version": _CACHE_VERSION,
+        "signature": signature,
+        "sha256": digest,
+        "rows": rows,
+    }
+    tmp_path = cache_path.with_name(f"{cache_path.name}.tmp{os.getpid()}")
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as handle:
+            pickle.dump(payload, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as exc:
+        logger.debug("Could not write inventory cache %s: %s", cache_path, exc)
 
 
 def get_global_settings() -> dict[str, Any]:
     """Return directory and behavior defaults sourced from the environment."""
     backups_dir = Path(os.getenv("BACKUPS_DIR", "backups"))
     logs_dir = Path(os.getenv("LOGS_DIR", "logs"))
+    transcripts_dir = os.getenv("TRANSCRIPTS_DIR", "").strip()
+    latency_report = os.getenv("LATENCY_REPORT", "").strip()
     default_ping_raw = os.getenv("DEFAULT_PING_COUNT", "5")
     try:
         default_ping_count = int(default_ping_raw)
@@ -98,12 +418,44 @@ def get_global_settings() -> dict[str, Any]:
         default_ping_count = 5
 
     return {
+        "inventory_path": os.getenv("INVENTORY_PATH", "devices.yaml"),
         "backups_dir": backups_dir,
         "logs_dir": logs_dir,
         "default_ping_count": default_ping_count,
+        "fleet_workers": _positive_int_env("FLEET_WORKERS", 10),
+        "backup_keyframe_interval": _positive_int_env("BACKUP_KEYFRAME_INTERVAL", 10),
+        "reconcile_config": _bool_env("RECONCILE_CONFIG", False),
+        "transcripts_dir": Path(transcripts_dir) if transcripts_dir else None,
+        "transcript_max_bytes": _positive_int_env("TRANSCRIPT_MAX_BYTES", 5_000_000),
+        "transcript_compress": _bool_env("TRANSCRIPT_COMPRESS", True),
+        "latency_report": Path(latency_report) if latency_report else None,
+        "metrics_textfile": os.getenv("METRICS_TEXTFILE", "").strip() or None,
     }
 
 
+def _positive_int_env(name: str, default: int) -> int:
+    """Read a positive integer setting, falling back to ``default`` (internal)."""
+    raw = os.getenv(name, str(default))
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        print(f"Invalid {name}; falling back to {default}.")
+        return default
+
+
+def _bool_env(name: str, default: bool) -> bool:
+    """Read a yes/no setting, falling back to ``default`` (internal)."""
+    raw = os.getenv(name, "").strip().lower()
+    if not raw:
+        return default
+    if raw in ("1", "true", "yes", "on"):
+        return True
+    if raw in ("0", "false", "no", "off"):
+        return False
+    print(f"Invalid {name}; falling back to {default}.")
+    return default
+
+
 def _report(message: str, level: int = logging.ERROR) -> None:
     """Print the message and emit it to the module logger."""
     print(message)
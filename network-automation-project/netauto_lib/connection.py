@@ -1,73 +1,425 @@
-"""Netmiko connection helpers."""
+"""Netmiko connection helpers and a reusable session pool."""
 from __future__ import annotations
 
+import functools
 import logging
-from getpass import getpass
-from typing import Any, Optional, TYPE_CHECKING, cast
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, TYPE_CHECKING, cast
 
-from netmiko import ConnectHandler  # type: ignore[import-untyped]
+from netauto_lib import latency, metrics
+from netauto_lib.credentials import (
+    CredentialError,
+    CredentialResolver,
+    Credentials,
+    default_resolver,
+)
+from netauto_lib.logging_setup import log_context
 
 if TYPE_CHECKING:
     from netauto_lib.utils import Device
 
-    class NetmikoAuthenticationException(BaseException):
-        ...
-
-    class NetmikoTimeoutException(BaseException):
-        ...
-else:
-    try:
-        from netmiko.ssh_exception import (  # type: ignore[import-untyped]
-            NetmikoAuthenticationException,
-            NetmikoTimeoutException,
-        )
-    except ModuleNotFoundError:  # Netmiko >= 4.3 relocated exceptions
-        from netmiko.exceptions import (  # type: ignore[import-untyped]
-            NetmikoAuthenticationException,
-            NetmikoTimeoutException,
-        )
-
 logger = logging.getLogger(__name__)
 
 
-def build_connection_params(device: "Device", password: str) -> dict[str, Any]:
+def build_connection_params(
+    device: "Device", password: str, secret: Optional[str] = None
+) -> dict[str, Any]:
     """Return keyword arguments for Netmiko ConnectHandler."""
     host_value = device.get("ip") or device.get("host")
     if not host_value:
         raise ValueError("Device entry must include an 'ip' value.")
-    return {
+    params: dict[str, Any] = {
         "device_type": device.get("device_type", "cisco_ios"),
         "host": host_value,
         "username": device.get("username"),
         "password": password,
     }
+    if secret:
+        params["secret"] = secret
+    if device.get("port"):
+        params["port"] = device["port"]
+    return params
 
 
-def connect_to_device(device: "Device") -> Optional[Any]:
-    """Prompt for missing credentials and establish a Netmiko session.
+def connect_to_device(
+    device: "Device", credentials: Optional[Credentials] = None
+) -> Optional[Any]:
+    """Resolve credentials and establish a Netmiko session.
 
     Returns an active Netmiko connection on success, otherwise ``None`` after
     logging the failure. Netmiko timeout/authentication exceptions are caught
-    so callers can handle connection issues gracefully.
+    so callers can handle connection issues gracefully. Without explicit
+    ``credentials`` the shared resolver is consulted, which reads the
+    inventory and environment before falling back to a prompt.
     """
-    username = device.get("username")
-    if not username:
-        username = input("Device username: ").strip()
-        logger.warning("Prompted user for missing username on device %s", device.get("name"))
-    username = str(username)
-    password = getpass(f"Password for {username}: ")
-
-    enriched = cast("Device", {**device, "username": username})
-    params = build_connection_params(enriched, password)
+    metrics.inc("netauto_devices_attempted_total")
+    with log_context(
+        device=device.get("name"),
+        ip=device.get("ip"),
+        device_type=device.get("device_type", "cisco_ios"),
+        operation="connect",
+    ), latency.timed("connect"):
+        try:
+            connection = _connect(device, credentials)
+        except Exception as exc:
+            metrics.record_connect_failure(exc)
+            raise
+    if connection is not None:
+        metrics.inc("netauto_devices_connected_total")
+    return connection
+
+
+def _connect(device: "Device", credentials: Optional[Credentials]) -> Optional[Any]:
+    """Body of ``connect_to_device``, run inside its log context (internal)."""
+    if credentials is None:
+        try:
+            credentials = default_resolver.resolve(device)
+        except CredentialError as exc:
+            metrics.record_connect_failure(exc)
+            print(f"Unable to connect to {device.get('name', 'device')}: {exc}")
+            logger.error("Credential lookup failed for %s: %s", device.get("name"), exc)
+            return None
+
+    enriched = cast("Device", {**device, "username": credentials.username})
+    params = build_connection_params(enriched, credentials.password, credentials.secret)
     host_display = str(params.get("host", "unknown"))
     device_name = device.get("name", host_display)
     print(f"Connecting to {device_name} ({host_display}) ...")
+    connect_handler, connect_errors = _load_netmiko()
     try:
-        connection = ConnectHandler(**params)
+        connection = connect_handler(**params, auto_connect=False)
+        _open_timed(connection)
+        if credentials.secret and not connection.check_enable_mode():
+            with latency.timed("enable"):
+                connection.enable()
         print(f"Connected to {host_display}.")
         logger.info("Connected to %s", host_display)
         return connection
-    except (NetmikoTimeoutException, NetmikoAuthenticationException) as exc:  # type: ignore[misc]
+    except connect_errors as exc:
+        metrics.record_connect_failure(exc)
         print(f"Unable to connect to {host_display}: {exc}")
-        logger.error("Failed connecting to %s: %s", host_display, exc)  # type: ignore[arg-type]
+        logger.error("Failed connecting to %s: %s", host_display, exc)
         return None
+
+
+def _open_timed(connection: Any) -> None:
+    """Open a Netmiko session created with ``auto_connect=False``, timing each phase (internal).
+
+    Mirrors ``BaseConnection._open()``: login covers the TCP connect and
+    authentication, prompt covers session preparation (prompt discovery,
+    terminal width and paging).
+    """
+    try:
+        with latency.timed("login"):
+            connection._modify_connection_params()
+            connection.establish_connection()
+        with latency.timed("prompt"):
+            connection._try_session_preparation()
+    except BaseException:
+        _disconnect_quietly(connection)
+        raise
+
+
+@functools.lru_cache(maxsize=None)
+def _load_netmiko() -> tuple[Callable[..., Any], tuple[type[BaseException], ...]]:
+    """Import Netmiko on first use; return ConnectHandler and its login errors (internal).
+
+    Netmiko pulls in paramiko and cryptography, which dominate start-up time,
+    so commands that never open a session never import it.
+    """
+    from netmiko import ConnectHandler  # type: ignore[import-untyped]
+
+    try:
+        from netmiko.ssh_exception import (  # type: ignore[import-untyped]
+            NetmikoAuthenticationException,
+            NetmikoTimeoutException,
+        )
+    except ModuleNotFoundError:  # Netmiko >= 4.3 relocated exceptions
+        from netmiko.exceptions import (  # type: ignore[import-untyped]
+            NetmikoAuthenticationException,
+            NetmikoTimeoutException,
+        )
+    return ConnectHandler, (NetmikoTimeoutException, NetmikoAuthenticationException)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled session becomes available in time."""
+
+
+class _PooledSession:
+    """Bookkeeping wrapper around one live connection (internal)."""
+
+    __slots__ = ("conn", "key", "created", "last_used", "last_checked")
+
+    def __init__(self, conn: Any, key: tuple[str, int, str]) -> None:
+        self.conn = conn
+        self.key = key
+        self.created = time.monotonic()
+        self.last_used = self.created
+        self.last_checked = self.created
+
+
+class SessionPool:
+    """Keep authenticated sessions alive and hand them out for reuse.
+
+    Sessions are keyed by ``(host, port, username)``. At most
+    ``max_per_host`` sessions exist per key and ``max_total`` overall; callers
+    block until a slot frees up. Idle sessions older than ``idle_timeout``
+    seconds are closed, and sessions idle longer than ``keepalive_interval``
+    are probed with ``is_alive()`` before being handed out again. A
+    background thread performs the same probing and eviction periodically.
+    """
+
+    def __init__(
+        self,
+        max_per_host: int = 1,
+        max_total: int = 50,
+        idle_timeout: float = 300.0,
+        keepalive_interval: float = 60.0,
+        resolver: Optional[CredentialResolver] = None,
+        connector: Optional[Callable[["Device", Credentials], Optional[Any]]] = None,
+    ) -> None:
+        self.max_per_host = max(1, max_per_host)
+        self.max_total = max(1, max_total)
+        self.idle_timeout = idle_timeout
+        self.keepalive_interval = keepalive_interval
+        self.resolver = resolver or default_resolver
+        self._connector = connector or connect_to_device
+        self._idle: dict[tuple[str, int, str], list[_PooledSession]] = {}
+        self._in_use: dict[int, _PooledSession] = {}
+        self._per_host: dict[tuple[str, int, str], int] = {}
+        self._total = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stop = threading.Event()
+        self._reaper: Optional[threading.Thread] = None
+        if keepalive_interval > 0:
+            self._reaper = threading.Thread(
+                target=self._reap_loop, name="netauto-pool-keepalive", daemon=True
+            )
+            self._reaper.start()
+
+    @contextmanager
+    def session(self, device: "Device", timeout: Optional[float] = None) -> Iterator[Any]:
+        """Yield a pooled connection for ``device`` and return it afterwards.
+
+        The session is discarded instead of returned if the block raises.
+        """
+        conn = self.acquire(device, timeout)
+        try:
+            yield conn
+        except BaseException:
+            self.release(conn, discard=True)
+            raise
+        self.release(conn)
+
+    def acquire(self, device: "Device", timeout: Optional[float] = None) -> Any:
+        """Return a live connection for ``device``, opening one if needed.
+
+        Raises ``PoolTimeoutError`` when limits stay saturated past ``timeout``
+        and ``ConnectionError`` when a new session cannot be established.
+        """
+        credentials = self.resolver.resolve(device)
+        key = self._key(device, credentials.username)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        evicted: Optional[_PooledSession] = None
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Session pool is closed.")
+                pooled = self._take_idle(key)
+                if pooled is not None:
+                    break
+                if self._per_host.get(key, 0) < self.max_per_host:
+                    if self._total >= self.max_total:
+                        evicted = self._evict_oldest_idle()
+                    if self._total < self.max_total:
+                        self._per_host[key] = self._per_host.get(key, 0) + 1
+                        self._total += 1
+                        break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise PoolTimeoutError(f"No session available for {key[0]} within {timeout}s")
+                self._cond.wait(remaining)
+
+        if evicted is not None:
+            _disconnect_quietly(evicted.conn)
+        if pooled is not None:
+            if self._probe(pooled):
+                return self._check_out(pooled)
+            self._forget(pooled)
+            return self.acquire(device, timeout)
+
+        try:
+            conn = self._connector(device, credentials)
+        except Exception:
+            self._release_slot(key)
+            raise
+        if conn is None:
+            self._release_slot(key)
+            raise ConnectionError(f"Unable to connect to {device.get('name', key[0])}")
+        logger.info("Pool opened new session to %s", key[0])
+        return self._check_out(_PooledSession(conn, key))
+
+    def release(self, conn: Any, discard: bool = False) -> None:
+        """Return ``conn`` to the pool, or close it when ``discard`` is set."""
+        with self._cond:
+            pooled = self._in_use.pop(id(conn), None)
+            if pooled is None:
+                return
+            if not discard and not self._closed:
+                pooled.last_used = time.monotonic()
+                self._idle.setdefault(pooled.key, []).append(pooled)
+                self._cond.notify()
+                return
+        self._forget(pooled)
+
+    def evict_idle(self) -> int:
+        """Close idle sessions past ``idle_timeout`` and return how many were closed."""
+        cutoff = time.monotonic() - self.idle_timeout
+        expired: list[_PooledSession] = []
+        with self._cond:
+            for key, sessions in list(self._idle.items()):
+                keep = [pooled for pooled in sessions if pooled.last_used >= cutoff]
+                expired.extend(pooled for pooled in sessions if pooled.last_used < cutoff)
+                if keep:
+                    self._idle[key] = keep
+                else:
+                    del self._idle[key]
+        for pooled in expired:
+            self._forget(pooled)
+        if expired:
+            logger.info("Evicted %d idle pooled sessions", len(expired))
+        return len(expired)
+
+    def close_all(self) -> None:
+        """Stop the keepalive thread, disconnect idle sessions and refuse new acquisitions.
+
+        Sessions still checked out are disconnected when they are released.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._stop.set()
+        if self._reaper is not None and self._reaper is not threading.current_thread():
+            self._reaper.join()
+        with self._cond:
+            idle = [pooled for sessions in self._idle.values() for pooled in sessions]
+            self._idle.clear()
+        for pooled in idle:
+            self._forget(pooled)
+
+    def stats(self) -> dict[str, int]:
+        """Return counts of open, idle and in-use sessions."""
+        with self._cond:
+            idle = sum(len(sessions) for sessions in self._idle.values())
+            return {"open": self._total, "idle": idle, "in_use": len(self._in_use)}
+
+    @staticmethod
+    def _key(device: "Device", username: str) -> tuple[str, int, str]:
+        """Return the pool key for a device (internal)."""
+        host = str(device.get("ip") or device.get("host") or "")
+        return host, int(device.get("port") or 0), username
+
+    def _take_idle(self, key: tuple[str, int, str]) -> Optional[_PooledSession]:
+        """Pop the most recently used idle session for ``key`` (internal, locked)."""
+        sessions = self._idle.get(key)
+        if not sessions:
+            return None
+        pooled = sessions.pop()
+        if not sessions:
+            del self._idle[key]
+        return pooled
+
+    def _evict_oldest_idle(self) -> Optional[_PooledSession]:
+        """Drop the least recently used idle session from the books (internal, locked).
+
+        The caller disconnects the returned session after releasing the lock.
+        """
+        oldest: Optional[_PooledSession] = None
+        for sessions in self._idle.values():
+            for pooled in sessions:
+                if oldest is None or pooled.last_used < oldest.last_used:
+                    oldest = pooled
+        if oldest is None:
+            return None
+        self._idle[oldest.key].remove(oldest)
+        if not self._idle[oldest.key]:
+            del self._idle[oldest.key]
+        self._per_host[oldest.key] -= 1
+        if not self._per_host[oldest.key]:
+            del self._per_host[oldest.key]
+        self._total -= 1
+        return oldest
+
+    def _check_out(self, pooled: _PooledSession) -> Any:
+        """Mark ``pooled`` as in use and return its connection (internal)."""
+        with self._cond:
+            pooled.last_used = time.monotonic()
+            self._in_use[id(pooled.conn)] = pooled
+        return pooled.conn
+
+    def _needs_probe(self, pooled: _PooledSession, now: float) -> bool:
+        """Return True if ``pooled`` has been quiet past the keepalive interval (internal)."""
+        return now - max(pooled.last_used, pooled.last_checked) >= self.keepalive_interval
+
+    def _probe(self, pooled: _PooledSession) -> bool:
+        """Return True if a session idle past the keepalive interval still responds (internal)."""
+        if not self._needs_probe(pooled, time.monotonic()):
+            return True
+        try:
+            alive = bool(pooled.conn.is_alive())
+        except Exception:  # pragma: no cover - transport specific failures
+            alive = False
+        pooled.last_checked = time.monotonic()
+        return alive
+
+    def _forget(self, pooled: _PooledSession) -> None:
+        """Disconnect ``pooled`` and free its slot (internal)."""
+        _disconnect_quietly(pooled.conn)
+        self._release_slot(pooled.key)
+
+    def _release_slot(self, key: tuple[str, int, str]) -> None:
+        """Decrement slot counters for ``key`` and wake waiters (internal)."""
+        with self._cond:
+            self._per_host[key] = self._per_host.get(key, 1) - 1
+            if self._per_host[key] <= 0:
+                del self._per_host[key]
+            self._total -= 1
+            self._cond.notify_all()
+
+    def _reap_loop(self) -> None:
+        """Periodically evict idle sessions and probe keepalives (internal)."""
+        while not self._stop.wait(self.keepalive_interval):
+            self.evict_idle()
+            now = time.monotonic()
+            with self._cond:
+                stale: list[_PooledSession] = []
+                for key, sessions in list(self._idle.items()):
+                    fresh = [p for p in sessions if not self._needs_probe(p, now)]
+                    stale.extend(p for p in sessions if self._needs_probe(p, now))
+                    if fresh:
+                        self._idle[key] = fresh
+                    else:
+                        del self._idle[key]
+            for pooled in stale:
+                if self._probe(pooled):
+                    with self._cond:
+                        if not self._closed:
+                            self._idle.setdefault(pooled.key, []).append(pooled)
+                            self._cond.notify()
+                            continue
+                else:
+                    logger.info("Dropping dead pooled session to %s", pooled.key[0])
+                self._forget(pooled)
+
+
+def _disconnect_quietly(conn: Any) -> None:
+    """Disconnect ``conn`` ignoring transport errors (internal)."""
+    try:
+        with latency.timed("disconnect"):
+            conn.disconnect()
+    except Exception:  # pragma: no cover - best effort teardown
+        logger.debug("Disconnect failed during pool cleanup")
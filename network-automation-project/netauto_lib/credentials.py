@@ -0,0 +1,115 @@
+"""Credential resolution for device sessions.
+
+Credentials are looked up in this order:
+
+1. ``password`` / ``enable_secret`` keys on the inventory entry.
+2. An in-memory cache keyed by username (filled by earlier lookups).
+3. ``NETAUTO_USERNAME`` / ``NETAUTO_PASSWORD`` / ``NETAUTO_ENABLE_SECRET``
+   from the environment (``.env`` is loaded by ``config_loader.load_env``).
+4. An interactive ``getpass`` prompt, only when the resolver allows it.
+
+Fleet runs call ``resolve_all`` once before any worker starts so parallel
+connections never wait on a terminal prompt.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from getpass import getpass
+from typing import TYPE_CHECKING, Iterable, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    from netauto_lib.utils import Device
+
+logger = logging.getLogger(__name__)
+
+
+class CredentialError(Exception):
+    """Raised when credentials cannot be resolved without prompting."""
+
+
+class Credentials(NamedTuple):
+    """Login material for one device session."""
+
+    username: str
+    password: str
+    secret: Optional[str] = None
+
+
+class CredentialResolver:
+    """Resolve and cache credentials for inventory devices."""
+
+    def __init__(self, interactive: bool = True) -> None:
+        self.interactive = interactive
+        self._cache: dict[str, Credentials] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, device: "Device") -> Credentials:
+        """Return credentials for ``device``, prompting only if allowed."""
+        with self._lock:
+            return self._resolve_locked(device)
+
+    def resolve_all(self, devices: Iterable["Device"]) -> dict[str, Credentials]:
+        """Resolve every device up front, keyed by device name.
+
+        Devices whose credentials cannot be resolved are left out and logged.
+        """
+        resolved: dict[str, Credentials] = {}
+        for device in devices:
+            name = device.get("name", "unknown")
+            try:
+                resolved[name] = self.resolve(device)
+            except CredentialError as exc:
+                logger.error("No credentials for %s: %s", name, exc)
+        return resolved
+
+    def remember(self, credentials: Credentials) -> None:
+        """Store ``credentials`` in the cache for later devices with that username."""
+        with self._lock:
+            self._cache[credentials.username] = credentials
+
+    def _resolve_locked(self, device: "Device") -> Credentials:
+        """Apply the lookup order described in the module docstring (internal)."""
+        username = device.get("username") or os.getenv("NETAUTO_USERNAME") or ""
+        if not username:
+            username = self._prompt(device, "Device username: ", secret=False)
+        username = str(username)
+
+        device_password = device.get("password")
+        device_secret = device.get("enable_secret")
+        if device_password:
+            return Credentials(username, str(device_password), device_secret or self._env_secret())
+
+        cached = self._cache.get(username)
+        if cached is not None:
+            return cached._replace(secret=device_secret or cached.secret)
+
+        env_user = os.getenv("NETAUTO_USERNAME")
+        env_password = os.getenv("NETAUTO_PASSWORD")
+        if env_password and (not env_user or env_user == username):
+            credentials = Credentials(username, env_password, device_secret or self._env_secret())
+        else:
+            password = self._prompt(device, f"Password for {username}: ", secret=True)
+            credentials = Credentials(username, password, device_secret or self._env_secret())
+
+        self._cache[username] = credentials
+        return credentials
+
+    def _prompt(self, device: "Device", prompt_text: str, secret: bool) -> str:
+        """Prompt on the terminal or fail when running non-interactively (internal)."""
+        name = device.get("name", "unknown")
+        if not self.interactive:
+            raise CredentialError(f"'{prompt_text.rstrip(': ')}' not available for {name}")
+        logger.warning("Prompting for credentials for device %s", name)
+        if secret:
+            return getpass(prompt_text)
+        return input(prompt_text).strip()
+
+    @staticmethod
+    def _env_secret() -> Optional[str]:
+        """Return the enable secret from the environment, if set (internal)."""
+        return os.getenv("NETAUTO_ENABLE_SECRET") or None
+
+
+default_resolver = CredentialResolver()
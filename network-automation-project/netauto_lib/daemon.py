@@ -0,0 +1,311 @@
+"""Long-running NetAuto daemon serving operations over a Unix domain socket.
+
+The daemon keeps the parsed inventory and a ``SessionPool`` in memory, so
+repeated requests skip interpreter start-up, Netmiko import, inventory
+parsing and device login. Clients send one JSON object per line::
+
+    {"method": "backup", "params": {"device": "R1"}}
+
+and receive one JSON object per line in reply. Device operations return
+one entry per target device, so a failure on one device does not fail the
+request::
+
+    {"ok": true, "result": {"R1": {"ok": true, "result": "backups/objects/3f/3fa2...",
+                                   "error": null}}}
+    {"ok": false, "error": "Unknown device 'R9'"}
+
+``netautoctl.py`` is the matching stdlib-only client.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import socketserver
+import stat
+import threading
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from netauto_lib import operations
+from netauto_lib.connection import SessionPool
+from netauto_lib.credentials import CredentialResolver
+from netauto_lib.fleet import (
+    FleetAction,
+    backup_action,
+    config_action,
+    ping_action,
+    run_fleet,
+    show_interfaces_action,
+)
+from netauto_lib.inventory import Inventory, SelectorError, load_inventory
+from netauto_lib.latency import process_latency
+from netauto_lib.logging_setup import logging_stats
+from netauto_lib.transcripts import transcript_stats
+from netauto_lib.utils import Device
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = "netauto.sock"
+
+
+class RequestError(Exception):
+    """Raised for malformed requests; reported to the client verbatim."""
+
+
+class NetAutoDaemon:
+    """Hold inventory and pooled sessions and dispatch RPC methods."""
+
+    def __init__(
+        self,
+        inventory_path: str,
+        settings: dict[str, Any],
+        pool: Optional[SessionPool] = None,
+    ) -> None:
+        self.inventory_path = inventory_path
+        self.settings = settings
+        self.pool = pool or SessionPool(
+            max_total=int(settings.get("fleet_workers", 10)) * 2,
+            resolver=CredentialResolver(interactive=False),
+        )
+        self.inventory = Inventory(())
+        self._methods: dict[str, Callable[[dict[str, Any]], Any]] = {
+            "status": self._status,
+            "devices": self._devices,
+            "reload": self._reload,
+            "backup": self._backup,
+            "show_interfaces": self._show_interfaces,
+            "ping": self._ping,
+            "set_interface": self._set_interface,
+            "ospf": self._ospf,
+            "push_config": self._push_config,
+        }
+        self.reload_inventory()
+
+    def reload_inventory(self) -> int:
+        """Re-read the inventory file and return the device count."""
+        self.inventory = load_inventory(self.inventory_path, compact=True)
+        logger.info("Daemon inventory loaded: %d devices", len(self.inventory))
+        return len(self.inventory)
+
+    def handle(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Dispatch one decoded request and return the reply object."""
+        method = request.get("method")
+        params = request.get("params") or {}
+        handler = self._methods.get(str(method))
+        if handler is None:
+            return {"ok": False, "error": f"Unknown method '{method}'"}
+        if not isinstance(params, dict):
+            return {"ok": False, "error": "'params' must be an object"}
+        try:
+            return {"ok": True, "result": handler(params)}
+        except (RequestError, ValueError) as exc:
+            return {"ok": False, "error": str(exc)}
+        except Exception as exc:  # pragma: no cover - surfaced to the client
+            logger.exception("Daemon method %s failed", method)
+            return {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+
+    def serve(self, socket_path: str = DEFAULT_SOCKET_PATH) -> None:
+        """Listen on ``socket_path`` until a ``shutdown`` request arrives.
+
+        A socket left behind by a daemon that died is replaced; RuntimeError
+        is raised if another daemon still answers on it or the path is not a
+        socket.
+        """
+        path = Path(socket_path)
+        _remove_stale_socket(path)
+        server = _DaemonServer(str(path), _RequestHandler, self)
+        os.chmod(path, 0o600)
+        logger.info("NetAuto daemon listening on %s", path)
+        print(f"NetAuto daemon listening on {path}")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            self.pool.close_all()
+            if path.exists():
+                path.unlink()
+            logger.info("NetAuto daemon stopped.")
+
+    def _status(self, params: dict[str, Any]) -> dict[str, Any]:
+        """Return pool, logging, transcript and latency figures (internal)."""
+        return {
+            "devices": len(self.inventory),
+            "pid": os.getpid(),
+            **self.pool.stats(),
+            "logging": logging_stats(),
+            "transcripts": transcript_stats(),
+            "latency": {
+                phase: histogram.to_dict()
+                for phase, histogram in process_latency().by_phase().items()
+            },
+        }
+
+    def _devices(self, params: dict[str, Any]) -> list[dict[str, Any]]:
+        """List inventory devices, optionally filtered by ``device`` (internal)."""
+        return [
+            {"name": device["name"], "ip": device["ip"], "device_type": device["device_type"]}
+            for device in (self._targets(params) if "device" in params else self.inventory)
+        ]
+
+    def _reload(self, params: dict[str, Any]) -> int:
+        """Re-read the inventory and return the device count (internal)."""
+        return self.reload_inventory()
+
+    def _backup(self, params: dict[str, Any]) -> Any:
+        """Back up the running-config of the requested devices (internal)."""
+        return self._run(params, backup_action(str(self.settings["backups_dir"])))
+
+    def _show_interfaces(self, params: dict[str, Any]) -> Any:
+        """Return 'show ip interface brief' from the requested devices (internal)."""
+        return self._run(params, show_interfaces_action())
+
+    def _ping(self, params: dict[str, Any]) -> Any:
+        """Ping ``destination`` from the requested devices (internal)."""
+        destination = operations.validate_ipv4(_require(params, "destination"))
+        repeat = operations.validate_positive_int(
+            params.get("repeat", self.settings.get("default_ping_count", 5))
+        )
+        return self._run(params, ping_action(destination, repeat))
+
+    def _set_interface(self, params: dict[str, Any]) -> Any:
+        """Assign an IPv4 address to an interface on the requested devices (internal)."""
+        commands = operations.interface_commands(
+            operations.validate_interface_name(_require(params, "interface")),
+            operations.validate_ipv4(_require(params, "ip")),
+            operations.validate_subnet_mask(_require(params, "mask")),
+        )
+        return self._run(
+            params, config_action(commands, "interface configuration", self._reconcile(params))
+        )
+
+    def _ospf(self, params: dict[str, Any]) -> Any:
+        """Configure a basic OSPF process on the requested devices (internal)."""
+        commands = operations.ospf_commands(
+            operations.validate_positive_int(_require(params, "process_id")),
+            operations.validate_ipv4(_require(params, "router_id")),
+            operations.validate_ipv4(_require(params, "network")),
+            operations.validate_wildcard_mask(_require(params, "wildcard")),
+            operations.validate_area(_require(params, "area")),
+        )
+        return self._run(
+            params, config_action(commands, "OSPF configuration", self._reconcile(params))
+        )
+
+    def _push_config(self, params: dict[str, Any]) -> Any:
+        """Push a list of configuration ``commands`` to the requested devices (internal)."""
+        commands = params.get("commands")
+        if not isinstance(commands, list) or not all(isinstance(c, str) for c in commands):
+            raise RequestError("'commands' must be a list of strings")
+        return self._run(
+            params, config_action(commands, reconcile=self._reconcile(params))
+        )
+
+    def _reconcile(self, params: dict[str, Any]) -> bool:
+        """Return the request's ``reconcile`` flag, defaulting to the setting (internal)."""
+        reconcile = params.get("reconcile")
+        if reconcile is None:
+            return bool(self.settings.get("reconcile_config", False))
+        if not isinstance(reconcile, bool):
+            raise RequestError("'reconcile' must be true or false")
+        return reconcile
+
+    def _run(self, params: dict[str, Any], action: FleetAction) -> dict[str, Any]:
+        """Run ``action`` on the requested devices through the pool (internal)."""
+        targets = self._targets(params)
+        summary = run_fleet(
+            targets,
+            action,
+            workers=int(self.settings.get("fleet_workers", 10)),
+            pool=self.pool,
+        )
+        return {
+            result.name: {
+                "ok": result.ok,
+                "result": _jsonable(result.result),
+                "error": result.error,
+            }
+            for result in summary.results
+        }
+
+    def _targets(self, params: dict[str, Any]) -> list[Device]:
+        """Resolve ``device`` (names, selectors or "all", alone or in a list) (internal)."""
+        selector = params.get("device")
+        selectors = selector if isinstance(selector, list) else [selector]
+        if not selectors or not all(isinstance(item, str) and item for item in selectors):
+            raise RequestError("'device' must be a name or selector, a list of them, or 'all'")
+        try:
+            return self.inventory.select(*selectors)
+        except SelectorError as exc:
+            raise RequestError(str(exc)) from None
+
+
+class _DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded Unix socket server carrying a daemon reference (internal)."""
+
+    daemon_threads = True
+
+    def __init__(self, address: str, handler: type, daemon: NetAutoDaemon) -> None:
+        self.netauto = daemon
+        super().__init__(address, handler)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Read JSON requests line by line and write JSON replies (internal)."""
+
+    server: _DaemonServer
+
+    def handle(self) -> None:
+        """Answer every request line sent on the connection (internal)."""
+        for raw in self.rfile:
+            if not raw.strip():
+                continue
+            try:
+                request = json.loads(raw)
+            except json.JSONDecodeError as exc:
+                reply: dict[str, Any] = {"ok": False, "error": f"Invalid JSON: {exc}"}
+            else:
+                if not isinstance(request, dict):
+                    reply = {"ok": False, "error": "Request must be a JSON object"}
+                elif request.get("method") == "shutdown":
+                    reply = {"ok": True, "result": "shutting down"}
+                    threading.Thread(target=self.server.shutdown, daemon=True).start()
+                else:
+                    reply = self.server.netauto.handle(request)
+            self.wfile.write(json.dumps(reply).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+def _remove_stale_socket(path: Path) -> None:
+    """Unlink ``path`` if it is a socket nobody is listening on (internal)."""
+    try:
+        mode = path.lstat().st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise RuntimeError(f"{path} exists and is not a socket; refusing to replace it")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(str(path))
+        except (ConnectionRefusedError, FileNotFoundError):
+            pass
+        else:
+            raise RuntimeError(f"Another NetAuto daemon is already listening on {path}")
+    logger.info("Removing stale daemon socket %s", path)
+    path.unlink()
+
+
+def _require(params: dict[str, Any], key: str) -> str:
+    """Return a required parameter as a string (internal)."""
+    value = params.get(key)
+    if value is None or value == "":
+        raise RequestError(f"Missing parameter '{key}'")
+    return str(value)
+
+
+def _jsonable(value: Any) -> Any:
+    """Convert results such as ``Path`` into JSON-friendly values (internal)."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
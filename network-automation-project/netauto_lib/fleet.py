@@ -0,0 +1,387 @@
+"""Concurrent execution of operations across the device inventory.
+
+A fleet run opens one session per device inside a bounded thread pool and
+applies a single action to each session. Failures are recorded per device
+instead of aborting the run, so wall-clock time is bounded by the slowest
+device rather than the sum of all devices.
+
+``run_fleet_async`` drives the same kind of run from one asyncio event loop
+using the sessions in ``async_transport``, which scales to thousands of
+devices without a thread per session.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable, Optional, Sequence
+
+from netauto_lib import latency, metrics, operations
+from netauto_lib.config_diff import missing_commands
+from netauto_lib.connection import SessionPool, connect_to_device
+from netauto_lib.credentials import (
+    CredentialError,
+    CredentialResolver,
+    Credentials,
+    default_resolver,
+)
+from netauto_lib.ios_config import parse_config
+from netauto_lib.latency import LatencyRecorder
+from netauto_lib.logging_setup import log_context
+from netauto_lib.utils import Device
+
+if TYPE_CHECKING:
+    import asyncio
+
+    from netauto_lib.async_transport import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 10
+DEFAULT_ASYNC_CONCURRENCY = 500
+
+FleetAction = Callable[[Any, Device], Any]
+AsyncFleetAction = Callable[["AsyncSession", Device], Awaitable[Any]]
+
+
+@dataclass
+class DeviceResult:
+    """Outcome of running a fleet action against one device."""
+
+    name: str
+    ip: str
+    ok: bool
+    result: Any = None
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+
+@dataclass
+class FleetSummary:
+    """Aggregated results of a fleet run."""
+
+    results: list[DeviceResult] = field(default_factory=list)
+    elapsed: float = 0.0
+    latency: LatencyRecorder = field(default_factory=LatencyRecorder)
+
+    @property
+    def succeeded(self) -> list[DeviceResult]:
+        """Results for devices where the action completed."""
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self) -> list[DeviceResult]:
+        """Results for devices that could not be reached or errored."""
+        return [result for result in self.results if not result.ok]
+
+
+def run_fleet(
+    devices: Iterable[Device],
+    action: FleetAction,
+    workers: int = DEFAULT_WORKERS,
+    resolver: Optional[CredentialResolver] = None,
+    pool: Optional[SessionPool] = None,
+) -> FleetSummary:
+    """Run ``action`` on every device using at most ``workers`` sessions.
+
+    Credentials for a list of devices are resolved for the whole fleet before
+    any worker starts so worker threads never block on a terminal prompt.
+    Any other iterable, such as ``config_loader.iter_devices()``, is
+    consumed lazily: each device is resolved and submitted as soon as it is
+    produced, so sessions start while the rest of the inventory is still
+    being read. When ``pool`` is given, sessions are borrowed from it and
+    stay open after the run.
+    """
+    if pool is not None:
+        resolver = pool.resolver
+    resolver = resolver or default_resolver
+    workers = max(1, workers)
+    pending: Iterable[tuple[Device, Optional[Credentials]]]
+    if isinstance(devices, Sequence):
+        credentials = resolver.resolve_all(devices)
+        logger.info("Starting fleet run on %d devices with %d workers", len(devices), workers)
+        pending = ((device, credentials.get(device.get("name", ""))) for device in devices)
+    else:
+        logger.info("Starting streaming fleet run with %d workers", workers)
+        pending = ((device, _resolve_one(resolver, device)) for device in devices)
+
+    started = time.monotonic()
+    summary = FleetSummary()
+    with latency.recording() as recorder, ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="netauto-fleet"
+    ) as executor:
+        futures = [
+            # A copied context carries log_context() fields such as job_id, and the
+            # run's latency recorder, into the worker.
+            executor.submit(
+                contextvars.copy_context().run,
+                _run_on_device,
+                device,
+                action,
+                device_credentials,
+                pool,
+            )
+            for device, device_credentials in pending
+        ]
+        summary.results = [future.result() for future in futures]
+    summary.latency = recorder
+
+    summary.elapsed = time.monotonic() - started
+    metrics.record_fleet_run(summary)
+    logger.info(
+        "Fleet run finished in %.2fs: %d succeeded, %d failed",
+        summary.elapsed,
+        len(summary.succeeded),
+        len(summary.failed),
+    )
+    return summary
+
+
+def run_fleet_async(
+    devices: Iterable[Device],
+    action: AsyncFleetAction,
+    concurrency: int = DEFAULT_ASYNC_CONCURRENCY,
+    resolver: Optional[CredentialResolver] = None,
+) -> FleetSummary:
+    """Run an async ``action`` on every device from a single event loop.
+
+    At most ``concurrency`` sessions are open at once. Transports are chosen
+    per ``device_type`` by ``async_transport.session_class_for``.
+    """
+    device_list = list(devices)
+    credentials = (resolver or default_resolver).resolve_all(device_list)
+    # Imported here so CLI paths that never run async fleets skip asyncio start-up.
+    import asyncio
+
+    with latency.recording() as recorder:
+        summary = asyncio.run(
+            _run_fleet_async(device_list, action, max(1, concurrency), credentials)
+        )
+    summary.latency = recorder
+    metrics.record_fleet_run(summary)
+    return summary
+
+
+def print_summary(summary: FleetSummary) -> None:
+    """Print a per-device table of fleet results, then where the time went."""
+    print(f"\nFleet run completed in {summary.elapsed:.2f}s")
+    for result in summary.results:
+        status = "OK" if result.ok else f"FAILED: {result.error}"
+        print(f"  {result.name} ({result.ip}) [{result.elapsed:.2f}s] {status}")
+    print(f"{len(summary.succeeded)} succeeded, {len(summary.failed)} failed.")
+    latency.print_latency_summary(summary.latency)
+
+
+def backup_action(backups_dir: str) -> FleetAction:
+    """Return an action that backs up each device's running-config."""
+
+    def action(conn: Any, device: Device) -> Any:
+        return operations.backup_config(conn, device.get("name", "router"), backups_dir)
+
+    return action
+
+
+def show_interfaces_action() -> FleetAction:
+    """Return an action that captures 'show ip interface brief'."""
+
+    def action(conn: Any, device: Device) -> Any:
+        return operations.fetch_interfaces(conn)
+
+    return action
+
+
+def ping_action(destination: str, repeat: int) -> FleetAction:
+    """Return an action that pings ``destination`` from each device."""
+
+    def action(conn: Any, device: Device) -> Any:
+        return operations.run_ping(conn, destination, repeat)
+
+    return action
+
+
+def config_action(
+    commands: list[str], label: str = "configuration push", reconcile: bool = False
+) -> FleetAction:
+    """Return an action that pushes ``commands`` (or only the missing lines) to each device."""
+
+    def action(conn: Any, device: Device) -> Any:
+        return operations.push_config(conn, commands, label, reconcile)
+
+    return action
+
+
+def async_backup_action(backups_dir: str) -> AsyncFleetAction:
+    """Return an async action that backs up each device's running-config."""
+
+    async def action(session: AsyncSession, device: Device) -> Any:
+        with log_context(operation="backup"):
+            config_text = await session.send_command(operations.RUNNING_CONFIG_COMMAND)
+        return operations.save_backup(device.get("name", "router"), config_text, backups_dir)
+
+    return action
+
+
+def async_show_interfaces_action() -> AsyncFleetAction:
+    """Return an async action that captures 'show ip interface brief'."""
+
+    async def action(session: AsyncSession, device: Device) -> Any:
+        with log_context(operation="show-interfaces"):
+            return await session.send_command(operations.SHOW_INTERFACES_COMMAND)
+
+    return action
+
+
+def async_ping_action(destination: str, repeat: int) -> AsyncFleetAction:
+    """Return an async action that pings ``destination`` from each device."""
+
+    async def action(session: AsyncSession, device: Device) -> Any:
+        with log_context(operation="ping"):
+            return await session.send_command(operations.ping_command(destination, repeat))
+
+    return action
+
+
+def async_config_action(commands: list[str], reconcile: bool = False) -> AsyncFleetAction:
+    """Return an async action that pushes ``commands`` (or only the missing lines)."""
+
+    async def action(session: AsyncSession, device: Device) -> Any:
+        with log_context(operation="config-push"):
+            if reconcile:
+                running = await session.send_command(operations.RUNNING_CONFIG_COMMAND)
+                missing = missing_commands(parse_config(running), commands)
+                if not missing:
+                    return "Already compliant: configuration push not needed."
+                return await session.send_config_set(missing)
+            return await session.send_config_set(commands)
+
+    return action
+
+
+def _resolve_one(resolver: CredentialResolver, device: Device) -> Optional[Credentials]:
+    """Resolve one streamed device, logging instead of raising on failure (internal)."""
+    try:
+        return resolver.resolve(device)
+    except CredentialError as exc:
+        logger.error("No credentials for %s: %s", device.get("name", "unknown"), exc)
+        return None
+
+
+def _run_on_device(
+    device: Device,
+    action: FleetAction,
+    credentials: Optional[Credentials],
+    pool: Optional[SessionPool] = None,
+) -> DeviceResult:
+    """Connect, run the action, and disconnect, capturing any failure (internal)."""
+    name = device.get("name", "unknown")
+    ip_addr = device.get("ip", "unknown")
+    started = time.monotonic()
+    conn = None
+    output: Any = None
+    error: Optional[str] = None
+    with log_context(device=name, ip=ip_addr, device_type=device.get("device_type")):
+        try:
+            if credentials is None:
+                raise CredentialError("no credentials available")
+            if pool is not None:
+                with pool.session(device) as pooled_conn:
+                    output = action(pooled_conn, device)
+            else:
+                conn = connect_to_device(device, credentials)
+                if conn is None:
+                    raise ConnectionError("connection failed")
+                output = action(conn, device)
+            if output is None:
+                error = "operation returned no output"
+        except Exception as exc:  # pragma: no cover - one device must not abort the fleet
+            logger.error("Fleet action failed on %s: %s", name, exc)
+            error = f"{type(exc).__name__}: {exc}"
+        finally:
+            if conn is not None:
+                try:
+                    with latency.timed("disconnect"):
+                        conn.disconnect()
+                except Exception:  # pragma: no cover - best effort teardown
+                    logger.debug("Disconnect failed on %s", name)
+
+    return DeviceResult(
+        name=name,
+        ip=ip_addr,
+        ok=error is None,
+        result=output,
+        error=error,
+        elapsed=time.monotonic() - started,
+    )
+
+
+async def _run_fleet_async(
+    devices: list[Device],
+    action: AsyncFleetAction,
+    concurrency: int,
+    credentials: dict[str, Credentials],
+) -> FleetSummary:
+    """Gather per-device coroutines bounded by a semaphore (internal)."""
+    logger.info(
+        "Starting async fleet run on %d devices with concurrency %d", len(devices), concurrency
+    )
+    started = time.monotonic()
+    import asyncio
+
+    limiter = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(
+        *(
+            _run_on_device_async(device, action, credentials.get(device.get("name", "")), limiter)
+            for device in devices
+        )
+    )
+    summary = FleetSummary(results=list(results), elapsed=time.monotonic() - started)
+    logger.info(
+        "Async fleet run finished in %.2fs: %d succeeded, %d failed",
+        summary.elapsed,
+        len(summary.succeeded),
+        len(summary.failed),
+    )
+    return summary
+
+
+async def _run_on_device_async(
+    device: Device,
+    action: AsyncFleetAction,
+    credentials: Optional[Credentials],
+    limiter: asyncio.Semaphore,
+) -> DeviceResult:
+    """Async counterpart of ``_run_on_device`` (internal)."""
+    name = device.get("name", "unknown")
+    ip_addr = device.get("ip", "unknown")
+    output: Any = None
+    error: Optional[str] = None
+    async with limiter:
+        with log_context(device=name, ip=ip_addr, device_type=device.get("device_type")):
+            started = time.monotonic()
+            session: Optional[AsyncSession] = None
+            try:
+                if credentials is None:
+                    raise CredentialError("no credentials available")
+                from netauto_lib.async_transport import open_async_session
+
+                session = await open_async_session(device, credentials)
+                output = await action(session, device)
+                if output is None:
+                    error = "operation returned no output"
+            except Exception as exc:  # pragma: no cover - one device must not abort the fleet
+                logger.error("Async fleet action failed on %s: %s", name, exc)
+                error = f"{type(exc).__name__}: {exc}"
+            finally:
+                if session is not None:
+                    await session.disconnect()
+
+    return DeviceResult(
+        name=name,
+        ip=ip_addr,
+        ok=error is None,
+        result=output,
+        error=error,
+        elapsed=time.monotonic() - started,
+    )
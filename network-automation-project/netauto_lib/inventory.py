@@ -0,0 +1,297 @@
+"""Indexed inventory with selector expressions for fleet operations.
+
+``Inventory`` wraps the device list from ``load_devices()`` with hash
+indexes on name, IP and every label field, plus a sorted address index for
+prefix queries. Selectors combine terms with ``and``, ``or``, ``not`` and
+parentheses::
+
+    R1                                   # a device name (globs like R* allowed)
+    all
+    10.1.0.0/16                          # every device inside a prefix
+    site=dc1 and device_type=cisco_ios
+    group=core or tag=edge,lab           # comma-separated values match any
+    ip=10.1.12.0/24 and not name=R3*
+    site!=lab
+
+Matches are evaluated as integer bitmaps (bit ``i`` is the ``i``-th device),
+so combining terms is a single big-integer operation whatever the inventory
+size, and results come back in inventory order without duplicates.
+"""
+from __future__ import annotations
+
+import bisect
+import fnmatch
+import ipaddress
+import logging
+import re
+from typing import Iterable, Iterator, Optional
+
+from netauto_lib.config_loader import load_devices
+from netauto_lib.utils import Device
+
+logger = logging.getLogger(__name__)
+
+# Selector keys; list-valued fields are indexed by each element.
+SELECTOR_FIELDS = ("name", "ip", "device_type", "site", "groups", "tags", "username")
+_ALIASES = {"group": "groups", "tag": "tags", "type": "device_type"}
+# Fields whose bitmaps are built up front; the rest are (nearly) unique per device.
+_LABEL_FIELDS = ("device_type", "site", "groups", "tags", "username")
+_TOKEN = re.compile(r"\s*(?:([()])|([^\s()]+))")
+_GLOB_CHARS = frozenset("*?[")
+_MAX_CACHED_MASKS = 256
+
+
+class SelectorError(ValueError):
+    """Raised when a selector is malformed or names an unknown device."""
+
+
+class Inventory:
+    """Devices plus name, IP, prefix and label indexes.
+
+    ``select("site=dc1 and device_type=cisco_ios")`` resolves against the
+    indexes instead of scanning the device list.
+    """
+
+    def __init__(self, devices: Iterable[Device]) -> None:
+        self.devices: list[Device] = list(devices)
+        self._all = (1 << len(self.devices)) - 1
+        self._positions: dict[str, dict[str, list[int]]] = {
+            field: {} for field in SELECTOR_FIELDS
+        }
+        addresses: dict[int, list[tuple[int, int]]] = {4: [], 6: []}
+        for position, device in enumerate(self.devices):
+            for field in SELECTOR_FIELDS:
+                value = device.get(field)
+                if value is None:
+                    continue
+                index = self._positions[field]
+                for item in (value,) if isinstance(value, str) else value:
+                    index.setdefault(item, []).append(position)
+            try:
+                address = ipaddress.ip_address(device["ip"])
+            except ValueError:
+                continue
+            addresses[address.version].append((int(address), position))
+
+        self._masks: dict[str, dict[str, int]] = {
+            field: {
+                value: _mask(positions, len(self.devices))
+                for value, positions in self._positions[field].items()
+            }
+            for field in _LABEL_FIELDS
+        }
+        self._addresses: dict[int, tuple[list[int], list[int]]] = {}
+        for version, entries in addresses.items():
+            entries.sort()
+            self._addresses[version] = (
+                [address for address, _ in entries],
+                [position for _, position in entries],
+            )
+        # Prefix and glob results, which cost a scan or bisect to build.
+        self._cached_masks: dict[tuple[str, str], int] = {}
+        logger.debug("Indexed inventory of %d devices", len(self.devices))
+
+    def __len__(self) -> int:
+        return len(self.devices)
+
+    def __iter__(self) -> Iterator[Device]:
+        return iter(self.devices)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._positions["name"]
+
+    def get(self, name: str) -> Optional[Device]:
+        """Return the device called ``name``, or None."""
+        positions = self._positions["name"].get(name)
+        return self.devices[positions[0]] if positions else None
+
+    def lookup_ip(self, ip: str) -> list[Device]:
+        """Return the devices whose management address is ``ip``."""
+        return [self.devices[position] for position in self._positions["ip"].get(ip, [])]
+
+    def in_network(self, network: str) -> list[Device]:
+        """Return the devices whose address falls inside ``network`` (e.g. 10.1.0.0/16)."""
+        return self._from_mask(self._prefix_mask(network))
+
+    def values(self, field: str) -> list[str]:
+        """Return the distinct values of a selector field, sorted."""
+        return sorted(self._positions[_ALIASES.get(field, field)])
+
+    def select(self, *selectors: str) -> list[Device]:
+        """Return the devices matched by any of ``selectors``, in inventory order.
+
+        Raises ``SelectorError`` for malformed expressions and for plain
+        device names that are not in the inventory.
+        """
+        mask = 0
+        for selector in selectors:
+            mask |= _Parser(self, selector).parse()
+        return self._from_mask(mask)
+
+    def _term(self, word: str) -> int:
+        """Return the bitmap for one selector term (internal)."""
+        for operator in ("!=", "="):
+            key, found, value = word.partition(operator)
+            if found:
+                mask = self._field_mask(key, value)
+                return self._all & ~mask if operator == "!=" else mask
+        if word == "all":
+            return self._all
+        if "/" in word:
+            return self._prefix_mask(word)
+        mask = self._field_mask("name", word)
+        if not mask and not _GLOB_CHARS.intersection(word):
+            raise SelectorError(f"Unknown device '{word}'")
+        return mask
+
+    def _field_mask(self, key: str, value: str) -> int:
+        """Return the bitmap of devices whose ``key`` matches ``value`` (internal)."""
+        field = _ALIASES.get(key, key)
+        if field not in self._positions:
+            raise SelectorError(
+                f"Unknown selector field '{key}'; use one of: {', '.join(SELECTOR_FIELDS)}"
+            )
+        if not value:
+            raise SelectorError(f"Missing value for '{key}'")
+        mask = 0
+        for item in value.split(","):
+            if field == "ip" and "/" in item:
+                mask |= self._prefix_mask(item)
+            elif _GLOB_CHARS.intersection(item):
+                mask |= self._glob_mask(field, item)
+            else:
+                mask |= self._value_mask(field, item)
+        return mask
+
+    def _glob_mask(self, field: str, pattern: str) -> int:
+        """Return the bitmap of devices whose ``field`` matches a glob pattern (internal)."""
+        mask = self._cached_masks.get((field, pattern))
+        if mask is None:
+            index = self._positions[field]
+            positions = [
+                position
+                for value in fnmatch.filter(index, pattern)
+                for position in index[value]
+            ]
+            mask = self._cache_mask((field, pattern), _mask(positions, len(self.devices)))
+        return mask
+
+    def _value_mask(self, field: str, value: str) -> int:
+        """Return the bitmap for an exact field value (internal)."""
+        if field in self._masks:
+            return self._masks[field].get(value, 0)
+        return _mask(self._positions[field].get(value, []), len(self.devices))
+
+    def _prefix_mask(self, network: str) -> int:
+        """Return the bitmap of devices inside ``network`` by bisecting addresses (internal)."""
+        mask = self._cached_masks.get(("ip", network))
+        if mask is not None:
+            return mask
+        try:
+            parsed = ipaddress.ip_network(network, strict=False)
+        except ValueError:
+            raise SelectorError(f"Invalid network '{network}'") from None
+        addresses, positions = self._addresses[parsed.version]
+        low = bisect.bisect_left(addresses, int(parsed.network_address))
+        high = bisect.bisect_right(addresses, int(parsed.broadcast_address))
+        return self._cache_mask(("ip", network), _mask(positions[low:high], len(self.devices)))
+
+    def _cache_mask(self, key: tuple[str, str], mask: int) -> int:
+        """Remember a computed bitmap, bounding the cache size (internal)."""
+        if len(self._cached_masks) >= _MAX_CACHED_MASKS:
+            self._cached_masks.clear()
+        self._cached_masks[key] = mask
+        return mask
+
+    def _from_mask(self, mask: int) -> list[Device]:
+        """Return the devices whose bits are set in ``mask`` (internal)."""
+        if mask == self._all:
+            return list(self.devices)
+        bits = bin(mask)[:1:-1]
+        selected: list[Device] = []
+        position = bits.find("1")
+        while position >= 0:
+            selected.append(self.devices[position])
+            position = bits.find("1", position + 1)
+        return selected
+
+
+def load_inventory(path: str = "devices.yaml", compact: bool = False) -> Inventory:
+    """Load ``path`` with ``load_devices()`` and index it."""
+    return Inventory(load_devices(path, compact=compact))
+
+
+class _Parser:
+    """Recursive-descent evaluator for selector expressions (internal).
+
+    Precedence from loosest to tightest: ``or``, ``and``, ``not``.
+    """
+
+    def __init__(self, inventory: Inventory, selector: str) -> None:
+        self.inventory = inventory
+        self.selector = selector
+        self.tokens = [paren or word for paren, word in _TOKEN.findall(selector)]
+        self.index = 0
+
+    def parse(self) -> int:
+        if not self.tokens:
+            raise SelectorError("Empty selector")
+        mask = self._or()
+        if self.index < len(self.tokens):
+            raise SelectorError(
+                f"Unexpected '{self.tokens[self.index]}' in selector '{self.selector}'"
+            )
+        return mask
+
+    def _peek(self) -> Optional[str]:
+        return self.tokens[self.index] if self.index < len(self.tokens) else None
+
+    def _keyword(self, keyword: str) -> bool:
+        token = self._peek()
+        if token is not None and token.lower() == keyword:
+            self.index += 1
+            return True
+        return False
+
+    def _or(self) -> int:
+        mask = self._and()
+        while self._keyword("or"):
+            mask |= self._and()
+        return mask
+
+    def _and(self) -> int:
+        mask = self._not()
+        while self._keyword("and"):
+            mask &= self._not()
+        return mask
+
+    def _not(self) -> int:
+        if self._keyword("not"):
+            return self.inventory._all & ~self._not()
+        return self._primary()
+
+    def _primary(self) -> int:
+        token = self._peek()
+        if token is None or token == ")" or token.lower() in ("and", "or"):
+            raise SelectorError(f"Incomplete selector '{self.selector}'")
+        self.index += 1
+        if token == "(":
+            mask = self._or()
+            if self._peek() != ")":
+                raise SelectorError(f"Missing ')' in selector '{self.selector}'")
+            self.index += 1
+            return mask
+        return self.inventory._term(token)
+
+
+def _mask(positions: list[int], size: int) -> int:
+    """Return an integer with the bits at ``positions`` set (internal)."""
+    if len(positions) < 64:
+        mask = 0
+        for position in positions:
+            mask |= 1 << position
+        return mask
+    buffer = bytearray((size + 7) // 8)
+    for position in positions:
+        buffer[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(buffer, "little")
@@ -0,0 +1,216 @@
+"""Hierarchical model of Cisco IOS running-config text.
+
+``parse_config`` turns ``show running-config`` output into a tree of
+``ConfigLine`` nodes following IOS indentation (``interface``, ``router
+ospf``, ``line`` blocks and so on). The resulting ``ConfigTree`` indexes
+top-level sections by their exact text and by their first keyword, so
+common questions are dictionary lookups rather than rescans of the text::
+
+    tree = parse_config(config_text)
+    tree.section("interface GigabitEthernet0/0")
+    tree.sections("router")
+    tree.interfaces_with_ip("10.1.12.1")
+    tree.ospf_networks()
+"""
+from __future__ import annotations
+
+import gc
+import re
+from typing import Iterator, NamedTuple, Optional
+
+_BANNER_RE = re.compile(r"^banner\s+\S+\s+(\S)")
+_SKIPPED_PREFIXES = ("Building configuration", "Current configuration")
+
+
+class OspfNetwork(NamedTuple):
+    """One ``network ... area ...`` statement under ``router ospf``."""
+
+    process_id: str
+    network: str
+    wildcard: str
+    area: str
+
+
+class ConfigLine:
+    """A single configuration line and its indented children."""
+
+    __slots__ = ("text", "indent", "parent", "children", "line_number")
+
+    def __init__(
+        self, text: str, indent: int, parent: Optional["ConfigLine"], line_number: int
+    ) -> None:
+        self.text = text
+        self.indent = indent
+        self.parent = parent
+        self.children: list[ConfigLine] = []
+        self.line_number = line_number
+
+    @property
+    def keyword(self) -> str:
+        """First word of the line, e.g. ``interface`` or ``router``."""
+        return self.text.split(" ", 1)[0]
+
+    @property
+    def args(self) -> str:
+        """Text following the keyword, e.g. the interface name."""
+        parts = self.text.split(" ", 1)
+        return parts[1] if len(parts) > 1 else ""
+
+    @property
+    def path(self) -> tuple[str, ...]:
+        """Texts from the top-level section down to this line."""
+        parts: list[str] = []
+        node: Optional[ConfigLine] = self
+        while node is not None:
+            parts.append(node.text)
+            node = node.parent
+        return tuple(reversed(parts))
+
+    def child(self, text: str) -> Optional["ConfigLine"]:
+        """Return the direct child with exactly ``text``, if any."""
+        for node in self.children:
+            if node.text == text:
+                return node
+        return None
+
+    def find_children(self, prefix: str) -> list["ConfigLine"]:
+        """Return direct children whose text starts with ``prefix``."""
+        return [node for node in self.children if node.text.startswith(prefix)]
+
+    def walk(self) -> Iterator["ConfigLine"]:
+        """Yield this line and all descendants depth-first."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def __repr__(self) -> str:
+        return f"ConfigLine({self.text!r}, children={len(self.children)})"
+
+
+class ConfigTree:
+    """Parsed running-config with lookup indexes over top-level sections."""
+
+    def __init__(self, roots: list[ConfigLine]) -> None:
+        self.roots = roots
+        self._by_text: dict[str, ConfigLine] = {}
+        self._by_keyword: dict[str, list[ConfigLine]] = {}
+        for node in roots:
+            self._by_text.setdefault(node.text, node)
+            self._by_keyword.setdefault(node.keyword, []).append(node)
+        self._ip_index: Optional[dict[str, list[ConfigLine]]] = None
+
+    def section(self, text: str) -> Optional[ConfigLine]:
+        """Return the top-level line with exactly ``text``."""
+        return self._by_text.get(text)
+
+    def sections(self, keyword: str) -> list[ConfigLine]:
+        """Return top-level lines starting with ``keyword`` (e.g. ``"interface"``)."""
+        return self._by_keyword.get(keyword, [])
+
+    def interfaces(self) -> dict[str, ConfigLine]:
+        """Return interface sections keyed by interface name."""
+        return {node.args: node for node in self.sections("interface")}
+
+    def interfaces_with_ip(self, ip_addr: str) -> list[ConfigLine]:
+        """Return interface sections carrying ``ip_addr`` as primary or secondary."""
+        if self._ip_index is None:
+            index: dict[str, list[ConfigLine]] = {}
+            for interface in self.sections("interface"):
+                for line in interface.children:
+                    if line.text.startswith("ip address "):
+                        fields = line.text.split()
+                        if len(fields) >= 3:
+                            index.setdefault(fields[2], []).append(interface)
+            self._ip_index = index
+        return self._ip_index.get(ip_addr, [])
+
+    def ospf_networks(self, process_id: Optional[str] = None) -> list[OspfNetwork]:
+        """Return ``network`` statements of every (or one) OSPF process."""
+        networks: list[OspfNetwork] = []
+        for router in self.sections("router"):
+            fields = router.text.split()
+            if len(fields) < 3 or fields[1] != "ospf":
+                continue
+            if process_id is not None and fields[2] != str(process_id):
+                continue
+            for line in router.children:
+                parts = line.text.split()
+                if len(parts) == 5 and parts[0] == "network" and parts[3] == "area":
+                    networks.append(OspfNetwork(fields[2], parts[1], parts[2], parts[4]))
+        return networks
+
+    def walk(self) -> Iterator[ConfigLine]:
+        """Yield every line in file order."""
+        for node in self.roots:
+            yield from node.walk()
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.walk())
+
+
+def parse_config(text: str) -> ConfigTree:
+    """Parse running-config ``text`` into a ``ConfigTree``.
+
+    Comment separators (``!``), blank lines and the ``Building
+    configuration``/``Current configuration`` header are dropped. Multi-line
+    banners are kept as a single node.
+    """
+    # The parse allocates one object per line; pausing the cyclic GC avoids
+    # repeated generation scans over the partially built tree.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return ConfigTree(_parse_lines(text))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _parse_lines(text: str) -> list[ConfigLine]:
+    """Build the top-level nodes for ``parse_config`` (internal)."""
+    roots: list[ConfigLine] = []
+    stack: list[ConfigLine] = []
+    numbered = enumerate(text.splitlines(), start=1)
+    for line_number, raw in numbered:
+        stripped = raw.strip()
+        if not stripped or stripped[0] == "!":
+            continue
+        indent = len(raw) - len(raw.lstrip())
+        if not indent:
+            if stripped.startswith(_SKIPPED_PREFIXES):
+                continue
+            if stripped.startswith("banner "):
+                stripped = _read_banner(stripped, numbered)
+
+        while stack and stack[-1].indent >= indent:
+            stack.pop()
+        if stack:
+            parent = stack[-1]
+            node = ConfigLine(stripped, indent, parent, line_number)
+            parent.children.append(node)
+        else:
+            node = ConfigLine(stripped, indent, None, line_number)
+            roots.append(node)
+        stack.append(node)
+    return roots
+
+
+def _read_banner(first: str, numbered: Iterator[tuple[int, str]]) -> str:
+    """Join a delimited multi-line banner into one line of text (internal).
+
+    Consumes lines from ``numbered`` up to and including the closing
+    delimiter.
+    """
+    match = _BANNER_RE.match(first)
+    if match is None:
+        return first
+    delimiter = match.group(1)
+    body = [first]
+    if delimiter not in first[match.end():]:
+        for _, raw in numbered:
+            body.append(raw.rstrip())
+            if delimiter in raw:
+                break
+    return "\n".join(body)
@@ -0,0 +1,315 @@
+"""Batch jobs: an ordered list of operations run over one session per device.
+
+A job file declares its targets and steps in YAML::
+
+    name: branch-rollout
+    targets: [R1, R2]          # names, "all" or selectors like "site=dc1"
+    workers: 20                # optional, defaults to FLEET_WORKERS
+    reconcile: true            # optional, defaults to RECONCILE_CONFIG
+    stop_on_error: true        # optional, skip remaining steps after a failure
+    steps:
+      - backup
+      - set-interface: {interface: Gi0/1, ip: 10.0.0.1, mask: 24}
+      - ospf: {process_id: 1, router_id: 1.1.1.1, network: 10.0.0.0,
+               wildcard: 0.0.0.255, area: 0}
+      - push-config: {commands: ["ip domain-name example.net"]}
+      - ping: {destination: 10.0.0.2, repeat: 3}
+      - show-interfaces
+
+Every step is validated before any device is contacted. Each device is
+logged into once and its steps run in order over that session; adjacent
+interface/OSPF steps are sent as a single configuration-mode batch.
+"""
+from __future__ import annotations
+
+import logging
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import yaml
+
+from netauto_lib import operations
+from netauto_lib.config_diff import opens_section
+from netauto_lib.credentials import CredentialResolver
+from netauto_lib.fleet import FleetAction, FleetSummary, run_fleet
+from netauto_lib.inventory import Inventory, SelectorError
+from netauto_lib.logging_setup import log_context
+from netauto_lib.utils import Device
+
+logger = logging.getLogger(__name__)
+
+CONFIG_OPERATIONS = ("set-interface", "ospf", "push-config")
+OPERATIONS = ("backup", "show-interfaces", "ping", *CONFIG_OPERATIONS)
+
+
+class JobError(ValueError):
+    """Raised when a job file is malformed or references unknown devices."""
+
+
+@dataclass
+class JobStep:
+    """One validated operation of a job."""
+
+    operation: str
+    params: dict[str, Any] = field(default_factory=dict)
+    commands: list[str] = field(default_factory=list)
+
+
+@dataclass
+class StepResult:
+    """Outcome of one step on one device."""
+
+    step: str
+    ok: bool
+    output: Any = None
+    skipped: bool = False
+
+
+@dataclass
+class Job:
+    """A parsed job file."""
+
+    name: str
+    targets: Any
+    steps: list[JobStep]
+    workers: Optional[int] = None
+    reconcile: Optional[bool] = None
+    stop_on_error: bool = True
+
+
+def load_job(path: str | Path, default_ping_count: int = 5) -> Job:
+    """Parse and validate the job file at ``path``; raise ``JobError`` on problems."""
+    job_path = Path(path)
+    try:
+        parsed = yaml.safe_load(job_path.read_text(encoding="utf-8"))
+    except (OSError, yaml.YAMLError) as exc:
+        raise JobError(f"Unable to read job file {job_path}: {exc}") from None
+    if not isinstance(parsed, dict):
+        raise JobError("Job file must contain a mapping with 'targets' and 'steps'.")
+    raw_steps = parsed.get("steps")
+    if not isinstance(raw_steps, list) or not raw_steps:
+        raise JobError("Job file must define a non-empty 'steps' list.")
+    if "targets" not in parsed:
+        raise JobError("Job file must define 'targets' (device names, selectors or 'all').")
+
+    steps = [
+        _parse_step(number, raw, default_ping_count)
+        for number, raw in enumerate(raw_steps, start=1)
+    ]
+    workers = parsed.get("workers")
+    if workers is not None:
+        workers = _checked(operations.validate_positive_int, workers, "workers")
+    reconcile = parsed.get("reconcile")
+    if reconcile is not None and not isinstance(reconcile, bool):
+        raise JobError("'reconcile' must be true or false.")
+    stop_on_error = parsed.get("stop_on_error", True)
+    if not isinstance(stop_on_error, bool):
+        raise JobError("'stop_on_error' must be true or false.")
+    return Job(
+        name=str(parsed.get("name") or job_path.stem),
+        targets=parsed["targets"],
+        steps=steps,
+        workers=workers,
+        reconcile=reconcile,
+        stop_on_error=stop_on_error,
+    )
+
+
+def select_targets(job: Job, inventory: Inventory | list[Device]) -> list[Device]:
+    """Return the inventory entries matched by ``job.targets``.
+
+    Targets are ``all``, a device name or selector, or a list of them.
+    """
+    selectors = [job.targets] if isinstance(job.targets, str) else job.targets
+    if (
+        not isinstance(selectors, list)
+        or not selectors
+        or not all(isinstance(item, str) for item in selectors)
+    ):
+        raise JobError("'targets' must be 'all', a device name or selector, or a list of them.")
+    if not isinstance(inventory, Inventory):
+        inventory = Inventory(inventory)
+    try:
+        devices = inventory.select(*selectors)
+    except SelectorError as exc:
+        raise JobError(f"Invalid targets: {exc}") from None
+    if not devices:
+        raise JobError("Job targets match no devices.")
+    return devices
+
+
+def job_action(job: Job, backups_dir: str, reconcile: bool = False) -> FleetAction:
+    """Return a fleet action running every step of ``job`` over one session.
+
+    The action returns the list of ``StepResult`` objects for the device.
+    """
+    batches = _plan(job.steps)
+
+    def action(conn: Any, device: Device) -> list[StepResult]:
+        results: list[StepResult] = []
+        for batch in batches:
+            if results and not results[-1].ok and job.stop_on_error:
+                results.extend(StepResult(step.operation, False, skipped=True) for step in batch)
+                continue
+            output = _run_batch(conn, device, batch, backups_dir, reconcile)
+            results.extend(
+                StepResult(step.operation, output is not None, output) for step in batch
+            )
+        return results
+
+    return action
+
+
+def run_job(
+    job: Job,
+    devices: list[Device],
+    settings: dict[str, Any],
+    resolver: Optional[CredentialResolver] = None,
+) -> FleetSummary:
+    """Run ``job`` on ``devices``; devices with a failed step are marked failed.
+
+    Every record logged during the run carries a fresh ``job_id``.
+    """
+    reconcile = settings.get("reconcile_config", False) if job.reconcile is None else job.reconcile
+    workers = job.workers or int(settings.get("fleet_workers", 10))
+    job_id = uuid.uuid4().hex[:12]
+    with log_context(job_id=job_id):
+        logger.info(
+            "Running job %s [%s] (%d steps) on %d devices",
+            job.name,
+            job_id,
+            len(job.steps),
+            len(devices),
+        )
+        summary = run_fleet(
+            devices,
+            job_action(job, str(settings["backups_dir"]), bool(reconcile)),
+            workers,
+            resolver,
+        )
+    for result in summary.results:
+        if result.ok:
+            failed = [step for step in result.result if not step.ok]
+            if failed:
+                result.ok = False
+                result.error = f"step '{failed[0].step}' failed"
+    return summary
+
+
+def print_job_results(summary: FleetSummary) -> None:
+    """Print per-device step outcomes, including show/ping output."""
+    for result in summary.results:
+        print(f"\n=== {result.name} ({result.ip}) ===")
+        if not isinstance(result.result, list):
+            print(f"  FAILED: {result.error}")
+            continue
+        for number, step in enumerate(result.result, start=1):
+            status = "ok" if step.ok else ("skipped" if step.skipped else "FAILED")
+            print(f"  {number}. {step.step}: {status}")
+            if step.ok and step.step in ("show-interfaces", "ping"):
+                print(step.output)
+
+
+def _parse_step(number: int, raw: Any, default_ping_count: int) -> JobStep:
+    """Validate one entry of the ``steps`` list (internal)."""
+    if isinstance(raw, str):
+        operation, params = raw, {}
+    elif isinstance(raw, dict) and len(raw) == 1:
+        operation, params = next(iter(raw.items()))
+        params = params or {}
+    else:
+        raise JobError(f"Step {number}: expected an operation name or a one-key mapping.")
+    operation = str(operation).replace("_", "-")
+    if operation not in OPERATIONS:
+        raise JobError(f"Step {number}: unknown operation '{operation}'.")
+    if not isinstance(params, dict):
+        raise JobError(f"Step {number} ({operation}): parameters must be a mapping.")
+    params = {str(key).replace("-", "_"): value for key, value in params.items()}
+
+    def require(key: str, validator: Callable[[str], Any]) -> Any:
+        if params.get(key) in (None, ""):
+            raise JobError(f"Step {number} ({operation}): missing '{key}'.")
+        return _checked(validator, str(params[key]), f"step {number} ({operation}) {key}")
+
+    step = JobStep(operation)
+    if operation == "ping":
+        step.params = {
+            "destination": require("destination", operations.validate_ipv4),
+            "repeat": require("repeat", operations.validate_positive_int)
+            if "repeat" in params
+            else default_ping_count,
+        }
+    elif operation == "set-interface":
+        step.commands = operations.interface_commands(
+            require("interface", operations.validate_interface_name),
+            require("ip", operations.validate_ipv4),
+            require("mask", operations.validate_subnet_mask),
+        )
+    elif operation == "ospf":
+        step.commands = operations.ospf_commands(
+            require("process_id", operations.validate_positive_int),
+            require("router_id", operations.validate_ipv4),
+            require("network", operations.validate_ipv4),
+            require("wildcard", operations.validate_wildcard_mask),
+            require("area", operations.validate_area),
+        )
+    elif operation == "push-config":
+        commands = params.get("commands")
+        if not isinstance(commands, list) or not all(isinstance(c, str) for c in commands):
+            raise JobError(f"Step {number} (push-config): 'commands' must be a list of strings.")
+        step.commands = [command.strip() for command in commands if command.strip()]
+        if not step.commands:
+            raise JobError(f"Step {number} (push-config): 'commands' must not be empty.")
+    return step
+
+
+def _checked(validator: Callable[[str], Any], value: Any, label: str) -> Any:
+    """Run an operations validator, re-raising its message as ``JobError`` (internal)."""
+    try:
+        return validator(value)
+    except ValueError as exc:
+        raise JobError(f"Invalid {label}: {exc}") from None
+
+
+def _plan(steps: list[JobStep]) -> list[list[JobStep]]:
+    """Group adjacent section-scoped config steps into one push (internal).
+
+    A step joins the previous batch only if its commands start with a
+    section command, so no line can be mistaken for part of the prior
+    section.
+    """
+    batches: list[list[JobStep]] = []
+    for step in steps:
+        mergeable = (
+            step.operation in CONFIG_OPERATIONS
+            and bool(step.commands)
+            and opens_section(step.commands[0])
+        )
+        previous = batches[-1] if batches else None
+        if (
+            mergeable
+            and previous is not None
+            and all(item.operation in CONFIG_OPERATIONS for item in previous)
+        ):
+            previous.append(step)
+        else:
+            batches.append([step])
+    return batches
+
+
+def _run_batch(
+    conn: Any, device: Device, batch: list[JobStep], backups_dir: str, reconcile: bool
+) -> Any:
+    """Execute one batch on ``conn`` and return its output, or None on failure (internal)."""
+    step = batch[0]
+    if step.operation == "backup":
+        return operations.backup_config(conn, device.get("name", "router"), backups_dir)
+    if step.operation == "show-interfaces":
+        return operations.fetch_interfaces(conn)
+    if step.operation == "ping":
+        return operations.run_ping(conn, step.params["destination"], step.params["repeat"])
+    commands = [command for item in batch for command in item.commands]
+    label = " + ".join(item.operation for item in batch)
+    return operations.push_config(conn, commands, label, reconcile)
@@ -0,0 +1,258 @@
+"""Latency histograms for every device interaction.
+
+Each step of a session is timed with ``time.perf_counter()`` (a monotonic
+clock) and recorded under a phase:
+
+    connect       the whole connect_to_device()/async session connect
+    login         TCP connect and authentication
+    prompt        prompt discovery and terminal setup (paging, width)
+    enable        entering privileged EXEC mode
+    <operation>   each command or config set, named after the active
+                  log_context operation (backup, ping, show-interfaces,
+                  running-config, config-push), else "command"/"config"
+    disconnect    closing the session
+
+Samples land in fixed-bucket histograms keyed by ``(phase, device_type)``,
+so recording is a bisect and an increment under a lock and memory does not
+grow with the number of devices. A process-wide recorder collects
+everything; ``recording()`` additionally collects one fleet run, which
+``fleet.print_summary()`` prints and ``export_latency()`` writes as JSON.
+Percentiles are estimated by interpolating inside the matching bucket.
+"""
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from netauto_lib.logging_setup import current_log_context
+
+# Upper bounds (seconds) of the histogram buckets; a final bucket catches the rest.
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+    120.0,
+)
+# Phases in the order they happen; operations follow, sorted by name.
+SESSION_PHASES = ("connect", "login", "prompt", "enable")
+
+_run_recorder: ContextVar[Optional["LatencyRecorder"]] = ContextVar(
+    "netauto_latency_recorder", default=None
+)
+
+
+class Histogram:
+    """Bucketed latency distribution with count, sum, min and max."""
+
+    __slots__ = ("counts", "count", "total", "minimum", "maximum")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.minimum = float("inf")
+        self.maximum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Add one sample."""
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds < self.minimum:
+            self.minimum = seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+    def merge(self, other: "Histogram") -> None:
+        """Add every sample of ``other`` to this histogram."""
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    def quantile(self, fraction: float) -> float:
+        """Estimate the ``fraction`` quantile (0.5 for the median) in seconds."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                # Narrow the bucket to the observed range before interpolating.
+                lower = max(LATENCY_BUCKETS[index - 1] if index else 0.0, self.minimum)
+                upper = self.maximum
+                if index < len(LATENCY_BUCKETS):
+                    upper = min(LATENCY_BUCKETS[index], upper)
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.maximum
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return count, mean, percentile and bucket data, times in milliseconds."""
+        cumulative = 0
+        buckets: dict[str, int] = {}
+        for bound, count in zip((*LATENCY_BUCKETS, "+Inf"), self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.5) * 1000, 3),
+            "p90_ms": round(self.quantile(0.9) * 1000, 3),
+            "p99_ms": round(self.quantile(0.99) * 1000, 3),
+            "max_ms": round(self.maximum * 1000, 3),
+            "buckets": buckets,
+        }
+
+
+class LatencyRecorder:
+    """Thread-safe set of histograms keyed by ``(phase, device_type)``."""
+
+    def __init__(self) -> None:
+        self._histograms: dict[tuple[str, str], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self._histograms)
+
+    def observe(self, phase: str, device_type: str, seconds: float) -> None:
+        """Record one sample of ``phase`` on a ``device_type`` device."""
+        with self._lock:
+            histogram = self._histograms.get((phase, device_type))
+            if histogram is None:
+                histogram = self._histograms[(phase, device_type)] = Histogram()
+            histogram.observe(seconds)
+
+    def histograms(self) -> dict[tuple[str, str], Histogram]:
+        """Return a copy of every ``(phase, device_type)`` histogram."""
+        with self._lock:
+            copies: dict[tuple[str, str], Histogram] = {}
+            for key, histogram in self._histograms.items():
+                copies[key] = Histogram()
+                copies[key].merge(histogram)
+            return copies
+
+    def by_phase(self) -> dict[str, Histogram]:
+        """Return histograms per phase, summed over device types, in session order."""
+        merged: dict[str, Histogram] = {}
+        for (phase, _), histogram in self.histograms().items():
+            merged.setdefault(phase, Histogram()).merge(histogram)
+        return dict(sorted(merged.items(), key=lambda item: _phase_order(item[0])))
+
+    def by_device_type(self) -> dict[str, dict[str, Histogram]]:
+        """Return histograms per device_type, then per phase."""
+        grouped: dict[str, dict[str, Histogram]] = {}
+        for (phase, device_type), histogram in sorted(
+            self.histograms().items(), key=lambda item: (item[0][1], _phase_order(item[0][0]))
+        ):
+            grouped.setdefault(device_type, {})[phase] = histogram
+        return grouped
+
+    def report(self) -> dict[str, Any]:
+        """Return a JSON-serialisable view of the per-phase and per-device_type histograms."""
+        return {
+            "generated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "phases": {phase: hist.to_dict() for phase, hist in self.by_phase().items()},
+            "device_types": {
+                device_type: {phase: hist.to_dict() for phase, hist in phases.items()}
+                for device_type, phases in self.by_device_type().items()
+            },
+        }
+
+
+_process_recorder = LatencyRecorder()
+
+
+def process_latency() -> LatencyRecorder:
+    """Return the recorder that collects every sample taken in this process."""
+    return _process_recorder
+
+
+@contextmanager
+def recording() -> Iterator[LatencyRecorder]:
+    """Collect the samples taken inside the block (and threads or tasks it starts).
+
+    Worker threads must be started with a copy of the current context, as
+    ``fleet.run_fleet`` does.
+    """
+    recorder = LatencyRecorder()
+    token = _run_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _run_recorder.reset(token)
+
+
+def observe(phase: str, seconds: float, device_type: Optional[str] = None) -> None:
+    """Record one sample; ``device_type`` defaults to the active ``log_context`` field."""
+    if device_type is None:
+        device_type = current_log_context().get("device_type") or "unknown"
+    _process_recorder.observe(phase, device_type, seconds)
+    recorder = _run_recorder.get()
+    if recorder is not None:
+        recorder.observe(phase, device_type, seconds)
+
+
+@contextmanager
+def timed(phase: str, device_type: Optional[str] = None) -> Iterator[None]:
+    """Time the block and record it under ``phase``, including when it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(phase, time.perf_counter() - started, device_type)
+
+
+def command_phase(default: str) -> str:
+    """Return the active ``log_context`` operation, or ``default`` outside one."""
+    return current_log_context().get("operation") or default
+
+
+def print_latency_summary(recorder: LatencyRecorder) -> None:
+    """Print a per-phase latency table, split by device_type when there are several."""
+    if not recorder:
+        return
+    print("\nLatency (ms)             count       p50       p90       p99       max")
+    for phase, histogram in recorder.by_phase().items():
+        print(_summary_row(phase, histogram))
+    device_types = recorder.by_device_type()
+    if len(device_types) > 1:
+        for device_type, phases in device_types.items():
+            print(f"  [{device_type}]")
+            for phase, histogram in phases.items():
+                print(_summary_row(f"  {phase}", histogram))
+
+
+def export_latency(recorder: LatencyRecorder, path: str | Path) -> Path:
+    """Write ``recorder.report()`` to ``path`` as JSON, replacing it atomically."""
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f"{target.name}.tmp{os.getpid()}")
+    tmp_path.write_text(json.dumps(recorder.report(), indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp_path, target)
+    return target
+
+
+def _phase_order(phase: str) -> tuple[int, str]:
+    """Sort key placing session phases first and disconnect last (internal)."""
+    if phase in SESSION_PHASES:
+        return SESSION_PHASES.index(phase), ""
+    return (len(SESSION_PHASES) + (phase == "disconnect"), phase)
+
+
+def _summary_row(label: str, histogram: Histogram) -> str:
+    """Format one line of the latency table (internal)."""
+    return (
+        f"  {label:<22}{histogram.count:>6}{histogram.quantile(0.5) * 1000:>10.1f}"
+        f"{histogram.quantile(0.9) * 1000:>10.1f}{histogram.quantile(0.99) * 1000:>10.1f}"
+        f"{histogram.maximum * 1000:>10.1f}"
+    )
@@ -2,20 +2,74 @@
 
 Creates ``<logs_dir>/<log_name>`` with rotation, mirrors logs to console, and
 ensures configuration is only applied once per process.
+
+With ``LOG_QUEUE=true`` (or ``setup_logging(queued=True)``) the root logger
+only enqueues records; a single ``QueueListener`` thread formats them and
+writes the file and console, so fleet worker threads never wait on handler
+locks or disk. The queue is bounded by ``LOG_QUEUE_SIZE``: when it is full,
+records below WARNING are dropped and counted, while warnings and errors
+wait for space. ``logging_stats()`` reports the counters.
+
+With ``LOG_FORMAT=json`` the log file is written as JSON lines
+(``netauto.jsonl``), one object per record. Fields set with ``log_context()``
+(device, ip, operation, job_id) are attached to every record logged inside
+the block, together with ``elapsed`` seconds since the block was entered::
+
+    {"time": "2024-05-01T10:00:00.123+00:00", "level": "INFO",
+     "logger": "netauto_lib.operations", "message": "Running 'show ip interface brief'",
+     "thread": "netauto-fleet_0", "device": "R1", "ip": "10.1.12.1",
+     "operation": "show-interfaces", "job_id": "3f2a9c1b7d40", "elapsed": 0.004}
 """
 from __future__ import annotations
 
+import atexit
+import copy
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Any, Iterator, Optional
+
+DEFAULT_QUEUE_SIZE = 10_000
+# Renders tracebacks in the calling thread, before the frames go away.
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["_BoundedQueueHandler"] = None
+# Fields attached to records by log_context(), with the time the block was entered.
+_log_context: ContextVar[tuple[dict[str, Any], Optional[float]]] = ContextVar(
+    "netauto_log_context", default=({}, None)
+)
 
 
-def setup_logging(logs_dir: str = "logs", log_name: str = "netauto.log") -> None:
-    """Configure logging outputs for the CLI tool."""
+def setup_logging(
+    logs_dir: str = "logs",
+    log_name: str = "netauto.log",
+    queued: Optional[bool] = None,
+    queue_size: Optional[int] = None,
+    json_lines: Optional[bool] = None,
+) -> None:
+    """Configure logging outputs for the CLI tool.
+
+    ``queued``, ``queue_size`` and ``json_lines`` default to the
+    ``LOG_QUEUE``, ``LOG_QUEUE_SIZE`` and ``LOG_FORMAT`` environment
+    variables. In JSON-lines mode the file gets a ``.jsonl`` suffix and the
+    console stays human-readable.
+    """
+    global _listener, _queue_handler
+
+    if json_lines is None:
+        json_lines = os.getenv("LOG_FORMAT", "text").strip().lower() in ("json", "jsonl")
     log_path = Path(logs_dir)
     log_path.mkdir(parents=True, exist_ok=True)
-    log_file = log_path / log_name
+    log_file = log_path / (Path(log_name).with_suffix(".jsonl") if json_lines else log_name)
 
     logger = logging.getLogger()
     if _already_configured(logger, log_file):
@@ -32,7 +86,7 @@ def setup_logging(logs_dir: str = "logs", log_name: str = "netauto.log") -> None
         encoding="utf-8",
     )
     file_handler.setLevel(level)
-    file_handler.setFormatter(formatter)
+    file_handler.setFormatter(JsonLinesFormatter() if json_lines else formatter)
 
     console_handler = logging.StreamHandler()
     console_handler.setLevel(level)
@@ -40,14 +94,172 @@ def setup_logging(logs_dir: str = "logs", log_name: str = "netauto.log") -> None
 
     logger.setLevel(level)
     logger.propagate = False
+    if queued is None:
+        queued = os.getenv("LOG_QUEUE", "false").strip().lower() in ("1", "true", "yes", "on")
+    if queued:
+        size = queue_size or _queue_size_env()
+        _queue_handler = _BoundedQueueHandler(queue.Queue(maxsize=size))
+        _queue_handler.addFilter(_ContextFilter())
+        _listener = QueueListener(
+            _queue_handler.queue, file_handler, console_handler, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(stop_logging)
+        logger.addHandler(_queue_handler)
+        logger.info("Logging initialized at %s (queued, capacity %d)", level_name, size)
+        return
+
+    file_handler.addFilter(_ContextFilter())
     logger.addHandler(file_handler)
     logger.addHandler(console_handler)
     logger.info("Logging initialized at %s", level_name)
 
 
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """Attach ``fields`` (device, ip, operation, job_id, ...) to records logged in the block.
+
+    Nested blocks add to and override the outer fields; ``None`` values are
+    ignored. The context follows the current thread or asyncio task, and
+    ``elapsed`` is measured from the innermost block.
+    """
+    current, _ = _log_context.get()
+    merged = {**current, **{key: value for key, value in fields.items() if value is not None}}
+    token = _log_context.set((merged, time.monotonic()))
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def current_log_context() -> dict[str, Any]:
+    """Return the fields of the innermost ``log_context`` block."""
+    return dict(_log_context.get()[0])
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format records as single-line JSON objects including ``log_context`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+            **getattr(record, "context", {}),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def logging_stats() -> dict[str, Any]:
+    """Return queue depth and drop counters of the queued pipeline."""
+    if _queue_handler is None:
+        return {"queued": False}
+    return {
+        "queued": True,
+        "capacity": _queue_handler.queue.maxsize,
+        "depth": _queue_handler.queue.qsize(),
+        "max_depth": _queue_handler.max_depth,
+        "dropped": _queue_handler.dropped,
+        "blocked": _queue_handler.blocked,
+    }
+
+
+def stop_logging() -> None:
+    """Flush the queued pipeline and stop its listener thread.
+
+    Registered with ``atexit``; a warning with the drop count is written
+    first if any records were lost.
+    """
+    global _listener, _queue_handler
+
+    if _listener is None or _queue_handler is None:
+        return
+    if _queue_handler.dropped:
+        logging.getLogger(__name__).warning(
+            "Log queue overflowed: %d records dropped, %d writers blocked",
+            _queue_handler.dropped,
+            _queue_handler.blocked,
+        )
+    _listener.stop()
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener = None
+    _queue_handler = None
+
+
+class _ContextFilter(logging.Filter):
+    """Copy the active ``log_context`` onto each record as ``record.context`` (internal).
+
+    Runs in the logging thread, before a queued record changes threads.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        fields, started = _log_context.get()
+        if started is not None:
+            record.context = {  # type: ignore[attr-defined]
+                **fields,
+                "elapsed": round(time.monotonic() - started, 3),
+            }
+        return True
+
+
+class _BoundedQueueHandler(QueueHandler):
+    """Non-blocking ``QueueHandler`` that counts what a full queue costs (internal)."""
+
+    def __init__(self, log_queue: "queue.Queue[Any]") -> None:
+        super().__init__(log_queue)
+        self.queue: "queue.Queue[Any]" = log_queue
+        self.dropped = 0
+        self.blocked = 0
+        self.max_depth = 0
+        self._counter_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge arguments and traceback into the record, leaving formatting to the listener."""
+        prepared = copy.copy(record)
+        prepared.msg = record.getMessage()
+        prepared.args = None
+        if record.exc_info:
+            prepared.exc_text = _TRACEBACK_FORMATTER.formatException(record.exc_info)
+            prepared.exc_info = None
+        return prepared
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self._counter_lock:
+                if record.levelno < logging.WARNING:
+                    self.dropped += 1
+                    return
+                self.blocked += 1
+            self.queue.put(record)
+        depth = self.queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+
+def _queue_size_env() -> int:
+    """Read ``LOG_QUEUE_SIZE``, falling back to the default (internal)."""
+    try:
+        return max(1, int(os.getenv("LOG_QUEUE_SIZE", str(DEFAULT_QUEUE_SIZE))))
+    except ValueError:
+        return DEFAULT_QUEUE_SIZE
+
+
 def _already_configured(logger: logging.Logger, log_file: Path) -> bool:
     """Return True if handlers for the target log file already exist (internal)."""
-    for handler in logger.handlers:
+    handlers = list(logger.handlers)
+    if _listener is not None:
+        handlers.extend(_listener.handlers)
+    for handler in handlers:
         if isinstance(handler, logging.FileHandler) and handler.baseFilename == str(log_file):
             return True
     return False
@@ -0,0 +1,183 @@
+"""Run metrics in the Prometheus textfile format.
+
+Counters and gauges are collected in memory while NetAuto runs; the
+``latency`` histograms are read when the file is rendered. With
+``METRICS_TEXTFILE`` set, the CLI writes everything at the end of each run
+for node_exporter's textfile collector::
+
+    METRICS_TEXTFILE=/var/lib/node_exporter/textfile_collector/netauto_{command}.prom
+
+``{command}`` is replaced by the subcommand (``backup``, ``run-job``, ...),
+so cron jobs running different commands do not overwrite each other. Every
+series carries a ``command`` label for the same reason. The file is written
+to a temporary name in the same directory and renamed into place, so the
+collector never reads a partial file.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Optional
+
+from netauto_lib.latency import LATENCY_BUCKETS, SESSION_PHASES, Histogram, process_latency
+
+if TYPE_CHECKING:
+    from netauto_lib.fleet import FleetSummary
+
+# Name -> (type, help) for every metric NetAuto exports.
+METRICS: dict[str, tuple[str, str]] = {
+    "netauto_devices_attempted_total": ("counter", "Connection attempts to devices."),
+    "netauto_devices_connected_total": ("counter", "Device sessions established."),
+    "netauto_device_connect_failures_total": (
+        "counter",
+        "Failed connection attempts by exception type.",
+    ),
+    "netauto_backups_total": ("counter", "Running-config backups recorded, by result."),
+    "netauto_backup_bytes_total": ("counter", "Bytes of running-config captured by backups."),
+    "netauto_backup_stored_bytes_total": (
+        "counter",
+        "Compressed bytes written to the backup store.",
+    ),
+    "netauto_fleet_devices": ("gauge", "Devices in the last fleet run, by result."),
+    "netauto_fleet_duration_seconds": ("gauge", "Wall-clock duration of the last fleet run."),
+    "netauto_device_up": ("gauge", "1 if the device completed the last fleet run, else 0."),
+    "netauto_run_success": ("gauge", "1 if the run exited with status 0, else 0."),
+    "netauto_run_duration_seconds": ("gauge", "Wall-clock duration of the run."),
+    "netauto_run_last_timestamp_seconds": ("gauge", "Unix time the run finished."),
+    "netauto_command_duration_seconds": (
+        "histogram",
+        "Latency of commands and config sets, by operation and device type.",
+    ),
+    "netauto_session_duration_seconds": (
+        "histogram",
+        "Latency of session phases (connect, login, prompt, enable, disconnect).",
+    ),
+}
+_SESSION_PHASES = frozenset((*SESSION_PHASES, "disconnect"))
+
+_samples: dict[str, dict[tuple[tuple[str, str], ...], float]] = {}
+_lock = threading.Lock()
+
+
+def inc(name: str, amount: float = 1.0, **labels: str) -> None:
+    """Add ``amount`` to the counter ``name`` with ``labels``."""
+    key = tuple(sorted(labels.items()))
+    with _lock:
+        series = _samples.setdefault(name, {})
+        series[key] = series.get(key, 0.0) + amount
+
+
+def set_gauge(name: str, value: float, **labels: str) -> None:
+    """Set the gauge ``name`` with ``labels`` to ``value``."""
+    with _lock:
+        _samples.setdefault(name, {})[tuple(sorted(labels.items()))] = value
+
+
+def has_samples() -> bool:
+    """Return True once anything worth exporting has been recorded."""
+    return bool(_samples) or bool(process_latency())
+
+
+def record_connect_failure(exc: BaseException) -> None:
+    """Count a failed connection attempt under its exception type."""
+    inc("netauto_device_connect_failures_total", exception=type(exc).__name__)
+
+
+def record_fleet_run(summary: "FleetSummary") -> None:
+    """Set the last-fleet-run gauges and per-device reachability from ``summary``."""
+    set_gauge("netauto_fleet_devices", len(summary.succeeded), result="succeeded")
+    set_gauge("netauto_fleet_devices", len(summary.failed), result="failed")
+    set_gauge("netauto_fleet_duration_seconds", summary.elapsed)
+    for result in summary.results:
+        set_gauge("netauto_device_up", 1.0 if result.ok else 0.0, device=result.name)
+
+
+def render(**common: str) -> str:
+    """Return every metric in the Prometheus text exposition format.
+
+    ``common`` labels (such as ``command``) are added to every series.
+    """
+    with _lock:
+        snapshot = {name: dict(series) for name, series in _samples.items()}
+    histograms = process_latency().histograms()
+    lines: list[str] = []
+    for name, (kind, help_text) in METRICS.items():
+        if kind == "histogram":
+            selected = [
+                (phase, device_type, histogram)
+                for (phase, device_type), histogram in sorted(histograms.items())
+                if (phase in _SESSION_PHASES) == (name == "netauto_session_duration_seconds")
+            ]
+            if selected:
+                lines.extend(_header(name, kind, help_text))
+                for phase, device_type, histogram in selected:
+                    labels = {**common, "phase": phase, "device_type": device_type}
+                    lines.extend(_histogram_lines(name, histogram, labels))
+            continue
+        series = snapshot.get(name)
+        if not series:
+            continue
+        lines.extend(_header(name, kind, help_text))
+        for key, value in sorted(series.items()):
+            lines.append(f"{name}{_labels({**common, **dict(key)})} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def write_textfile(
+    path: str | Path,
+    command: str,
+    exit_code: int,
+    duration: Optional[float] = None,
+) -> Path:
+    """Write all metrics for a finished run to ``path`` atomically.
+
+    ``{command}`` in ``path`` is replaced by ``command``.
+    """
+    target = Path(str(path).replace("{command}", command))
+    set_gauge("netauto_run_success", 1.0 if exit_code == 0 else 0.0)
+    if duration is not None:
+        set_gauge("netauto_run_duration_seconds", duration)
+    set_gauge("netauto_run_last_timestamp_seconds", time.time())
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f"{target.name}.tmp{os.getpid()}")
+    tmp_path.write_text(render(command=command), encoding="utf-8")
+    os.replace(tmp_path, target)
+    return target
+
+
+def _header(name: str, kind: str, help_text: str) -> list[str]:
+    """Return the HELP and TYPE lines of a metric family (internal)."""
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+
+
+def _histogram_lines(name: str, histogram: Histogram, labels: dict[str, str]) -> list[str]:
+    """Return the cumulative bucket, sum and count lines of one histogram (internal)."""
+    lines: list[str] = []
+    cumulative = 0
+    bounds: Iterable[Any] = (*LATENCY_BUCKETS, "+Inf")
+    for bound, count in zip(bounds, histogram.counts):
+        cumulative += count
+        lines.append(f"{name}_bucket{_labels({**labels, 'le': str(bound)})} {cumulative}")
+    lines.append(f"{name}_sum{_labels(labels)} {_number(histogram.total)}")
+    lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+    return lines
+
+
+def _labels(labels: dict[str, str]) -> str:
+    """Format a label set, escaping values as the text format requires (internal)."""
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    """Escape backslashes, quotes and newlines in a label value (internal)."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    """Format a sample value without a trailing ``.0`` on whole numbers (internal)."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
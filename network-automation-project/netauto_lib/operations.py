@@ -1,78 +1,187 @@
 """Device operations for the NetAuto tool."""
 from __future__ import annotations
 
+import functools
 import ipaddress
 import logging
-from datetime import datetime, timezone
+import threading
+import time
+import weakref
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, TypeVar
+
+from netauto_lib import latency, metrics, transcripts
+from netauto_lib.backup_index import get_index
+from netauto_lib.backup_store import get_store
+from netauto_lib.config_diff import missing_commands
+from netauto_lib.ios_config import ConfigTree, parse_config
+from netauto_lib.logging_setup import current_log_context, log_context
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+SHOW_INTERFACES_COMMAND = "show ip interface brief"
+RUNNING_CONFIG_COMMAND = "show running-config"
+# Parsed running-configs are reused for this many seconds per session.
+RUNNING_CONFIG_MAX_AGE = 30.0
+
+_running_configs: "weakref.WeakKeyDictionary[Any, tuple[float, ConfigTree]]" = (
+    weakref.WeakKeyDictionary()
+)
+_running_configs_lock = threading.Lock()
+
+
+def _operation(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Run a session operation inside a log context naming it (internal).
+
+    The session's host fills in ``ip`` when no device context is active.
+    Operations called from another operation keep the outer name.
+    """
 
-def configure_interface(conn: Any) -> None:
-    """Prompt for interface details and push configuration."""
+    def decorate(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(conn: Any, *args: Any, **kwargs: Any) -> T:
+            context = current_log_context()
+            if "operation" in context:
+                return func(conn, *args, **kwargs)
+            with log_context(operation=name, ip=context.get("ip") or getattr(conn, "host", None)):
+                return func(conn, *args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def configure_interface(conn: Any, reconcile: bool = False) -> None:
+    """Prompt for interface details and push configuration.
+
+    With ``reconcile`` only lines missing from the running-config are sent.
+    """
     interface = _prompt_interface_name()
     ip_addr = _prompt_ipv4("IPv4 address: ")
     mask = _prompt_subnet_mask("Subnet mask (dotted decimal or /prefix): ")
 
-    commands = [
+    commands = interface_commands(interface, ip_addr, mask)
+    logger.info("Configuring interface %s with %s %s", interface, ip_addr, mask)
+    output = push_config(conn, commands, "interface configuration", reconcile)
+    if output is not None:
+        print(output)
+
+
+def interface_commands(interface: str, ip_addr: str, mask: str) -> list[str]:
+    """Return the configuration lines assigning an IPv4 address to an interface."""
+    return [
         f"interface {interface}",
         f"ip address {ip_addr} {mask}",
         "no shutdown",
     ]
-    logger.info("Configuring interface %s with %s %s", interface, ip_addr, mask)
-    output = _send_config(conn, commands, "interface configuration")
-    if output is not None:
-        print(output)
 
 
 def show_interfaces(conn: Any) -> None:
     """Display 'show ip interface brief' output."""
-    logger.info("Running 'show ip interface brief'")
-    output = _send_command(conn, "show ip interface brief", "interface summary")
+    output = fetch_interfaces(conn)
     if output is not None:
         print(output)
 
 
+@_operation("show-interfaces")
+def fetch_interfaces(conn: Any) -> str | None:
+    """Return 'show ip interface brief' output without printing it."""
+    logger.info("Running '%s'", SHOW_INTERFACES_COMMAND)
+    return _send_command(conn, SHOW_INTERFACES_COMMAND, "interface summary")
+
+
 def ping_test(conn: Any, default_count: int = 5) -> None:
     """Execute a ping test from the router."""
     destination = _prompt_ipv4("Destination IP: ")
     repeat = _prompt_ping_count(default_count)
-    logger.info("Pinging %s %s times", destination, repeat)
-    output = _send_command(conn, f"ping {destination} repeat {repeat}", "ping test")
+    output = run_ping(conn, destination, repeat)
     if output is not None:
         print(output)
 
 
-def backup_config(conn: Any, hostname: str, backups_dir: str) -> None:
-    """Save running configuration to disk."""
+@_operation("ping")
+def run_ping(conn: Any, destination: str, repeat: int) -> str | None:
+    """Ping ``destination`` from the router and return the raw output."""
+    logger.info("Pinging %s %s times", destination, repeat)
+    return _send_command(conn, ping_command(destination, repeat), "ping test")
+
+
+def ping_command(destination: str, repeat: int) -> str:
+    """Return the exec command pinging ``destination`` ``repeat`` times."""
+    return f"ping {destination} repeat {repeat}"
+
+
+@_operation("backup")
+def backup_config(conn: Any, hostname: str, backups_dir: str) -> Path | None:
+    """Save running configuration to the backup store and return the blob path."""
     logger.info("Backing up running-config for %s", hostname)
-    config_text = _send_command(conn, "show running-config", "running-config capture")
+    config_text = fetch_running_config(conn)
+    if config_text is None:
+        return None
+    return save_backup(hostname, config_text, backups_dir)
+
+
+@_operation("running-config")
+def fetch_running_config(conn: Any) -> str | None:
+    """Return the device's current running-config text."""
+    return _send_command(conn, RUNNING_CONFIG_COMMAND, "running-config capture")
+
+
+def running_config_tree(conn: Any, max_age: float = RUNNING_CONFIG_MAX_AGE) -> ConfigTree | None:
+    """Return the parsed running-config, reusing a capture younger than ``max_age``.
+
+    The cache is per session and is dropped whenever configuration is pushed
+    through this module.
+    """
+    try:
+        with _running_configs_lock:
+            cached = _running_configs.get(conn)
+    except TypeError:  # session objects without weakref support
+        cached = None
+    if cached is not None and time.monotonic() - cached[0] <= max_age:
+        logger.debug("Using cached running-config (%.1fs old)", time.monotonic() - cached[0])
+        return cached[1]
+    config_text = fetch_running_config(conn)
     if config_text is None:
-        return
-    backup_path = Path(backups_dir)
-    backup_path.mkdir(parents=True, exist_ok=True)
-    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
-    filename = backup_path / f"{hostname}_running_{timestamp}.txt"
-    filename.write_text(config_text, encoding="utf-8")
-    print(f"Saved running-config to {filename}")
-    logger.info("Backup stored at %s", filename)
-
-
-def configure_ospf(conn: Any) -> None:
-    """Configure basic OSPF parameters on the device."""
+        return None
+    tree = parse_config(config_text)
+    _cache_running_config(conn, tree)
+    return tree
+
+
+def save_backup(hostname: str, config_text: str, backups_dir: str) -> Path:
+    """Record a captured running-config in the deduplicated backup store."""
+    store = get_store(backups_dir)
+    previous = store.latest(hostname)
+    snapshot = store.put(hostname, config_text)
+    blob = store.blob_path(snapshot.hash)
+    get_index(backups_dir).record(snapshot, blob)
+    metrics.inc("netauto_backup_bytes_total", snapshot.size)
+    if previous is not None and previous.hash == snapshot.hash:
+        metrics.inc("netauto_backups_total", result="unchanged")
+        since = f"{previous.timestamp:%Y-%m-%d %H:%M:%S}"
+        print(f"Running-config for {hostname} unchanged since {since} UTC")
+    else:
+        metrics.inc("netauto_backups_total", result="changed")
+        print(f"Saved running-config for {hostname} to {blob}")
+    logger.info("Backup of %s recorded as %s", hostname, snapshot.hash)
+    return blob
+
+
+def configure_ospf(conn: Any, reconcile: bool = False) -> None:
+    """Configure basic OSPF parameters on the device.
+
+    With ``reconcile`` only lines missing from the running-config are sent.
+    """
     process_id = _prompt_positive_int("OSPF process ID: ")
     router_id = _prompt_ipv4("Router ID (IPv4): ")
     network = _prompt_ipv4("Network address (A.B.C.D): ")
     wildcard = _prompt_wildcard_mask("Wildcard mask: ")
     area = _prompt_area()
 
-    commands = [
-        f"router ospf {process_id}",
-        f"router-id {router_id}",
-        f"network {network} {wildcard} area {area}",
-    ]
+    commands = ospf_commands(process_id, router_id, network, wildcard, area)
     logger.info(
         "Configuring OSPF process %s, router-id %s, network %s %s area %s",
         process_id,
@@ -81,59 +190,145 @@ def configure_ospf(conn: Any) -> None:
         wildcard,
         area,
     )
-    output = _send_config(conn, commands, "OSPF configuration")
+    output = push_config(conn, commands, "OSPF configuration", reconcile)
     if output is not None:
         print(output)
 
 
+def ospf_commands(
+    process_id: int, router_id: str, network: str, wildcard: str, area: str
+) -> list[str]:
+    """Return the configuration lines for a basic OSPF process."""
+    return [
+        f"router ospf {process_id}",
+        f"router-id {router_id}",
+        f"network {network} {wildcard} area {area}",
+    ]
+
+
+@_operation("config-push")
+def push_config(
+    conn: Any,
+    commands: list[str],
+    action: str = "configuration push",
+    reconcile: bool = False,
+) -> str | None:
+    """Send ``commands`` in configuration mode without prompting.
+
+    With ``reconcile`` the commands are first compared against the running
+    config and only the missing lines are sent (see ``reconcile_config``).
+    """
+    if reconcile:
+        return reconcile_config(conn, commands, action)
+    logger.info("Pushing %d configuration lines (%s)", len(commands), action)
+    return _send_config(conn, commands, action)
+
+
+@_operation("config-push")
+def reconcile_config(
+    conn: Any, commands: list[str], action: str = "configuration push"
+) -> str | None:
+    """Push only the lines of ``commands`` the device does not already have.
+
+    When nothing is missing the device is never put into configuration mode
+    and an "already compliant" message is returned instead of device output.
+    """
+    running = running_config_tree(conn)
+    if running is None:
+        return None
+    missing = missing_commands(running, commands)
+    if not missing:
+        logger.info("Skipping %s: running-config already compliant", action)
+        return f"Already compliant: {action} not needed."
+    logger.info(
+        "Pushing %d of %d configuration lines (%s)", len(missing), len(commands), action
+    )
+    return _send_config(conn, missing, action)
+
+
+def validate_interface_name(value: str) -> str:
+    """Return the interface name with normalized casing or raise ValueError."""
+    value = value.strip()
+    if not value:
+        raise ValueError("Interface name cannot be empty.")
+    return value[0].upper() + value[1:] if len(value) > 1 else value.upper()
+
+
+def validate_ipv4(value: str) -> str:
+    """Return ``value`` as a canonical IPv4 address or raise ValueError."""
+    try:
+        return str(ipaddress.IPv4Address(value.strip()))
+    except ipaddress.AddressValueError:
+        raise ValueError("Invalid IPv4 address.") from None
+
+
+def validate_subnet_mask(value: str) -> str:
+    """Return a dotted-decimal mask from a mask or prefix length or raise ValueError."""
+    value = value.strip().lstrip("/")
+    if not value:
+        raise ValueError("Value cannot be empty.")
+    try:
+        return str(ipaddress.IPv4Network(f"0.0.0.0/{value}", strict=False).netmask)
+    except (ipaddress.AddressValueError, ValueError):
+        raise ValueError("Invalid subnet or mask. Use dotted decimal or prefix length.") from None
+
+
+def validate_positive_int(value: str | int) -> int:
+    """Return ``value`` as a positive integer or raise ValueError."""
+    text = str(value).strip()
+    if text.isdigit() and int(text) > 0:
+        return int(text)
+    raise ValueError("Enter a positive integer.")
+
+
+def validate_area(value: str) -> str:
+    """Return a non-empty OSPF area ID or raise ValueError."""
+    area = str(value).strip()
+    if not area:
+        raise ValueError("Area cannot be empty.")
+    return area
+
+
+def validate_wildcard_mask(value: str) -> str:
+    """Return ``value`` as a dotted-decimal wildcard mask or raise ValueError."""
+    try:
+        return str(ipaddress.IPv4Address(value.strip()))
+    except ipaddress.AddressValueError:
+        raise ValueError("Invalid wildcard mask. Use dotted decimal (e.g. 0.0.0.255).") from None
+
+
+def _prompt_valid(prompt_text: str, validator: Callable[[str], T], label: str) -> T:
+    """Prompt until ``validator`` accepts the input (internal)."""
+    while True:
+        try:
+            value = validator(input(prompt_text))
+        except ValueError as exc:
+            print(exc)
+            continue
+        logger.debug("%s accepted: %s", label, value)
+        return value
+
+
 def _prompt_interface_name() -> str:
     """Prompt for an interface name and normalize casing."""
-    while True:
-        value = input("Interface (e.g. GigabitEthernet0/0): ").strip()
-        if value:
-            normalized = value[0].upper() + value[1:] if len(value) > 1 else value.upper()
-            logger.debug("Interface accepted: %s", normalized)
-            return normalized
-        print("Interface name cannot be empty.")
+    return _prompt_valid(
+        "Interface (e.g. GigabitEthernet0/0): ", validate_interface_name, "Interface"
+    )
 
 
 def _prompt_ipv4(prompt_text: str) -> str:
     """Prompt for an IPv4 address and validate input."""
-    while True:
-        candidate = input(prompt_text).strip()
-        try:
-            ip_value = str(ipaddress.IPv4Address(candidate))
-            logger.debug("IPv4 accepted: %s", ip_value)
-            return ip_value
-        except ipaddress.AddressValueError:
-            print("Invalid IPv4 address. Try again.")
+    return _prompt_valid(prompt_text, validate_ipv4, "IPv4")
 
 
 def _prompt_subnet_mask(prompt_text: str) -> str:
     """Prompt for a subnet mask or prefix length and return dotted decimal."""
-    while True:
-        value = input(prompt_text).strip()
-        if not value:
-            print("Value cannot be empty.")
-            continue
-        try:
-            network = ipaddress.IPv4Network(f"0.0.0.0/{value}", strict=False)
-            mask_value = str(network.netmask)
-            logger.debug("Subnet mask accepted: %s", mask_value)
-            return mask_value
-        except (ipaddress.AddressValueError, ValueError):
-            print("Invalid subnet or mask. Use dotted decimal or prefix length.")
+    return _prompt_valid(prompt_text, validate_subnet_mask, "Subnet mask")
 
 
 def _prompt_positive_int(prompt_text: str) -> int:
     """Prompt until a positive integer is entered."""
-    while True:
-        value = input(prompt_text).strip()
-        if value.isdigit() and int(value) > 0:
-            number = int(value)
-            logger.debug("Positive integer accepted: %s", number)
-            return number
-        print("Enter a positive integer.")
+    return _prompt_valid(prompt_text, validate_positive_int, "Positive integer")
 
 
 def _prompt_ping_count(default_count: int) -> int:
@@ -142,51 +337,71 @@ def _prompt_ping_count(default_count: int) -> int:
     if not raw:
         logger.debug("Ping count default applied: %s", default_count)
         return default_count
-    if raw.isdigit() and int(raw) > 0:
-        count = int(raw)
-        logger.debug("Ping count accepted: %s", count)
-        return count
-    print("Invalid count. Using default.")
-    return default_count
+    try:
+        count = validate_positive_int(raw)
+    except ValueError:
+        print("Invalid count. Using default.")
+        return default_count
+    logger.debug("Ping count accepted: %s", count)
+    return count
 
 
 def _prompt_area() -> str:
     """Prompt until a non-empty OSPF area ID is entered."""
-    while True:
-        area = input("Area ID: ").strip()
-        if area:
-            logger.debug("Area accepted: %s", area)
-            return area
-        print("Area cannot be empty.")
+    return _prompt_valid("Area ID: ", validate_area, "Area")
 
 
 def _prompt_wildcard_mask(prompt_text: str) -> str:
     """Prompt for a wildcard mask and ensure it is a valid IPv4 address."""
-    while True:
-        value = input(prompt_text).strip()
-        try:
-            wildcard = str(ipaddress.IPv4Address(value))
-            logger.debug("Wildcard mask accepted: %s", wildcard)
-            return wildcard
-        except ipaddress.AddressValueError:
-            print("Invalid wildcard mask. Use dotted decimal (e.g. 0.0.0.255).")
+    return _prompt_valid(prompt_text, validate_wildcard_mask, "Wildcard mask")
 
 
 def _send_config(conn: Any, commands: list[str], action: str) -> str | None:
     """Execute a configuration set with error handling."""
+    _forget_running_config(conn)
+    host = getattr(conn, "host", None)
+    transcripts.record(transcripts.SENT, "\n".join(commands), host)
     try:
-        return conn.send_config_set(commands)
+        with latency.timed(latency.command_phase("config")):
+            output = conn.send_config_set(commands)
     except Exception as exc:  # pragma: no cover - Netmiko raises many subclasses
+        transcripts.record(transcripts.RECEIVED, f"% {action} failed: {exc}", host)
         logger.error("Failed during %s: %s", action, exc)
         print(f"An error occurred while performing {action}.")
         return None
+    transcripts.record(transcripts.RECEIVED, output, host)
+    return output
+
+
+def _cache_running_config(conn: Any, tree: ConfigTree) -> None:
+    """Remember ``tree`` as the latest running-config of ``conn`` (internal)."""
+    try:
+        with _running_configs_lock:
+            _running_configs[conn] = (time.monotonic(), tree)
+    except TypeError:  # session objects without weakref support
+        logger.debug("Running-config cache unavailable for %s", type(conn).__name__)
+
+
+def _forget_running_config(conn: Any) -> None:
+    """Drop the cached running-config of ``conn`` before it changes (internal)."""
+    try:
+        with _running_configs_lock:
+            _running_configs.pop(conn, None)
+    except TypeError:  # session objects without weakref support
+        pass
 
 
 def _send_command(conn: Any, command: str, action: str) -> str | None:
     """Execute an exec-mode command with error handling."""
+    host = getattr(conn, "host", None)
+    transcripts.record(transcripts.SENT, command, host)
     try:
-        return conn.send_command(command)
+        with latency.timed(latency.command_phase("command")):
+            output = conn.send_command(command)
     except Exception as exc:  # pragma: no cover
+        transcripts.record(transcripts.RECEIVED, f"% {action} failed: {exc}", host)
         logger.error("Failed during %s: %s", action, exc)
         print(f"An error occurred while performing {action}.")
         return None
+    transcripts.record(transcripts.RECEIVED, output, host)
+    return output
@@ -0,0 +1,575 @@
+"""Simulated Cisco IOS devices for offline testing and benchmarking.
+
+Each simulated device listens on its own localhost port and speaks either
+telnet (``cisco_ios_telnet``) or SSH (``cisco_ios``, requires the optional
+``asyncssh`` package). The CLI covers what NetAuto and Netmiko use:
+
+* ``Username:``/``Password:`` login (telnet) and password authentication (SSH)
+* ``>``/``#``/``(config…)#`` prompts, ``enable`` with an enable secret
+* ``terminal length``/``terminal width`` and ``--More--`` paging
+* ``show ip interface brief``, ``show running-config``, ``show version``, ``ping``
+* configuration mode; pushed lines are merged into the running-config, so
+  repeated pushes and reconcile runs behave like a real device
+
+All devices are served from one asyncio event loop, so thousands of them fit
+on a single machine. ``write_inventory`` produces a ``devices.yaml`` pointing
+at the simulated fleet::
+
+    python netautosim.py --count 1000 --inventory sim-devices.yaml
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import resource
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+import yaml
+
+from netauto_lib.config_diff import opens_section
+from netauto_lib.utils import Device
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_BASE_PORT = 20000
+DEFAULT_USERNAME = "cisco"
+DEFAULT_PASSWORD = "cisco"
+DEFAULT_PAGE_LENGTH = 24
+SIMULATED_DEVICE_TYPES = ("cisco_ios_telnet", "cisco_ios")
+
+_IAC, _DONT, _DO, _WONT, _WILL, _SB, _SE = 255, 254, 253, 252, 251, 250, 240
+_ECHO, _SGA = 1, 3
+_CTRL_Z = "\x1a"
+_MORE = " --More-- "
+_MORE_ERASE = "\b" * len(_MORE) + " " * len(_MORE) + "\b" * len(_MORE)
+_SUBMODES = {"interface": "config-if", "router": "config-router", "line": "config-line"}
+
+ReadFunc = Callable[[], Awaitable[bytes]]
+WriteFunc = Callable[[bytes], Awaitable[None]]
+
+
+@dataclass
+class SimulatorOptions:
+    """Behavior shared by every simulated device."""
+
+    username: str = DEFAULT_USERNAME
+    password: str = DEFAULT_PASSWORD
+    enable_secret: str = DEFAULT_PASSWORD
+    latency: float = 0.0
+    jitter: float = 0.0
+    interfaces: int = 4
+    config_lines: int = 0
+
+
+@dataclass
+class SimulatedDevice:
+    """State of one simulated router: hostname, port and running-config."""
+
+    name: str
+    port: int
+    index: int
+    options: SimulatorOptions
+    config: dict[str, list[str]] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if not self.config:
+            self.config = _initial_config(self.name, self.index, self.options)
+
+    @property
+    def hostname(self) -> str:
+        """Current hostname, which configuration mode may change."""
+        for line in self.config:
+            if line.startswith("hostname "):
+                return line.split(" ", 1)[1]
+        return self.name
+
+    def running_config(self) -> str:
+        """Render ``show running-config`` output."""
+        body: list[str] = []
+        for line, children in self.config.items():
+            body.append(line)
+            body.extend(f" {child}" for child in children)
+            if children:
+                body.append("!")
+        text = "\n".join(["!", "version 15.2", *body, "!", "end"])
+        return f"Building configuration...\n\nCurrent configuration : {len(text)} bytes\n{text}"
+
+    def interface_brief(self) -> str:
+        """Render ``show ip interface brief`` output."""
+        rows = [
+            f"{'Interface':<27}{'IP-Address':<16}OK? Method Status                Protocol"
+        ]
+        for line, children in self.config.items():
+            if not line.startswith("interface "):
+                continue
+            address = "unassigned"
+            for child in children:
+                if child.startswith("ip address "):
+                    address = child.split()[2]
+            if "shutdown" in children:
+                status, protocol = "administratively down", "down"
+            else:
+                status, protocol = "up", "up"
+            method = "NVRAM" if address != "unassigned" else "unset"
+            rows.append(f"{line[10:]:<27}{address:<16}YES {method:<6} {status:<21} {protocol}")
+        return "\n".join(rows)
+
+    def apply(self, section: Optional[str], command: str) -> None:
+        """Merge one configuration-mode ``command`` issued inside ``section``."""
+        if section is None:
+            if command.startswith("hostname "):
+                for line in [line for line in self.config if line.startswith("hostname ")]:
+                    del self.config[line]
+                self.config = {command: [], **self.config}
+            elif command.startswith("no "):
+                self.config.pop(command[3:], None)
+            else:
+                self.config.setdefault(command, [])
+            return
+        children = self.config.setdefault(section, [])
+        if command.startswith("no "):
+            negated = command[3:]
+            children[:] = [
+                child
+                for child in children
+                if child != negated and not child.startswith(negated + " ")
+            ]
+            # IOS shows an interface without addresses as "no ip address".
+            if command == "no ip address":
+                children.append(command)
+        elif command not in children:
+            if _is_primary_address(command):
+                children[:] = [
+                    child
+                    for child in children
+                    if not _is_primary_address(child) and child != "no ip address"
+                ]
+            children.append(command)
+
+
+class SimulatorFleet:
+    """Serve a set of simulated devices from the running event loop."""
+
+    def __init__(
+        self,
+        count: int,
+        device_type: str = "cisco_ios_telnet",
+        host: str = DEFAULT_HOST,
+        base_port: int = DEFAULT_BASE_PORT,
+        options: Optional[SimulatorOptions] = None,
+    ) -> None:
+        if device_type not in SIMULATED_DEVICE_TYPES:
+            raise ValueError(f"Unsupported simulated device type '{device_type}'")
+        self.device_type = device_type
+        self.host = host
+        self.options = options or SimulatorOptions()
+        self.devices = [
+            SimulatedDevice(f"SIM{index + 1}", base_port + index, index, self.options)
+            for index in range(count)
+        ]
+        self._servers: list[Any] = []
+
+    def inventory(self) -> list[Device]:
+        """Return inventory entries pointing at the simulated devices."""
+        return [
+            {
+                "name": device.name,
+                "ip": self.host,
+                "port": device.port,
+                "username": self.options.username,
+                "password": self.options.password,
+                "enable_secret": self.options.enable_secret,
+                "device_type": self.device_type,
+            }
+            for device in self.devices
+        ]
+
+    async def start(self) -> None:
+        """Open a listening socket for every device."""
+        _raise_open_file_limit(len(self.devices) * 3)
+        if self.device_type == "cisco_ios":
+            self._servers = await _start_ssh_servers(self)
+        else:
+            self._servers = [
+                await asyncio.start_server(
+                    _telnet_handler(device), self.host, device.port, limit=65536
+                )
+                for device in self.devices
+            ]
+        logger.info(
+            "Simulating %d %s devices on %s:%d-%d",
+            len(self.devices),
+            self.device_type,
+            self.host,
+            self.devices[0].port if self.devices else 0,
+            self.devices[-1].port if self.devices else 0,
+        )
+
+    async def stop(self) -> None:
+        """Close every listening socket."""
+        for server in self._servers:
+            server.close()
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers = []
+
+    async def __aenter__(self) -> "SimulatorFleet":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+
+def write_inventory(path: str | Path, devices: list[Device]) -> Path:
+    """Write ``devices`` to a YAML inventory readable by ``load_devices``."""
+    inventory_path = Path(path)
+    inventory_path.write_text(
+        yaml.safe_dump({"devices": [dict(device) for device in devices]}, sort_keys=False),
+        encoding="utf-8",
+    )
+    return inventory_path
+
+
+class _Terminal:
+    """Line and key reader over a raw byte stream, stripping telnet commands (internal)."""
+
+    def __init__(self, read: ReadFunc, write: WriteFunc, telnet: bool) -> None:
+        self._read = read
+        self._write = write
+        self._telnet = telnet
+        self._pending = bytearray()
+        self._skip_lf = False
+
+    async def write(self, text: str) -> None:
+        await self._write(text.replace("\r\n", "\n").replace("\n", "\r\n").encode("utf-8"))
+
+    async def read_line(self) -> Optional[str]:
+        """Return the next input line, or None once the client disconnects."""
+        while True:
+            self._drop_line_feed()
+            for index, byte in enumerate(self._pending):
+                if byte in (10, 13):
+                    line = bytes(self._pending[:index])
+                    del self._pending[: index + 1]
+                    self._skip_lf = byte == 13
+                    return line.replace(b"\0", b"").decode("utf-8", errors="replace")
+            if not await self._fill():
+                return None
+
+    async def read_key(self) -> Optional[str]:
+        """Return one keystroke (used at ``--More--``), or None on disconnect."""
+        while True:
+            self._drop_line_feed()
+            if self._pending:
+                key = chr(self._pending[0])
+                del self._pending[0]
+                self._skip_lf = key == "\r"
+                return key
+            if not await self._fill():
+                return None
+
+    def _drop_line_feed(self) -> None:
+        """Discard the LF or NUL completing a preceding CR (internal)."""
+        while self._skip_lf and self._pending and self._pending[0] in (0, 10):
+            del self._pending[0]
+        if self._pending:
+            self._skip_lf = False
+
+    async def _fill(self) -> bool:
+        data = await self._read()
+        if not data:
+            return False
+        self._pending += _strip_telnet(data) if self._telnet else data
+        return True
+
+
+async def _run_cli(device: SimulatedDevice, terminal: _Terminal, login: bool) -> None:
+    """Drive one CLI session until the client exits or disconnects (internal)."""
+    options = device.options
+    if login:
+        await terminal.write("\nUser Access Verification\n\nUsername: ")
+        username = await terminal.read_line()
+        await terminal.write("\n")
+        await terminal.write("Password: ")
+        password = await terminal.read_line()
+        if username is None or password is None:
+            return
+        if username.strip() != options.username or password != options.password:
+            await terminal.write("\n% Login invalid\n\n")
+            return
+        await terminal.write("\n")
+
+    privileged = False
+    section: Optional[str] = None
+    mode = ""
+    page_length = DEFAULT_PAGE_LENGTH
+
+    def prompt() -> str:
+        if mode:
+            return f"{device.hostname}({mode})#"
+        return f"{device.hostname}{'#' if privileged else '>'}"
+
+    await terminal.write(prompt())
+    while True:
+        raw = await terminal.read_line()
+        if raw is None:
+            return
+        command = raw.strip()
+        await terminal.write(raw + "\n")
+        if not command:
+            await terminal.write(prompt())
+            continue
+        if options.latency or options.jitter:
+            await asyncio.sleep(options.latency + random.uniform(0, options.jitter))
+
+        output = ""
+        words = command.split()
+        if mode:
+            if command in ("end", _CTRL_Z) or command.startswith(_CTRL_Z):
+                mode, section = "", None
+            elif command == "exit":
+                mode, section = ("config", None) if section is not None else ("", None)
+            elif opens_section(command):
+                section = command
+                mode = _SUBMODES.get(words[0], "config-" + words[0].split("-")[0])
+                device.config.setdefault(section, [])
+            elif command.startswith("do "):
+                output = _exec_command(device, command[3:], True) or ""
+            else:
+                device.apply(section, command)
+        elif command in ("exit", "logout", "quit"):
+            return
+        elif command == "enable":
+            if options.enable_secret and not privileged:
+                await terminal.write("Password: ")
+                secret = await terminal.read_line()
+                if secret is None:
+                    return
+                await terminal.write("\n")
+                if secret != options.enable_secret:
+                    output = "% Access denied"
+                else:
+                    privileged = True
+            else:
+                privileged = True
+        elif command == "disable":
+            privileged = False
+        elif privileged and words[0] == "configure" and words[1:2] in (["terminal"], ["t"], []):
+            mode = "config"
+            output = "Enter configuration commands, one per line.  End with CNTL/Z."
+        elif words[:2] == ["terminal", "length"] and len(words) == 3 and words[2].isdigit():
+            page_length = int(words[2])
+        elif words[0] == "terminal":
+            pass
+        else:
+            result = _exec_command(device, command, privileged)
+            output = result if result is not None else _invalid_input(prompt())
+
+        if output:
+            if not await _write_paged(terminal, output, page_length):
+                return
+        await terminal.write(prompt())
+
+
+def _exec_command(device: SimulatedDevice, command: str, privileged: bool) -> Optional[str]:
+    """Return output for a supported exec command, or None if unrecognised (internal)."""
+    words = command.split()
+    if words[:1] == ["show"] and len(words) > 1:
+        target = " ".join(words[1:])
+        if target in ("ip interface brief", "ip int brief", "ip int br"):
+            return device.interface_brief()
+        if privileged and target in ("running-config", "run", "running"):
+            return device.running_config()
+        if target in ("version", "ver"):
+            return (
+                "Cisco IOS Software, IOSv Software (VIOS-ADVENTERPRISEK9-M), "
+                "Version 15.2(4)M (NetAuto simulator)\n"
+                f"{device.hostname} uptime is 1 day, 2 hours, 3 minutes\n"
+                'System image file is "flash0:/vios-adventerprisek9-m"'
+            )
+    if words[:1] == ["ping"] and len(words) >= 2:
+        repeat = 5
+        if "repeat" in words:
+            position = words.index("repeat")
+            if position + 1 < len(words) and words[position + 1].isdigit():
+                repeat = int(words[position + 1])
+        return (
+            "Type escape sequence to abort.\n"
+            f"Sending {repeat}, 100-byte ICMP Echos to {words[1]}, timeout is 2 seconds:\n"
+            f"{'!' * repeat}\n"
+            f"Success rate is 100 percent ({repeat}/{repeat}), round-trip min/avg/max = 1/1/2 ms"
+        )
+    if privileged and words[:2] in (["write", "memory"], ["copy", "running-config"]):
+        return "Building configuration...\n[OK]"
+    return None
+
+
+async def _write_paged(terminal: _Terminal, output: str, page_length: int) -> bool:
+    """Write ``output`` honoring ``terminal length``; False if the client left (internal)."""
+    lines = output.split("\n")
+    if page_length <= 0 or len(lines) < page_length:
+        await terminal.write(output + "\n")
+        return True
+    page = page_length - 1
+    start = 0
+    while start < len(lines):
+        chunk = lines[start : start + page]
+        start += page
+        await terminal.write("\n".join(chunk) + "\n")
+        if start >= len(lines):
+            break
+        await terminal.write(_MORE)
+        key = await terminal.read_key()
+        if key is None:
+            return False
+        await terminal.write(_MORE_ERASE)
+        if key in ("q", "Q"):
+            break
+        if key in ("\r", "\n"):
+            page = 1
+        else:
+            page = page_length - 1
+    return True
+
+
+def _invalid_input(prompt: str) -> str:
+    """Return the IOS caret error for an unrecognised command (internal)."""
+    return f"{' ' * len(prompt)}^\n% Invalid input detected at '^' marker.\n"
+
+
+def _is_primary_address(line: str) -> bool:
+    """Return True for a non-secondary ``ip address`` line (internal)."""
+    return line.startswith("ip address ") and not line.endswith(" secondary")
+
+
+def _initial_config(name: str, index: int, options: SimulatorOptions) -> dict[str, list[str]]:
+    """Build the starting running-config of a simulated device (internal)."""
+    config: dict[str, list[str]] = {
+        f"hostname {name}": [],
+        "service timestamps debug datetime msec": [],
+        "no ip domain lookup": [],
+    }
+    for port in range(options.interfaces):
+        if port == 0:
+            octets = f"{10 + index // 65536}.{(index // 256) % 256}.{index % 256}"
+            lines = [f"ip address {octets}.1 255.255.255.0", "duplex auto"]
+        else:
+            lines = ["no ip address", "shutdown", "duplex auto"]
+        config[f"interface GigabitEthernet0/{port}"] = lines
+    if options.config_lines:
+        config["ip access-list extended NETAUTO-SIM"] = [
+            f"permit tcp host 10.{(n // 65536) % 256}.{(n // 256) % 256}.{n % 256} any eq 22"
+            for n in range(options.config_lines)
+        ]
+    config["line vty 0 4"] = ["login local", "transport input ssh telnet"]
+    return config
+
+
+def _strip_telnet(data: bytes) -> bytes:
+    """Drop telnet option negotiation from client input (internal)."""
+    if _IAC not in data:
+        return data
+    payload = bytearray()
+    index = 0
+    while index < len(data):
+        byte = data[index]
+        if byte != _IAC or index + 1 >= len(data):
+            payload.append(byte)
+            index += 1
+            continue
+        command = data[index + 1]
+        if command in (_DO, _DONT, _WILL, _WONT):
+            index += 3
+        elif command == _SB:
+            end = data.find(bytes([_IAC, _SE]), index)
+            index = len(data) if end == -1 else end + 2
+        elif command == _IAC:
+            payload.append(_IAC)
+            index += 2
+        else:
+            index += 2
+    return bytes(payload)
+
+
+def _telnet_handler(
+    device: SimulatedDevice,
+) -> Callable[[asyncio.StreamReader, asyncio.StreamWriter], Awaitable[None]]:
+    """Return the connection callback for a telnet device (internal)."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        async def write(data: bytes) -> None:
+            writer.write(data)
+            await writer.drain()
+
+        try:
+            writer.write(bytes([_IAC, _WILL, _ECHO, _IAC, _WILL, _SGA]))
+            await _run_cli(device, _Terminal(lambda: reader.read(65536), write, True), True)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def _start_ssh_servers(fleet: SimulatorFleet) -> list[Any]:
+    """Start one asyncssh server per device sharing a generated host key (internal)."""
+    try:
+        import asyncssh  # type: ignore[import-not-found]
+    except ModuleNotFoundError as exc:
+        raise RuntimeError("The asyncssh package is required to simulate SSH devices.") from exc
+
+    options = fleet.options
+    host_key = asyncssh.generate_private_key("ssh-ed25519")
+
+    class _Server(asyncssh.SSHServer):  # type: ignore[misc]
+        def begin_auth(self, username: str) -> bool:
+            return True
+
+        def password_auth_supported(self) -> bool:
+            return True
+
+        def validate_password(self, username: str, password: str) -> bool:
+            return username == options.username and password == options.password
+
+    def process_factory(device: SimulatedDevice) -> Callable[[Any], Awaitable[None]]:
+        async def handle(process: Any) -> None:
+            async def write(data: bytes) -> None:
+                process.stdout.write(data)
+
+            try:
+                terminal = _Terminal(lambda: process.stdin.read(65536), write, False)
+                await _run_cli(device, terminal, False)
+            except (ConnectionError, asyncssh.Error):
+                pass
+            finally:
+                process.exit(0)
+
+        return handle
+
+    return [
+        await asyncssh.create_server(
+            _Server,
+            fleet.host,
+            device.port,
+            server_host_keys=[host_key],
+            process_factory=process_factory(device),
+            encoding=None,
+            line_editor=False,
+        )
+        for device in fleet.devices
+    ]
+
+
+def _raise_open_file_limit(wanted: int) -> None:
+    """Raise the soft descriptor limit towards ``wanted`` where allowed (internal)."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+    if soft != resource.RLIM_INFINITY and soft < target:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+        logger.info("Raised open file limit from %d to %d", soft, target)
@@ -0,0 +1,221 @@
+"""Per-device session transcripts written off the session threads.
+
+When enabled (``TRANSCRIPTS_DIR`` or ``enable_transcripts()``), every command
+sent through ``operations`` or an asyncio session and the raw output received
+are appended to ``<dir>/<device>.log``::
+
+    [2024-05-01 10:00:00.123] >>> show ip interface brief
+    [2024-05-01 10:00:00.180] <<<
+    Interface              IP-Address      OK? Method Status                Protocol
+    ...
+
+The device name comes from the active ``log_context`` (set by fleet runs and
+the interactive menu), falling back to the session host. Sessions only put
+entries on a bounded queue; one background thread owns the files, writes
+through large buffers and flushes when the queue goes idle. A file that
+grows past ``max_bytes`` is closed, renamed to ``<device>.<UTC stamp>.log``
+and gzipped. When the queue is full, entries are dropped and counted
+instead of slowing the session.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import queue
+import re
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, Optional
+
+from netauto_lib.logging_setup import current_log_context
+
+logger = logging.getLogger(__name__)
+
+SENT = ">>>"
+RECEIVED = "<<<"
+DEFAULT_MAX_BYTES = 5_000_000
+DEFAULT_QUEUE_SIZE = 10_000
+# Idle time after which buffered transcript data is flushed to disk.
+FLUSH_INTERVAL = 1.0
+_BUFFER_SIZE = 256 * 1024
+_MAX_OPEN_FILES = 256
+_UNSAFE_CHARS = re.compile(r"[^A-Za-z0-9._-]")
+_STOP = object()
+
+_writer: Optional["TranscriptWriter"] = None
+_atexit_registered = False
+
+
+class TranscriptWriter:
+    """Background writer owning one buffered, rotating file per device."""
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        compress: bool = True,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max(1, max_bytes)
+        self.compress = compress
+        self.dropped = 0
+        self.written = 0
+        self.rotations = 0
+        self._counter_lock = threading.Lock()
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_size))
+        # device file name -> [handle, approximate size]; ordered by last use.
+        self._files: dict[str, list[Any]] = {}
+        self._thread = threading.Thread(
+            target=self._run, name="netauto-transcripts", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, device: str, direction: str, text: str) -> None:
+        """Queue one transcript entry; never blocks the calling session."""
+        try:
+            self._queue.put_nowait((time.time(), device, direction, text))
+        except queue.Full:
+            with self._counter_lock:
+                self.dropped += 1
+
+    def close(self) -> None:
+        """Write everything still queued, then close all files."""
+        self._queue.put(_STOP)
+        self._thread.join()
+        if self.dropped:
+            logger.warning("Transcript queue overflowed: %d entries dropped", self.dropped)
+
+    def stats(self) -> dict[str, int]:
+        """Return queue depth, written/dropped entries and rotations."""
+        with self._counter_lock:
+            return {
+                "depth": self._queue.qsize(),
+                "written": self.written,
+                "dropped": self.dropped,
+                "rotations": self.rotations,
+                "open_files": len(self._files),
+            }
+
+    def _run(self) -> None:
+        """Writer thread: drain the queue and flush when it goes idle (internal)."""
+        while True:
+            try:
+                entry = self._queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                self._flush_all()
+                continue
+            if entry is _STOP:
+                break
+            try:
+                self._write(*entry)
+            except OSError as exc:  # pragma: no cover - disk full or permissions
+                logger.error("Transcript write failed: %s", exc)
+            if self._queue.empty():
+                self._flush_all()
+        for name in list(self._files):
+            self._close_file(name)
+
+    def _write(self, created: float, device: str, direction: str, text: str) -> None:
+        """Append one entry to the device's file, rotating it when full (internal)."""
+        name = _UNSAFE_CHARS.sub("_", device) or "unknown"
+        state = self._open_file(name)
+        stamp = datetime.fromtimestamp(created, timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")
+        if direction == SENT:
+            chunk = "".join(f"[{stamp[:-3]}] {SENT} {line}\n" for line in text.splitlines())
+        else:
+            body = text if text.endswith("\n") or not text else text + "\n"
+            chunk = f"[{stamp[:-3]}] {RECEIVED}\n{body}"
+        state[0].write(chunk)
+        state[1] += len(chunk)
+        with self._counter_lock:
+            self.written += 1
+        if state[1] >= self.max_bytes:
+            self._rotate(name)
+
+    def _open_file(self, name: str) -> list[Any]:
+        """Return the open handle state for ``name``, opening it if needed (internal)."""
+        state = self._files.pop(name, None)
+        if state is None:
+            if len(self._files) >= _MAX_OPEN_FILES:
+                self._close_file(next(iter(self._files)))
+            path = self.directory / f"{name}.log"
+            handle: IO[str] = path.open("a", encoding="utf-8", buffering=_BUFFER_SIZE)
+            state = [handle, path.stat().st_size]
+        self._files[name] = state
+        return state
+
+    def _close_file(self, name: str) -> None:
+        """Close the handle for ``name`` (internal)."""
+        state = self._files.pop(name, None)
+        if state is not None:
+            state[0].close()
+
+    def _flush_all(self) -> None:
+        """Flush every open buffer (internal)."""
+        for handle, _ in self._files.values():
+            handle.flush()
+
+    def _rotate(self, name: str) -> None:
+        """Close the current segment, rename it and optionally gzip it (internal)."""
+        self._close_file(name)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        segment = self.directory / f"{name}.{stamp}.log"
+        os.replace(self.directory / f"{name}.log", segment)
+        with self._counter_lock:
+            self.rotations += 1
+        if self.compress:
+            import gzip
+
+            with segment.open("rb") as source, gzip.open(f"{segment}.gz", "wb") as target:
+                shutil.copyfileobj(source, target)
+            segment.unlink()
+
+
+def enable_transcripts(
+    directory: str | Path,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    compress: bool = True,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+) -> TranscriptWriter:
+    """Start recording session transcripts under ``directory``."""
+    global _writer, _atexit_registered
+
+    disable_transcripts()
+    _writer = TranscriptWriter(directory, max_bytes, compress, queue_size)
+    if not _atexit_registered:
+        atexit.register(disable_transcripts)
+        _atexit_registered = True
+    logger.info("Writing session transcripts to %s", _writer.directory)
+    return _writer
+
+
+def disable_transcripts() -> None:
+    """Flush and stop the transcript writer, if one is running."""
+    global _writer
+
+    writer, _writer = _writer, None
+    if writer is not None:
+        writer.close()
+
+
+def transcript_stats() -> Optional[dict[str, int]]:
+    """Return the running writer's counters, or None when transcripts are off."""
+    return _writer.stats() if _writer is not None else None
+
+
+def record(direction: str, text: str, host: Optional[str] = None) -> None:
+    """Add ``text`` sent (``SENT``) or received (``RECEIVED``) to the current device's transcript.
+
+    A no-op unless transcripts are enabled.
+    """
+    writer = _writer
+    if writer is None:
+        return
+    device = current_log_context().get("device") or host or "unknown"
+    writer.submit(str(device), direction, text)
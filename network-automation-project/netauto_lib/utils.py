@@ -8,15 +8,20 @@ Expected device structure::
         "username": "admin",
         "device_type": "cisco_ios"
     }
+
+Large inventories can use ``DeviceRecord`` instead: a read-only mapping with
+the same keys stored in ``__slots__``.
 """
 from __future__ import annotations
 
 import logging
-from typing import Optional, TypedDict
+import sys
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any, Optional, TypedDict
 
 
-class Device(TypedDict):
-    """Inventory entry describing a managed device."""
+class _RequiredDeviceFields(TypedDict):
+    """Keys every inventory entry must provide (internal)."""
 
     name: str
     ip: str
@@ -24,6 +29,103 @@ class Device(TypedDict):
     device_type: str
 
 
+class Device(_RequiredDeviceFields, total=False):
+    """Inventory entry describing a managed device."""
+
+    port: int
+    password: str
+    enable_secret: str
+    site: str
+    groups: list[str]
+    tags: list[str]
+
+
+DEVICE_FIELDS = (
+    "name",
+    "ip",
+    "username",
+    "device_type",
+    "password",
+    "enable_secret",
+    "port",
+    "site",
+    "groups",
+    "tags",
+)
+
+
+class DeviceRecord(Mapping[str, Any]):
+    """Compact, read-only inventory entry that reads like a ``Device`` dict.
+
+    Fields live in ``__slots__`` and the frequently repeated ``username``
+    and ``device_type`` strings are interned, so a record takes a fraction
+    of a dict's memory. Unset optional fields are absent from the mapping,
+    matching a ``Device`` without those keys; ``record["name"]``,
+    ``record.get("port")``, ``dict(record)`` and ``{**record}`` all work.
+    ``groups`` and ``tags`` are tuples rather than lists.
+    """
+
+    __slots__ = DEVICE_FIELDS
+
+    def __init__(
+        self,
+        name: str,
+        ip: str,
+        username: str,
+        device_type: str = "cisco_ios",
+        password: Optional[str] = None,
+        enable_secret: Optional[str] = None,
+        port: Optional[int] = None,
+        site: Optional[str] = None,
+        groups: Optional[Iterable[str]] = None,
+        tags: Optional[Iterable[str]] = None,
+    ) -> None:
+        self.name = name
+        self.ip = ip
+        self.username = sys.intern(username)
+        self.device_type = sys.intern(device_type)
+        self.password = password
+        self.enable_secret = enable_secret
+        self.port = port
+        self.site = sys.intern(site) if site is not None else None
+        self.groups = tuple(sys.intern(group) for group in groups) if groups else None
+        self.tags = tuple(sys.intern(tag) for tag in tags) if tags else None
+
+    @classmethod
+    def from_mapping(cls, entry: Mapping[str, Any]) -> "DeviceRecord":
+        """Build a record from a ``Device`` dict or any mapping with its keys."""
+        return cls(*(entry.get(field) for field in DEVICE_FIELDS))
+
+    def __getitem__(self, key: str) -> Any:
+        if key in DEVICE_FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in DEVICE_FIELDS:
+            value = getattr(self, key)
+            if value is not None:
+                return value
+        return default
+
+    def __contains__(self, key: object) -> bool:
+        return key in DEVICE_FIELDS and getattr(self, str(key)) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (field for field in DEVICE_FIELDS if getattr(self, field) is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (DeviceRecord, tuple(getattr(self, field) for field in DEVICE_FIELDS))
+
+    def __repr__(self) -> str:
+        return f"DeviceRecord(name={self.name!r}, ip={self.ip!r}, device_type={self.device_type!r})"
+
+
 logger = logging.getLogger(__name__)
 
 
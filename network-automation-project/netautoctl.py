@@ -0,0 +1,105 @@
+"""Thin client for the NetAuto daemon.
+
+Only the standard library is imported so each call costs milliseconds. The
+daemon must already be running (``python netautod.py``).
+
+Examples::
+
+    python netautoctl.py status
+    python netautoctl.py backup R1 R2
+    python netautoctl.py ping R1 --destination 10.1.12.2 --repeat 3
+    python netautoctl.py set-interface R1 --interface Gi0/1 --ip 10.0.0.1 --mask 24
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+import sys
+from typing import Any
+
+DEFAULT_SOCKET_PATH = "netauto.sock"
+
+
+def call(method: str, params: dict[str, Any], socket_path: str) -> dict[str, Any]:
+    """Send one request to the daemon and return the decoded reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(json.dumps({"method": method, "params": params}).encode("utf-8") + b"\n")
+        with client.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        return {"ok": False, "error": "Daemon closed the connection without replying."}
+    return json.loads(line)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the argument parser for the client commands."""
+    parser = argparse.ArgumentParser(description="Send requests to a running NetAuto daemon.")
+    parser.add_argument(
+        "--socket",
+        default=os.getenv("NETAUTO_SOCKET", DEFAULT_SOCKET_PATH),
+        help="daemon socket path (default: $NETAUTO_SOCKET or netauto.sock)",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="show daemon and pool status")
+    devices = commands.add_parser("devices", help="list inventory devices")
+    devices.add_argument("devices", nargs="*", help="only list devices matching these selectors")
+    commands.add_parser("reload", help="re-read the inventory")
+    commands.add_parser("shutdown", help="stop the daemon")
+
+    for name, help_text in (
+        ("backup", "back up running-config"),
+        ("show-interfaces", "show ip interface brief"),
+        ("ping", "ping from the device"),
+        ("set-interface", "assign an IPv4 address to an interface"),
+        ("ospf", "configure a basic OSPF process"),
+    ):
+        sub = commands.add_parser(name, help=help_text)
+        sub.add_argument("devices", nargs="+", help="device names, 'all' or selectors")
+        if name == "ping":
+            sub.add_argument("--destination", required=True)
+            sub.add_argument("--repeat", type=int)
+        elif name == "set-interface":
+            sub.add_argument("--interface", required=True)
+            sub.add_argument("--ip", required=True)
+            sub.add_argument("--mask", required=True)
+        elif name == "ospf":
+            sub.add_argument("--process-id", required=True)
+            sub.add_argument("--router-id", required=True)
+            sub.add_argument("--network", required=True)
+            sub.add_argument("--wildcard", required=True)
+            sub.add_argument("--area", required=True)
+        if name in ("set-interface", "ospf"):
+            sub.add_argument(
+                "--reconcile",
+                action=argparse.BooleanOptionalAction,
+                default=None,
+                help="only send lines missing from the running-config (default: RECONCILE_CONFIG)",
+            )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Parse arguments, call the daemon and print the reply as JSON."""
+    args = build_parser().parse_args(argv)
+    params = {
+        key: value
+        for key, value in vars(args).items()
+        if key not in ("socket", "command", "devices") and value is not None
+    }
+    if getattr(args, "devices", None):
+        params["device"] = "all" if args.devices == ["all"] else args.devices
+    method = args.command.replace("-", "_")
+    try:
+        reply = call(method, params, args.socket)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"NetAuto daemon is not running at {args.socket}.", file=sys.stderr)
+        return 2
+    print(json.dumps(reply.get("result") if reply.get("ok") else reply, indent=2))
+    return 0 if reply.get("ok") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""Start the NetAuto daemon on a local Unix domain socket."""
+from __future__ import annotations
+
+import os
+import sys
+
+from netauto_lib.config_loader import get_global_settings, load_env
+from netauto_lib.daemon import DEFAULT_SOCKET_PATH, NetAutoDaemon
+from netauto_lib.logging_setup import setup_logging
+from netauto_lib.transcripts import enable_transcripts
+
+
+def main() -> None:
+    """Load settings and inventory once, then serve requests until shutdown."""
+    load_env()
+    settings = get_global_settings()
+    setup_logging(str(settings["logs_dir"]))
+    if settings["transcripts_dir"]:
+        enable_transcripts(
+            settings["transcripts_dir"],
+            settings["transcript_max_bytes"],
+            settings["transcript_compress"],
+        )
+    socket_path = os.getenv("NETAUTO_SOCKET", DEFAULT_SOCKET_PATH)
+    try:
+        NetAutoDaemon(settings["inventory_path"], settings).serve(socket_path)
+    except RuntimeError as exc:
+        sys.exit(str(exc))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Run simulated IOS devices on localhost for offline testing and benchmarks."""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+
+from netauto_lib.simulator import (
+    DEFAULT_BASE_PORT,
+    DEFAULT_HOST,
+    SIMULATED_DEVICE_TYPES,
+    SimulatorFleet,
+    SimulatorOptions,
+    write_inventory,
+)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the argument parser for the simulator."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=10, help="number of devices (default: 10)")
+    parser.add_argument(
+        "--device-type",
+        choices=SIMULATED_DEVICE_TYPES,
+        default="cisco_ios_telnet",
+        help="transport to simulate; cisco_ios (SSH) needs asyncssh",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help="listen address")
+    parser.add_argument(
+        "--base-port",
+        type=int,
+        default=DEFAULT_BASE_PORT,
+        help=f"port of the first device; one port per device (default: {DEFAULT_BASE_PORT})",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds added to every command"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="random extra seconds per command (0..N)"
+    )
+    parser.add_argument(
+        "--interfaces", type=int, default=4, help="interfaces per device (default: 4)"
+    )
+    parser.add_argument(
+        "--config-lines",
+        type=int,
+        default=0,
+        help="extra ACL lines to grow 'show running-config' output",
+    )
+    parser.add_argument(
+        "--inventory",
+        default="sim-devices.yaml",
+        help="inventory file to write for the simulated fleet (default: sim-devices.yaml)",
+    )
+    return parser
+
+
+async def serve(args: argparse.Namespace) -> None:
+    """Start the simulated fleet and serve until cancelled."""
+    options = SimulatorOptions(
+        latency=args.latency,
+        jitter=args.jitter,
+        interfaces=args.interfaces,
+        config_lines=args.config_lines,
+    )
+    fleet = SimulatorFleet(args.count, args.device_type, args.host, args.base_port, options)
+    async with fleet:
+        path = write_inventory(args.inventory, fleet.inventory())
+        print(
+            f"Simulating {args.count} {args.device_type} devices on "
+            f"{args.host}:{args.base_port}-{args.base_port + args.count - 1}; inventory: {path}"
+        )
+        await asyncio.Event().wait()
+
+
+def main() -> None:
+    """Parse arguments and run the simulator until interrupted."""
+    args = build_parser().parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("Simulator stopped.")
+
+
+if __name__ == "__main__":
+    main()
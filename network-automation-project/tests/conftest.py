@@ -0,0 +1,81 @@
+"""Shared fixtures: run simulated devices on a background event loop."""
+from __future__ import annotations
+
+import asyncio
+import socket
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_DIR))
+
+from netauto_lib.simulator import DEFAULT_HOST, SimulatorFleet  # noqa: E402
+
+
+def free_base_port(count: int) -> int:
+    """Return the first of ``count`` consecutive free localhost ports."""
+    for _ in range(50):
+        with socket.socket() as probe:
+            probe.bind((DEFAULT_HOST, 0))
+            base = probe.getsockname()[1]
+        if base + count > 65535:
+            continue
+        sockets: list[socket.socket] = []
+        try:
+            for port in range(base, base + count):
+                sock = socket.socket()
+                sockets.append(sock)
+                sock.bind((DEFAULT_HOST, port))
+        except OSError:
+            continue
+        finally:
+            for sock in sockets:
+                sock.close()
+        return base
+    raise RuntimeError("No free port range found")
+
+
+async def _shutdown(fleet: SimulatorFleet) -> None:
+    """Stop listening and cancel sessions still being served (internal)."""
+    await fleet.stop()
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@contextmanager
+def running_fleet(count: int, device_type: str) -> Iterator[SimulatorFleet]:
+    """Serve a ``SimulatorFleet`` from a daemon thread for the duration of the block."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    fleet = SimulatorFleet(count, device_type, base_port=free_base_port(count))
+    asyncio.run_coroutine_threadsafe(fleet.start(), loop).result(timeout=30)
+    try:
+        yield fleet
+    finally:
+        asyncio.run_coroutine_threadsafe(_shutdown(fleet), loop).result(timeout=30)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=30)
+        loop.close()
+
+
+@pytest.fixture
+def telnet_fleet() -> Iterator[SimulatorFleet]:
+    """Two simulated telnet devices with fresh configuration."""
+    with running_fleet(2, "cisco_ios_telnet") as fleet:
+        yield fleet
+
+
+@pytest.fixture
+def ssh_fleet() -> Iterator[SimulatorFleet]:
+    """One simulated SSH device; skipped without asyncssh."""
+    pytest.importorskip("asyncssh")
+    with running_fleet(1, "cisco_ios") as fleet:
+        yield fleet
@@ -0,0 +1,173 @@
+"""Async telnet/SSH sessions against the device simulator."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from netauto_lib.async_transport import (
+    AsyncTelnetSession,
+    AsyncTransportError,
+    open_async_session,
+)
+from netauto_lib.credentials import Credentials
+from netauto_lib.simulator import DEFAULT_PASSWORD, DEFAULT_USERNAME
+
+CREDENTIALS = Credentials(DEFAULT_USERNAME, DEFAULT_PASSWORD, DEFAULT_PASSWORD)
+IAC_WILL_ECHO = bytes([255, 251, 1])
+
+
+def test_negotiation_only_segment_is_not_end_of_stream() -> None:
+    async def scenario() -> tuple[str, str]:
+        session = AsyncTelnetSession("127.0.0.1", "u", "p")
+        reader = asyncio.StreamReader()
+        session._reader = reader
+        reader.feed_data(IAC_WILL_ECHO)
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.05, reader.feed_data, b"Username: ")
+        first = await session._read()
+        reader.feed_eof()
+        return first, await session._read()
+
+    first, after_eof = asyncio.run(scenario())
+    assert first == "Username: "
+    assert after_eof == ""
+
+
+def test_login_survives_negotiation_in_its_own_segment() -> None:
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        writer.write(IAC_WILL_ECHO)
+        await writer.drain()
+        await asyncio.sleep(0.05)
+        writer.write(b"Username: ")
+        await reader.readline()
+        writer.write(b"Password: ")
+        await reader.readline()
+        writer.write(b"\r\nR1#")
+        await reader.readline()
+        writer.write(b"terminal length 0\r\nR1#")
+        await writer.drain()
+        await reader.read()
+        writer.close()
+
+    async def scenario() -> str:
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            device = {"ip": "127.0.0.1", "port": port, "device_type": "cisco_ios_telnet"}
+            session = await open_async_session(device, CREDENTIALS, timeout=5)
+            prompt = session.base_prompt
+            await session.disconnect()
+            return prompt
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    assert asyncio.run(scenario()) == "R1"
+
+
+def test_telnet_session_runs_commands_and_config(telnet_fleet) -> None:
+    device = telnet_fleet.inventory()[0]
+
+    async def scenario() -> tuple[str, str, str]:
+        async with await open_async_session(device, CREDENTIALS, timeout=10) as session:
+            version = await session.send_command("show version")
+            await session.send_config_set(
+                ["interface GigabitEthernet0/1", "description uplink to core"]
+            )
+            running = await session.send_command("show running-config")
+            return session.base_prompt, version, running
+
+    prompt, version, running = asyncio.run(scenario())
+    assert prompt == "SIM1"
+    assert "NetAuto simulator" in version
+    assert not version.startswith("show version")
+    assert " description uplink to core" in running
+    assert running.rstrip().endswith("end")
+
+
+def test_ssh_session_logs_in_and_runs_commands(ssh_fleet) -> None:
+    device = ssh_fleet.inventory()[0]
+
+    async def scenario() -> tuple[str, str]:
+        async with await open_async_session(device, CREDENTIALS, timeout=10) as session:
+            return session.base_prompt, await session.send_command("show ip interface brief")
+
+    prompt, brief = asyncio.run(scenario())
+    assert prompt == "SIM1"
+    assert "GigabitEthernet0/0" in brief
+
+
+def test_failed_login_closes_transport(telnet_fleet, monkeypatch) -> None:
+    device = telnet_fleet.inventory()[0]
+    closed: list[AsyncTelnetSession] = []
+    original_close = AsyncTelnetSession._close
+
+    async def tracking_close(self: AsyncTelnetSession) -> None:
+        closed.append(self)
+        await original_close(self)
+
+    monkeypatch.setattr(AsyncTelnetSession, "_close", tracking_close)
+    with pytest.raises(AsyncTransportError):
+        asyncio.run(
+            open_async_session(device, Credentials(DEFAULT_USERNAME, "wrong"), timeout=5)
+        )
+    assert len(closed) == 1
+    assert closed[0]._writer is None
+
+
+def test_unreachable_device_raises_transport_error(telnet_fleet) -> None:
+    device = dict(telnet_fleet.inventory()[0], port=telnet_fleet.devices[-1].port + 1)
+    with pytest.raises(AsyncTransportError):
+        asyncio.run(open_async_session(device, CREDENTIALS, timeout=5))
+
+
+@pytest.mark.parametrize(
+    "chunks",
+    [
+        [b"ab\xff", b"\xfb\x01cd"],
+        [b"ab\xff\xfd", b"\x01cd"],
+        [b"ab\xff\xfa\x18\x00xterm", b"\xff", b"\xf0cd"],
+        [b"ab\xff", b"\xffcd"],
+    ],
+)
+def test_telnet_command_split_across_reads(chunks: list[bytes]) -> None:
+    session = AsyncTelnetSession("127.0.0.1", "u", "p")
+    payload = b"".join(session._negotiate(chunk) for chunk in chunks)
+    expected = b"ab\xffcd" if chunks[-1].startswith(b"\xffcd") else b"abcd"
+    assert payload == expected
+    assert session._partial == b""
+
+
+def test_prompt_like_output_line_does_not_end_command() -> None:
+    output = b"show running-config\r\nbanner motd ^\r\nR1#\r\n^\r\nend\r\nR1#"
+    split = output.index(b"R1#\r\n") + len(b"R1#\r\n")
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        writer.write(b"R1#")
+        await reader.readline()
+        writer.write(b"terminal length 0\r\nR1#")
+        await reader.readline()
+        # The echo and the first prompt-like line arrive before the rest of the output.
+        writer.write(output[:split])
+        await writer.drain()
+        await asyncio.sleep(0.05)
+        writer.write(output[split:])
+        await writer.drain()
+        await reader.read()
+        writer.close()
+
+    async def scenario() -> str:
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            device = {"ip": "127.0.0.1", "port": port, "device_type": "cisco_ios_telnet"}
+            session = await open_async_session(device, CREDENTIALS, timeout=5)
+            result = await session.send_command("show running-config")
+            await session.disconnect()
+            return result
+        finally:
+            server.close()
+            await server.wait_closed()
+
+    assert asyncio.run(scenario()).splitlines() == ["banner motd ^", "R1#", "^", "end"]
@@ -0,0 +1,76 @@
+"""Delta-compressed backup history: chains, keyframes, reconstruction and diffs."""
+from __future__ import annotations
+
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import pytest
+
+import netauto
+from netauto_lib.backup_store import BackupStore, _apply_delta, _line_delta
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _config(version: int) -> str:
+    acl = "".join(f" permit tcp host 10.0.{n}.1 any eq 22\n" for n in range(200))
+    return f"hostname R1\n!\nip access-list extended MGMT\n{acl}!\nbanner motd v{version}\nend\n"
+
+
+def _fill(store: BackupStore, versions: int) -> list[Any]:
+    return [
+        store.put("R1", _config(version), T0 + timedelta(hours=version))
+        for version in range(versions)
+    ]
+
+
+def test_line_delta_round_trips() -> None:
+    base = "a\nb\nc\nd\n"
+    for new in ("a\nb\nc\nd\n", "a\nx\nc\nd\ne\n", "", "d\nc\n", "a\nb\nc\nd"):
+        assert _apply_delta(base, _line_delta(base, new)) == new
+
+
+def test_changed_configs_are_stored_as_deltas_with_keyframes(tmp_path: Any) -> None:
+    store = BackupStore(tmp_path, keyframe_interval=3)
+    snapshots = _fill(store, 7)
+    kinds = [
+        "delta" if store.blob_path(snap.hash).name.endswith(".delta.gz") else "full"
+        for snap in snapshots
+    ]
+    assert kinds == ["full", "delta", "delta", "full", "delta", "delta", "full"]
+    full_size = store._full_path(snapshots[0].hash).stat().st_size
+    assert store.blob_path(snapshots[1].hash).stat().st_size < full_size
+
+
+def test_every_version_reads_back_exactly(tmp_path: Any) -> None:
+    snapshots = _fill(BackupStore(tmp_path, keyframe_interval=4), 9)
+    fresh = BackupStore(tmp_path, keyframe_interval=4)
+    for version, snapshot in enumerate(snapshots):
+        assert fresh.read(snapshot) == _config(version)
+
+
+def test_long_delta_chain_reads_without_recursion(tmp_path: Any) -> None:
+    snapshots = _fill(BackupStore(tmp_path, keyframe_interval=1000), 300)
+    assert len(list(tmp_path.rglob("*.delta.gz"))) == 299
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(200)
+    try:
+        text = BackupStore(tmp_path).read(snapshots[-1])
+    finally:
+        sys.setrecursionlimit(limit)
+    assert text == _config(299)
+
+
+def test_keyframe_interval_one_disables_deltas(tmp_path: Any) -> None:
+    store = BackupStore(tmp_path, keyframe_interval=1)
+    snapshots = _fill(store, 3)
+    assert all(store._full_path(snap.hash).exists() for snap in snapshots)
+    assert not list(tmp_path.rglob("*.delta.gz"))
+
+
+def test_diff_rejects_live_with_fleet(capsys: Any) -> None:
+    with pytest.raises(SystemExit) as exit_info:
+        netauto.main(["diff", "--fleet", "--live"])
+    assert exit_info.value.code == 2
+    assert "--live: not allowed with argument --fleet" in capsys.readouterr().err
@@ -0,0 +1,103 @@
+"""SQLite backup catalogue: change flags and history queries."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterator
+
+import pytest
+
+import netauto
+from netauto_lib import operations
+from netauto_lib.backup_index import BackupIndex, parse_timestamp
+from netauto_lib.backup_store import BackupStore
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def catalogue(tmp_path: Any) -> Iterator[tuple[BackupStore, BackupIndex]]:
+    store = BackupStore(tmp_path)
+    index = BackupIndex(tmp_path / "index.sqlite3")
+    captures = [
+        ("R1", "hostname R1\n", T0),
+        ("R1", "hostname R1\n", T0 + timedelta(days=1)),
+        ("R1", "hostname R1\nip domain-name a\n", T0 + timedelta(days=2)),
+        ("R2", "hostname R2\n", T0 + timedelta(days=1)),
+        ("R2", "hostname R2\n", T0 + timedelta(days=3)),
+    ]
+    for device, text, when in captures:
+        snapshot = store.put(device, text, when)
+        index.record(snapshot, store.blob_path(snapshot.hash))
+    yield store, index
+    index.close()
+
+
+def test_history_is_newest_first_with_change_flags(catalogue: Any) -> None:
+    _, index = catalogue
+    history = index.history("R1")
+    assert [entry.timestamp for entry in history] == [
+        T0 + timedelta(days=2),
+        T0 + timedelta(days=1),
+        T0,
+    ]
+    assert [entry.changed for entry in history] == [True, False, True]
+    assert len(index.history("R1", limit=1)) == 1
+    assert index.history("R9") == []
+
+
+def test_latest_per_device(catalogue: Any) -> None:
+    _, index = catalogue
+    latest = index.latest_per_device()
+    assert [(entry.device, entry.timestamp) for entry in latest] == [
+        ("R1", T0 + timedelta(days=2)),
+        ("R2", T0 + timedelta(days=3)),
+    ]
+    assert index.latest("R2") == latest[1]
+
+
+def test_out_of_order_records_keep_change_flags_by_time(catalogue: Any) -> None:
+    store, index = catalogue
+    for text, days in [("v1\n", 2), ("v1\n", 0), ("v2\n", 1)]:
+        snapshot = store.put("R3", text, T0 + timedelta(days=days))
+        index.record(snapshot, store.blob_path(snapshot.hash))
+    history = index.history("R3")
+    assert [entry.timestamp for entry in history] == [T0 + timedelta(days=d) for d in (2, 1, 0)]
+    assert [entry.changed for entry in history] == [True, True, True]
+    assert index.latest("R3") == history[0]
+
+    snapshot = store.put("R3", "v1\n", T0 + timedelta(days=1, hours=12))
+    index.record(snapshot, store.blob_path(snapshot.hash))
+    assert [entry.changed for entry in index.history("R3")] == [False, True, True, True]
+
+
+def test_changed_since_ignores_unchanged_captures(catalogue: Any) -> None:
+    _, index = catalogue
+    assert index.changed_since(T0) == ["R1", "R2"]
+    assert index.changed_since(T0 + timedelta(days=1, hours=1)) == ["R1"]
+    assert index.changed_since(T0 + timedelta(days=2, hours=1)) == []
+
+
+def test_rebuild_matches_incremental_index(catalogue: Any) -> None:
+    store, index = catalogue
+    before = index.history("R1") + index.history("R2")
+    assert index.rebuild(store) == 5
+    assert index.history("R1") + index.history("R2") == before
+
+
+def test_parse_timestamp_defaults_to_utc() -> None:
+    assert parse_timestamp("2025-01-02") == datetime(2025, 1, 2, tzinfo=timezone.utc)
+    assert parse_timestamp("2025-01-02T03:00Z") == datetime(2025, 1, 2, 3, tzinfo=timezone.utc)
+
+
+def test_backups_cli_reads_the_catalogue(tmp_path: Any, monkeypatch: Any, capsys: Any) -> None:
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("BACKUPS_DIR", str(tmp_path / "backups"))
+    monkeypatch.setenv("LOGS_DIR", str(tmp_path / "logs"))
+    operations.save_backup("R1", "hostname R1\n", str(tmp_path / "backups"))
+    capsys.readouterr()
+
+    assert netauto.main(["backups", "history", "R1"]) == 0
+    assert "R1" in capsys.readouterr().out
+    assert netauto.main(["backups", "history", "R9"]) == 1
+    assert netauto.main(["backups", "changed-since", "2000-01-01"]) == 0
+    assert capsys.readouterr().out.split()[-1] == "R1"
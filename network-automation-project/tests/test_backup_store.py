@@ -0,0 +1,82 @@
+"""Content-addressed backup store: deduplication, lookups and device names."""
+from __future__ import annotations
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from netauto_lib.backup_index import BackupIndex
+from netauto_lib.backup_store import MANIFESTS_DIR, OBJECTS_DIR, BackupStore
+
+T0 = datetime(2025, 1, 1, tzinfo=timezone.utc)
+CONFIG = "hostname R1\n!\ninterface GigabitEthernet0/0\n ip address 10.0.0.1 255.255.255.0\n!\n"
+
+
+def _objects(store: BackupStore) -> list[Any]:
+    return sorted((store.root / OBJECTS_DIR).rglob("*.gz"))
+
+
+def test_identical_captures_share_one_object(tmp_path: Any) -> None:
+    store = BackupStore(tmp_path)
+    first = store.put("R1", CONFIG, T0)
+    second = store.put("R1", CONFIG, T0 + timedelta(days=1))
+    store.put("R2", CONFIG, T0)
+    assert first.hash == second.hash
+    assert len(_objects(store)) == 1
+    assert [snap.timestamp for snap in store.history("R1")] == [first.timestamp, second.timestamp]
+    assert store.read(store.latest("R2")) == CONFIG
+
+
+def test_concurrent_captures_store_each_object_once(tmp_path: Any) -> None:
+    store = BackupStore(tmp_path)
+    configs = [CONFIG] * 8 + [CONFIG + f"banner motd v{n}\n" for n in range(8)]
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        snapshots = list(
+            pool.map(lambda text: store.put("R1", text, datetime.now(timezone.utc)), configs)
+        )
+    assert len(_objects(store)) == 9
+    assert len(store.history("R1")) == 16
+    fresh = BackupStore(tmp_path)
+    assert [fresh.read(snap) for snap in snapshots] == configs
+
+
+def test_as_of_returns_capture_in_effect(tmp_path: Any) -> None:
+    store = BackupStore(tmp_path)
+    old = store.put("R1", CONFIG, T0)
+    new = store.put("R1", CONFIG + "ip domain-name example.net\n", T0 + timedelta(days=2))
+    assert store.as_of("R1", T0 - timedelta(seconds=1)) is None
+    assert store.as_of("R1", T0 + timedelta(days=1)) == old
+    assert store.as_of("R1", T0 + timedelta(days=3)) == new
+
+
+def test_devices_reports_recorded_names(tmp_path: Any) -> None:
+    store = BackupStore(tmp_path)
+    store.put("core/sw1", CONFIG, T0)
+    store.put("core_sw1", CONFIG + "!\n", T0)
+    store.put("edge R1", CONFIG, T0)
+    assert store.devices() == ["core/sw1", "core_sw1", "edge R1"]
+    assert [snap.device for snap in store.history("core/sw1")] == ["core/sw1"]
+    assert store.read(store.latest("core_sw1")) == CONFIG + "!\n"
+
+
+def test_devices_falls_back_to_file_name_for_old_manifests(tmp_path: Any) -> None:
+    store = BackupStore(tmp_path)
+    snapshot = store.put("R1", CONFIG, T0)
+    manifest = tmp_path / MANIFESTS_DIR / "R1.jsonl"
+    legacy = {"timestamp": T0.isoformat(), "hash": snapshot.hash, "size": snapshot.size}
+    manifest.write_text(json.dumps(legacy) + "\n", encoding="utf-8")
+    assert store.devices() == ["R1"]
+    assert store.latest("R1") == snapshot
+
+
+def test_index_rebuild_keeps_original_names(tmp_path: Any) -> None:
+    store = BackupStore(tmp_path)
+    store.put("core/sw1", CONFIG, T0)
+    index = BackupIndex(tmp_path / "index.sqlite3")
+    try:
+        assert index.rebuild(store) == 1
+        assert [entry.device for entry in index.history("core/sw1")] == ["core/sw1"]
+        assert index.history("core_sw1") == []
+    finally:
+        index.close()
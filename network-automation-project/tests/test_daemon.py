@@ -0,0 +1,78 @@
+"""Daemon request handling and socket start-up."""
+from __future__ import annotations
+
+import socket
+from typing import Any
+
+import pytest
+
+import netautoctl
+from netauto_lib.daemon import NetAutoDaemon, _remove_stale_socket
+from netauto_lib.simulator import write_inventory
+
+
+def test_stale_socket_is_replaced(tmp_path: Any) -> None:
+    path = tmp_path / "d.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(path))
+    assert path.exists()
+    _remove_stale_socket(path)
+    assert not path.exists()
+
+
+def test_live_socket_is_refused(tmp_path: Any) -> None:
+    path = tmp_path / "d.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(path))
+        server.listen()
+        with pytest.raises(RuntimeError, match="already listening"):
+            _remove_stale_socket(path)
+    assert path.exists()
+
+
+def test_regular_file_is_refused(tmp_path: Any) -> None:
+    path = tmp_path / "d.sock"
+    path.write_text("not a socket", encoding="utf-8")
+    with pytest.raises(RuntimeError, match="not a socket"):
+        _remove_stale_socket(path)
+
+
+def test_device_methods_reply_per_device(telnet_fleet: Any, tmp_path: Any) -> None:
+    inventory = write_inventory(tmp_path / "sim.yaml", telnet_fleet.inventory())
+    settings = {"backups_dir": tmp_path / "backups", "fleet_workers": 2}
+    daemon = NetAutoDaemon(str(inventory), settings)
+    try:
+        reply = daemon.handle({"method": "show_interfaces", "params": {"device": "all"}})
+        unknown = daemon.handle({"method": "backup", "params": {"device": "R9"}})
+    finally:
+        daemon.pool.close_all()
+    assert reply["ok"] is True
+    assert set(reply["result"]) == {"SIM1", "SIM2"}
+    assert reply["result"]["SIM1"]["ok"] is True
+    assert reply["result"]["SIM1"]["error"] is None
+    assert "GigabitEthernet0/0" in reply["result"]["SIM1"]["result"]
+    assert unknown["ok"] is False
+
+
+def test_client_reconcile_flag_is_tri_state() -> None:
+    parser = netautoctl.build_parser()
+    base = ["set-interface", "R1", "--interface", "Gi0/1", "--ip", "10.0.0.1", "--mask", "24"]
+    assert parser.parse_args(base).reconcile is None
+    assert parser.parse_args([*base, "--reconcile"]).reconcile is True
+    assert parser.parse_args([*base, "--no-reconcile"]).reconcile is False
+
+
+def test_reconcile_must_be_a_json_bool(tmp_path: Any) -> None:
+    inventory = write_inventory(tmp_path / "sim.yaml", [])
+    daemon = NetAutoDaemon(str(inventory), {"fleet_workers": 1, "reconcile_config": False})
+    params = {"device": "R1", "interface": "Gi0/1", "ip": "10.0.0.1", "mask": "24"}
+    try:
+        for value in ("false", 0, "yes"):
+            reply = daemon.handle(
+                {"method": "set_interface", "params": {**params, "reconcile": value}}
+            )
+            assert reply == {"ok": False, "error": "'reconcile' must be true or false"}
+        assert daemon._reconcile({"reconcile": True}) is True
+        assert daemon._reconcile({}) is False
+    finally:
+        daemon.pool.close_all()
@@ -0,0 +1,46 @@
+"""Compiled inventory cache keyed by file signature and content hash."""
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from netauto_lib.config_loader import (
+    _cache_path,
+    _inventory_files,
+    _read_inventory_cache,
+    _signature,
+    load_devices,
+)
+
+INVENTORY = """\
+devices:
+  - name: R1
+    ip: 10.0.0.1
+    username: admin
+    device_type: cisco_ios
+"""
+
+
+def test_cache_records_file_signature_and_is_reused(tmp_path: Any) -> None:
+    path = tmp_path / "devices.yaml"
+    path.write_text(INVENTORY, encoding="utf-8")
+    assert [device["name"] for device in load_devices(str(path))] == ["R1"]
+
+    cached = _read_inventory_cache(_cache_path(path))
+    assert cached is not None
+    assert cached["signature"] == _signature(_inventory_files(path))
+    [(name, mtime_ns, size)] = cached["signature"]
+    assert (name, size) == ("devices.yaml", len(INVENTORY))
+    assert isinstance(mtime_ns, int)
+
+    assert load_devices(str(path))[0]["ip"] == "10.0.0.1"
+
+
+def test_changed_file_invalidates_cache(tmp_path: Any) -> None:
+    path = tmp_path / "devices.yaml"
+    path.write_text(INVENTORY, encoding="utf-8")
+    load_devices(str(path))
+    path.write_text(INVENTORY.replace("10.0.0.1", "10.0.0.2"), encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert load_devices(str(path))[0]["ip"] == "10.0.0.2"
@@ -0,0 +1,66 @@
+"""Streaming YAML inventory entries match ``yaml.safe_load``."""
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+import yaml
+
+from netauto_lib.config_loader import _yaml_entries, iter_devices, load_devices
+
+INVENTORY = """\
+defaults: &defaults
+  username: admin
+  device_type: cisco_ios_telnet
+  tags: [edge, wan]
+site_dc1: &dc1
+  site: dc1
+devices:
+  - <<: [*defaults, *dc1]
+    name: R1
+    ip: 10.0.0.1
+    port: 0x17
+  - <<: *defaults
+    name: R2
+    ip: 10.0.0.2
+    port: 027
+    password: !!str 12345
+    enable_secret: !!str yes
+  - &r3
+    name: !!str 3
+    ip: 10.0.0.3
+    username: ops
+    port: !!int "2222"
+    groups: ~
+    tags: [core]
+  - <<: *r3
+    name: R4
+    port: 22
+"""
+
+
+def test_entries_match_safe_load() -> None:
+    expected = yaml.safe_load(INVENTORY)["devices"]
+    assert list(_yaml_entries(INVENTORY.encode("utf-8"))) == expected
+    assert expected[0]["port"] == 23 and expected[1]["port"] == 23
+
+
+@pytest.mark.parametrize("use_cache", [True, False])
+def test_loaded_devices_keep_resolved_ports(tmp_path: Any, use_cache: bool) -> None:
+    path = tmp_path / "devices.yaml"
+    path.write_text(INVENTORY, encoding="utf-8")
+    devices = load_devices(str(path), use_cache=use_cache)
+    assert [device.get("port") for device in devices] == [23, 23, 2222, 22]
+    assert [device["name"] for device in devices] == ["R1", "R2", "3", "R4"]
+    assert devices[0]["site"] == "dc1"
+    assert devices[1]["password"] == "12345" and devices[1]["enable_secret"] == "yes"
+    assert [dict(device) for device in iter_devices(str(path))] == [
+        dict(device) for device in devices
+    ]
+
+
+def test_missing_devices_list_is_reported(tmp_path: Any, capsys: Any) -> None:
+    path = tmp_path / "devices.yaml"
+    path.write_text("hosts: []\n", encoding="utf-8")
+    assert load_devices(str(path), use_cache=False) == []
+    assert "'devices' list" in capsys.readouterr().out
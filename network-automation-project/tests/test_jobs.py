@@ -0,0 +1,92 @@
+"""Job file validation, step batching and execution against the simulator."""
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from netauto_lib.config_diff import opens_section
+from netauto_lib.jobs import JobError, _plan, load_job, run_job, select_targets
+
+JOB = """\
+name: rollout
+targets: all
+steps:
+  - backup
+  - set-interface: {interface: GigabitEthernet0/2, ip: 192.0.2.1, mask: 24}
+  - ospf: {process_id: 1, router_id: 1.1.1.1, network: 192.0.2.0,
+           wildcard: 0.0.0.255, area: 0}
+  - push-config: {commands: ["ip domain-name example.net", "  "]}
+  - show-interfaces
+"""
+
+
+def _write_job(tmp_path: Any, text: str) -> Any:
+    path = tmp_path / "job.yaml"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_push_config_blank_commands_are_dropped(tmp_path: Any) -> None:
+    job = load_job(_write_job(tmp_path, JOB))
+    assert job.steps[3].commands == ["ip domain-name example.net"]
+
+
+@pytest.mark.parametrize("commands", ["[]", '[""]', '["  ", ""]', "[null]", "ip routing"])
+def test_push_config_without_commands_is_rejected(tmp_path: Any, commands: str) -> None:
+    job = f"targets: all\nsteps:\n  - push-config: {{commands: {commands}}}\n"
+    with pytest.raises(JobError, match="push-config"):
+        load_job(_write_job(tmp_path, job))
+
+
+def test_opens_section_ignores_blank_lines() -> None:
+    assert not opens_section("")
+    assert not opens_section("   ")
+    assert opens_section("interface GigabitEthernet0/1")
+    assert opens_section("router ospf 1")
+
+
+def test_plan_batches_adjacent_section_steps(tmp_path: Any) -> None:
+    job = load_job(_write_job(tmp_path, JOB))
+    batches = [[step.operation for step in batch] for batch in _plan(job.steps)]
+    assert batches == [
+        ["backup"],
+        ["set-interface", "ospf"],
+        ["push-config"],
+        ["show-interfaces"],
+    ]
+
+
+def test_job_runs_every_step_over_one_session(
+    telnet_fleet: Any, tmp_path: Any, monkeypatch: Any
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    job = load_job(_write_job(tmp_path, JOB))
+    devices = select_targets(job, telnet_fleet.inventory())
+    settings = {"backups_dir": tmp_path / "backups", "fleet_workers": 2}
+    summary = run_job(job, devices, settings)
+
+    assert [result.ok for result in summary.results] == [True, True]
+    steps = summary.results[0].result
+    assert [step.step for step in steps] == [
+        "backup",
+        "set-interface",
+        "ospf",
+        "push-config",
+        "show-interfaces",
+    ]
+    assert all(step.ok for step in steps)
+    running = telnet_fleet.devices[0].running_config()
+    assert " ip address 192.0.2.1 255.255.255.0" in running
+    assert "router ospf 1" in running
+    assert "ip domain-name example.net" in running
+    assert any((tmp_path / "backups").rglob("*"))
+
+
+@pytest.mark.parametrize("key", ["stop_on_error", "reconcile"])
+def test_flags_must_be_booleans(tmp_path: Any, key: str) -> None:
+    job = f'targets: all\n{key}: "no"\nsteps: [backup]\n'
+    with pytest.raises(JobError, match=f"'{key}' must be true or false"):
+        load_job(_write_job(tmp_path, job))
+    job = f"targets: all\n{key}: false\nsteps: [backup]\n"
+    assert getattr(load_job(_write_job(tmp_path, job)), key) is False
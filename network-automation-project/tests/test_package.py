@@ -0,0 +1,17 @@
+"""Lazy submodule access through ``netauto_lib``."""
+from __future__ import annotations
+
+import pkgutil
+
+import netauto_lib
+
+
+def test_all_lists_every_submodule() -> None:
+    submodules = {module.name for module in pkgutil.iter_modules(netauto_lib.__path__)}
+    assert sorted(netauto_lib.__all__) == sorted(submodules)
+
+
+def test_submodules_load_on_attribute_access() -> None:
+    assert netauto_lib.jobs.load_job is not None
+    assert netauto_lib.daemon.NetAutoDaemon is not None
+    assert netauto_lib.simulator.SimulatorFleet is not None
@@ -0,0 +1,100 @@
+"""Reconcile mode: only configuration missing from the device is pushed."""
+from __future__ import annotations
+
+from typing import Any
+
+import netauto
+from netauto_lib import operations
+from netauto_lib.config_diff import missing_commands
+from netauto_lib.ios_config import parse_config
+from netauto_lib.simulator import write_inventory
+
+RUNNING_CONFIG = """\
+hostname R1
+!
+interface GigabitEthernet0/0
+ ip address 10.0.0.1 255.255.255.0
+ duplex auto
+!
+interface GigabitEthernet0/1
+ no ip address
+ shutdown
+!
+end
+"""
+
+
+class FakeConnection:
+    """Netmiko stand-in without weakref support, like some third-party sessions."""
+
+    __slots__ = ("host", "running", "pushed")
+
+    def __init__(self, running: str) -> None:
+        self.host = "r1"
+        self.running = running
+        self.pushed: list[list[str]] = []
+
+    def send_command(self, command: str) -> str:
+        return self.running
+
+    def send_config_set(self, commands: list[str]) -> str:
+        self.pushed.append(list(commands))
+        return "\n".join(commands)
+
+
+def test_missing_commands_keeps_section_header_for_missing_lines() -> None:
+    running = parse_config(RUNNING_CONFIG)
+    commands = [
+        "interface GigabitEthernet0/0",
+        "ip address 10.0.0.1 255.255.255.0",
+        "no shutdown",
+        "interface GigabitEthernet0/1",
+        "ip address 192.0.2.1 255.255.255.0",
+        "no shutdown",
+    ]
+    assert missing_commands(running, commands) == [
+        "interface GigabitEthernet0/1",
+        "ip address 192.0.2.1 255.255.255.0",
+        "no shutdown",
+    ]
+
+
+def test_reconcile_pushes_only_missing_lines() -> None:
+    conn = FakeConnection(RUNNING_CONFIG)
+    commands = operations.interface_commands("GigabitEthernet0/1", "192.0.2.1", "255.255.255.0")
+    operations.push_config(conn, commands, reconcile=True)
+    assert conn.pushed == [commands]
+
+    compliant = operations.push_config(
+        FakeConnection(RUNNING_CONFIG),
+        ["interface GigabitEthernet0/0", "ip address 10.0.0.1 255.255.255.0"],
+        reconcile=True,
+    )
+    assert compliant is not None and compliant.startswith("Already compliant")
+
+
+def test_set_interface_reports_compliant_devices(
+    telnet_fleet: Any, tmp_path: Any, monkeypatch: Any, capsys: Any
+) -> None:
+    inventory = write_inventory(tmp_path / "sim.yaml", telnet_fleet.inventory())
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("INVENTORY_PATH", str(inventory))
+    monkeypatch.setenv("LOGS_DIR", str(tmp_path / "logs"))
+    monkeypatch.setenv("BACKUPS_DIR", str(tmp_path / "backups"))
+    argv = [
+        "set-interface",
+        "SIM1",
+        "--interface",
+        "GigabitEthernet0/1",
+        "--ip",
+        "192.0.2.1",
+        "--mask",
+        "24",
+        "--reconcile",
+    ]
+    assert netauto.main(argv) == 0
+    assert "Already compliant" not in capsys.readouterr().out
+    assert "192.0.2.1" in telnet_fleet.devices[0].running_config()
+
+    assert netauto.main(argv) == 0
+    assert "Already compliant" in capsys.readouterr().out
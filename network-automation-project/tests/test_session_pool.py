@@ -0,0 +1,142 @@
+"""SessionPool reuse, limits and shutdown with a fake connector."""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from netauto_lib.connection import PoolTimeoutError, SessionPool
+from netauto_lib.credentials import CredentialResolver, Credentials
+
+
+class FakeConnection:
+    """Connection stand-in recording disconnects."""
+
+    def __init__(self, host: str) -> None:
+        self.host = host
+        self.alive = True
+        self.disconnected = False
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+    def disconnect(self) -> None:
+        self.disconnected = True
+
+
+class Connector:
+    """Pool connector returning fresh fake connections."""
+
+    def __init__(self) -> None:
+        self.opened: list[FakeConnection] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, device: Any, credentials: Credentials) -> FakeConnection:
+        conn = FakeConnection(device["ip"])
+        with self._lock:
+            self.opened.append(conn)
+        return conn
+
+
+def _device(ip: str) -> dict[str, Any]:
+    return {"name": ip, "ip": ip, "username": "admin", "password": "secret"}
+
+
+def _pool(connector: Connector, **options: Any) -> SessionPool:
+    options.setdefault("keepalive_interval", 0)
+    return SessionPool(
+        resolver=CredentialResolver(interactive=False), connector=connector, **options
+    )
+
+
+def test_released_sessions_are_reused() -> None:
+    connector = Connector()
+    pool = _pool(connector)
+    with pool.session(_device("10.0.0.1")) as first:
+        pass
+    with pool.session(_device("10.0.0.1")) as second:
+        assert pool.stats() == {"open": 1, "idle": 0, "in_use": 1}
+    assert first is second
+    assert len(connector.opened) == 1
+    pool.close_all()
+
+
+def test_failed_block_discards_session() -> None:
+    connector = Connector()
+    pool = _pool(connector)
+    with pytest.raises(ValueError):
+        with pool.session(_device("10.0.0.1")):
+            raise ValueError("boom")
+    assert connector.opened[0].disconnected
+    assert pool.stats()["open"] == 0
+
+
+def test_dead_idle_session_is_replaced() -> None:
+    connector = Connector()
+    pool = _pool(connector)
+    pool.keepalive_interval = 0.0
+    conn = pool.acquire(_device("10.0.0.1"))
+    pool.release(conn)
+    conn.alive = False
+    assert pool.acquire(_device("10.0.0.1")) is not conn
+    assert conn.disconnected
+
+
+def test_per_host_limit_blocks_until_release() -> None:
+    connector = Connector()
+    pool = _pool(connector, max_per_host=1)
+    held = pool.acquire(_device("10.0.0.1"))
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire(_device("10.0.0.1"), timeout=0.05)
+    other = pool.acquire(_device("10.0.0.2"), timeout=0.05)
+
+    threading.Timer(0.05, pool.release, (held,)).start()
+    assert pool.acquire(_device("10.0.0.1"), timeout=5) is held
+    pool.release(other)
+
+
+def test_global_limit_evicts_idle_sessions_first() -> None:
+    connector = Connector()
+    pool = _pool(connector, max_total=1)
+    first = pool.acquire(_device("10.0.0.1"))
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire(_device("10.0.0.2"), timeout=0.05)
+    pool.release(first)
+    pool.acquire(_device("10.0.0.2"), timeout=0.05)
+    assert first.disconnected
+    assert pool.stats() == {"open": 1, "idle": 0, "in_use": 1}
+
+
+def test_close_all_stops_keepalive_and_closes_every_session() -> None:
+    connector = Connector()
+    pool = _pool(connector, keepalive_interval=30.0)
+    idle = pool.acquire(_device("10.0.0.1"))
+    pool.release(idle)
+    busy = pool.acquire(_device("10.0.0.2"))
+
+    started = time.monotonic()
+    pool.close_all()
+    assert time.monotonic() - started < 5
+    assert pool._reaper is not None and not pool._reaper.is_alive()
+    assert idle.disconnected and not busy.disconnected
+
+    pool.release(busy)
+    assert busy.disconnected
+    assert pool.stats() == {"open": 0, "idle": 0, "in_use": 0}
+    with pytest.raises(RuntimeError):
+        pool.acquire(_device("10.0.0.1"))
+
+
+def test_keepalive_thread_evicts_expired_idle_sessions() -> None:
+    connector = Connector()
+    pool = _pool(connector, keepalive_interval=0.02, idle_timeout=0.0)
+    conn = pool.acquire(_device("10.0.0.1"))
+    pool.release(conn)
+    deadline = time.monotonic() + 5
+    while not conn.disconnected and time.monotonic() < deadline:
+        time.sleep(0.01)
+    pool.close_all()
+    assert conn.disconnected
+    assert pool.stats()["open"] == 0
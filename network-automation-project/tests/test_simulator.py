@@ -0,0 +1,46 @@
+"""Configuration merging of the simulated IOS device."""
+from __future__ import annotations
+
+from netauto_lib.simulator import SimulatedDevice, SimulatorOptions
+
+INTERFACE = "interface GigabitEthernet0/1"
+
+
+def _device() -> SimulatedDevice:
+    return SimulatedDevice("SIM1", 0, 0, SimulatorOptions())
+
+
+def test_ip_address_replaces_no_ip_address() -> None:
+    device = _device()
+    assert device.config[INTERFACE] == ["no ip address", "shutdown", "duplex auto"]
+    device.apply(INTERFACE, "ip address 192.0.2.1 255.255.255.0")
+    device.apply(INTERFACE, "no shutdown")
+    assert device.config[INTERFACE] == ["duplex auto", "ip address 192.0.2.1 255.255.255.0"]
+
+
+def test_primary_address_is_replaced_and_secondaries_kept() -> None:
+    device = _device()
+    device.apply(INTERFACE, "ip address 192.0.2.1 255.255.255.0")
+    device.apply(INTERFACE, "ip address 198.51.100.1 255.255.255.0 secondary")
+    device.apply(INTERFACE, "ip address 192.0.2.9 255.255.255.0")
+    addresses = [line for line in device.config[INTERFACE] if line.startswith("ip address")]
+    assert addresses == [
+        "ip address 198.51.100.1 255.255.255.0 secondary",
+        "ip address 192.0.2.9 255.255.255.0",
+    ]
+
+
+def test_no_ip_address_removes_every_address() -> None:
+    device = _device()
+    device.apply(INTERFACE, "ip address 192.0.2.1 255.255.255.0")
+    device.apply(INTERFACE, "ip address 198.51.100.1 255.255.255.0 secondary")
+    device.apply(INTERFACE, "no ip address")
+    assert device.config[INTERFACE] == ["shutdown", "duplex auto", "no ip address"]
+    assert "192.0.2.1" not in device.interface_brief()
+
+
+def test_hostname_change_renames_prompt() -> None:
+    device = _device()
+    device.apply(None, "hostname EDGE1")
+    assert device.hostname == "EDGE1"
+    assert list(device.config).count("hostname SIM1") == 0
@@ -0,0 +1,53 @@
+"""Session transcripts written by the background writer."""
+from __future__ import annotations
+
+import threading
+from typing import Any
+
+from netauto_lib import transcripts
+from netauto_lib.logging_setup import log_context
+from netauto_lib.transcripts import TranscriptWriter
+
+
+def test_entries_land_in_per_device_files(tmp_path: Any) -> None:
+    transcripts.enable_transcripts(tmp_path)
+    try:
+        with log_context(device="core/R1"):
+            transcripts.record(transcripts.SENT, "show version")
+            transcripts.record(transcripts.RECEIVED, "Cisco IOS Software")
+        transcripts.record(transcripts.SENT, "show clock", host="10.0.0.2")
+    finally:
+        transcripts.disable_transcripts()
+    text = (tmp_path / "core_R1.log").read_text(encoding="utf-8")
+    assert ">>> show version" in text
+    assert "<<<\nCisco IOS Software\n" in text
+    assert ">>> show clock" in (tmp_path / "10.0.0.2.log").read_text(encoding="utf-8")
+
+
+def test_atexit_hook_is_registered_once(tmp_path: Any, monkeypatch: Any) -> None:
+    registered: list[Any] = []
+    monkeypatch.setattr(transcripts, "_atexit_registered", False)
+    monkeypatch.setattr(transcripts.atexit, "register", registered.append)
+    try:
+        for _ in range(3):
+            transcripts.enable_transcripts(tmp_path)
+    finally:
+        transcripts.disable_transcripts()
+    assert registered == [transcripts.disable_transcripts]
+
+
+def test_every_submission_is_written_or_counted_as_dropped(tmp_path: Any) -> None:
+    writer = TranscriptWriter(tmp_path, queue_size=4)
+
+    def submit() -> None:
+        for number in range(500):
+            writer.submit("R1", transcripts.SENT, f"command {number}")
+
+    threads = [threading.Thread(target=submit) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.close()
+    stats = writer.stats()
+    assert stats["written"] + stats["dropped"] == 8 * 500